@@ -0,0 +1,96 @@
+from src.library.essentials import *
+from src.classes.Board import Board
+from src.classes.PathNetwork import PathNetwork
+import argparse
+
+def get_networks_bfs(board: Board):
+    """
+    Brute force flood fill over the board's links, used to verify the incremental index
+    Returns dict of (x, y) path cell: (frozenset of network cells, frozenset of reached fruit cells, connected to entrance)
+    """
+    links = board.get_links()
+    connections = board.get_connections()
+    fruits = board.get_layer(Board.FRUIT)
+    tiles = board.get_layer(Board.TILE)
+    results = {}
+    for y in range(board.rows):
+        for x in range(board.columns):
+            if tiles[y, x] == 0 or (x, y) in results:
+                continue
+            network = {(x, y)}
+            reached = set()
+            queue = [(x, y)]
+            while queue:
+                cx, cy = queue.pop()
+                for direction, (dx, dy) in Board.directions.items():
+                    nx, ny = cx + dx, cy + dy
+                    if not (0 <= nx < board.columns and 0 <= ny < board.rows):
+                        continue
+                    if links[cy, cx] & direction and (nx, ny) not in network:
+                        network.add((nx, ny))
+                        queue.append((nx, ny))
+                    elif connections[cy, cx] & direction and tiles[ny, nx] == 0 and fruits[ny, nx] != 0:
+                        reached.add((nx, ny))
+            entrance = board.entrance
+            at_entrance = entrance is not None and entrance in network and bool(links[entrance[1], entrance[0]] & Board.N)
+            for cell in network:
+                results[cell] = (frozenset(network), frozenset(reached), at_entrance)
+    return results
+
+
+def verify(network: PathNetwork):
+    """
+    Use this to compare the index with a brute force flood fill
+    Returns number of mismatching cells
+    """
+    mismatches = 0
+    for cell, (cells, reached, at_entrance) in get_networks_bfs(board=network.board).items():
+        if (network.get_network(cell=cell) != cells
+            or network.get_reached_fruits(cell=cell) != reached
+            or network.is_connected(a=cell) != at_entrance):
+            mismatches += 1
+    return mismatches
+
+
+def run_random_check(steps: int = 2000, seed: int = 0, grid: dict = tilemaps.garden['grid']):
+    """
+    Use this after changing the connectivity code. Places, replaces and removes random tiles and fruits, verifying after every step
+    Returns number of steps with mismatches
+    """
+    rng = random.Random(seed)
+    board = Board(grid=grid)
+    network = PathNetwork(board=board)
+    failed_steps = 0
+    for step in range(steps):
+        x = rng.randrange(board.columns)
+        y = rng.randrange(board.rows)
+        action = rng.random()
+        if action < 0.55:
+            if board.layers[Board.FRUIT, y, x] == 0:
+                board.set_tile(x=x, y=y, tile_type=rng.randrange(1, len(Board.tile_types)), rotation=rng.randrange(4))
+                network.on_tile_changed(x=x, y=y)
+        elif action < 0.85:
+            board.clear_tile(x=x, y=y)
+            network.on_tile_changed(x=x, y=y)
+        elif board.layers[Board.TILE, y, x] == 0:
+            board.set_fruit(x=x, y=y, fruit=rng.choice(Board.fruit_types))
+            network.on_fruit_changed(x=x, y=y)
+
+        if verify(network=network) != 0:
+            print(f'WARNING: path network mismatch at step {step} (seed {seed})')
+            failed_steps += 1
+    return failed_steps
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Cross-check the incremental path network against a brute force flood fill')
+    parser.add_argument('--steps', type=int, default=2000, help='random board edits per seed')
+    parser.add_argument('--seeds', type=int, default=5, help='number of seeds, starting at 0')
+    args = parser.parse_args()
+
+    failed_steps = sum(run_random_check(steps=args.steps, seed=seed) for seed in range(args.seeds))
+    print(f'Path network: {failed_steps} of {args.steps*args.seeds} steps mismatched')
+
+
+if __name__ == '__main__':
+    main()
@@ -1,48 +1,106 @@
 from src.library.essentials import *
 from src.classes.SettingsManager import SettingsManager
+from src.classes.FramePacer import FramePacer
+from src.classes.AssetManager import AssetManager
+from src.classes.SurfacePool import SurfacePool
+from src.classes.GlyphAtlas import GlyphAtlas
+from src.classes.RandomStreams import RandomStreams
+from src.classes.MonteCarloAI import MonteCarloAI
+from src.classes.ReplayRecorder import ReplayRecorder
+from src.classes.ReplayPlayer import ReplayPlayer
+from src.classes.SaveManager import SaveManager
+from src.classes.RecordsManager import RecordsManager
+from src.classes.Tracer import Tracer
+from src.classes.HitchDetector import HitchDetector
+from src.classes.MemoryPolicy import MemoryPolicy
+from src.classes.AllocationProfiler import AllocationProfiler
+from src.classes.FrameCapture import FrameCapture
+from src.classes.AudioManager import AudioManager
+from src.classes.MusicManager import MusicManager
 from src.states.MenuState import MenuState
+import argparse
 
 class Game:
-    def __init__(self):
+    @Tracer.trace(name='Game.__init__')
+    def __init__(self, seed: int = None, settings: dict = None):
+        """
+        seed = master seed of the random streams, None for a random one
+        settings = settings to use instead of the saved ones, e.g. from a replay
+        """
         self.settings_manager = SettingsManager()
         self.settings = self.settings_manager.load_all_settings()
+        if settings is not None:
+            self.settings.update(settings)
 
         self.fps_cap = self.settings['fps_cap'] + 1
         self.title = 'Greedy Gardens'
 
-        pygame.mixer.pre_init(frequency=44100, size=16, channels=2, buffer=4096)
+        # Signed 16 bit like the sound files, so the mixer does not convert samples
+        pygame.mixer.pre_init(frequency=44100, size=-16, channels=2, buffer=int(self.settings['audio_buffer']))
         pygame.init()
+        self.audio_manager = AudioManager(settings_manager=self.settings_manager, buffer=int(self.settings['audio_buffer']))
         pygame.display.set_icon(pygame.image.load(os.path.join(dir.graphics, 'icon.png')))
         pygame.display.set_caption(self.title+' (0 FPS)')
-        self.canvas = pygame.Surface(size=(constants.canvas_width, constants.canvas_height))
+        self.asset_manager = AssetManager(budget=constants.asset_memory_budget)
+        self.surface_pool = SurfacePool()
+        self.random_streams = RandomStreams(seed=seed)
+        self.replay_recorder = None
+        self.trace_path = None
+        self.hitch_detector = None
+        self.memory_policy = MemoryPolicy()
+        self.allocation_profiler = None
+        self.ai = MonteCarloAI(time_budget=constants.ai_time_budget)
+        self.save_manager = SaveManager()
+        self.records_manager = RecordsManager()
+        self.canvas = self.asset_manager.register(owner=self, key='canvas',
+                                                  asset=pygame.Surface(size=(constants.canvas_width, constants.canvas_height)))
+        self.frame_capture = FrameCapture(surface=self.canvas)
         self.display_info = pygame.display.Info()
         if self.settings['fullscreen']:
             self.screen_width = self.display_info.current_w
             self.screen_height = self.display_info.current_h
-            self.screen = pygame.display.set_mode(size=(self.screen_width, self.screen_height),
-                                                  flags=pygame.FULLSCREEN|pygame.HWSURFACE|pygame.DOUBLEBUF)
+            display_flags = pygame.FULLSCREEN
         else:
             self.screen_width = constants.window_width
             self.screen_height = constants.window_height
-            self.screen = pygame.display.set_mode(size=(self.screen_width, self.screen_height),
-                                                  flags=pygame.HWSURFACE|pygame.DOUBLEBUF)
+            display_flags = 0
+        self.vsync = False
+        if self.settings['vsync']:
+            # vsync needs a renderer-backed display, which SCALED provides
+            try:
+                self.screen = pygame.display.set_mode(size=(self.screen_width, self.screen_height),
+                                                      flags=display_flags|pygame.SCALED, vsync=1)
+                self.vsync = True
+            except pygame.error:
+                print('WARNING: vsync is not available, falling back to frame pacing')
+        if not self.vsync:
+            self.screen = pygame.display.set_mode(size=(self.screen_width, self.screen_height), flags=display_flags)
         utils.set_cursor(cursor=cursors.normal)
         self.screen.fill(color=colors.white)
         pygame.display.update()
-        self.clock = pygame.time.Clock()
+        # With vsync the display presentation paces the frames, the pacer then only measures
+        self.frame_pacer = FramePacer(fps_cap=0 if self.vsync else self.fps_cap, precise=bool(self.settings['frame_pacing']))
+        self.frame_stats_font = GlyphAtlas.get_atlas(font=fonts.lf2, size='tiny', color=colors.white)
 
-        self.music_channel = pygame.mixer.music
-        self.music_channel.set_volume(self.settings['music_volume'])
         self.sfx_channel = pygame.mixer.Channel(0)
         self.sfx_channel.set_volume(self.settings['sfx_volume'])
-        self.ambience_channel = pygame.mixer.Channel(1)
-        self.ambience_channel.set_volume(self.settings['ambience_volume'])
-        utils.sound_play(sound_channel=self.ambience_channel, sound_name='ambience.ogg', loops=-1, fade_ms=3000)
+        self.music_manager = MusicManager(music_volume=self.settings['music_volume'], ambience_volume=self.settings['ambience_volume'])
+        self.audio_manager.music_manager = self.music_manager
+        self.music_manager.prefetch(names=['menu_intro.ogg', 'menu_loop.ogg'])
+        self.music_manager.play_ambience(name='ambience.ogg', fade_ms=3000)
 
         self.state_stack = []
 
 
+    @Tracer.trace(name='Game.update')
     def update(self, dt, events):
+        if self.hitch_detector is not None:
+            self.hitch_detector.begin_frame()
+        if self.allocation_profiler is not None:
+            self.allocation_profiler.begin_frame()
+        self.audio_manager.update()
+        self.music_manager.update()
+
         # Update current state
         if self.state_stack:
             self.state_stack[-1].update(dt=dt, events=events)
@@ -50,39 +108,158 @@ class Game:
             MenuState(game=self, parent=self, stack=self.state_stack).enter_state()
             pass
 
-        # Handle quit
+        # Handle capture keys and quit
         for event in events:
+            if event.type == pygame.KEYDOWN:
+                if event.key == pygame.K_F12:
+                    self.frame_capture.request_screenshot()
+                elif event.key == pygame.K_F10:
+                    if self.frame_capture.video_file is None:
+                        self.frame_capture.start_video(framerate=min(self.fps_cap - 1, 60))
+                    else:
+                        self.frame_capture.stop_video()
             if event.type == pygame.QUIT:
+                if self.replay_recorder is not None:
+                    self.replay_recorder.close()
+                self.ai.shutdown()
+                self.save_manager.wait()
+                self.records_manager.close()
+                self.frame_capture.close()
+                self.frame_capture.print_report()
+                if self.trace_path is not None:
+                    Tracer.dump(path=self.trace_path)
+                if self.hitch_detector is not None:
+                    self.hitch_detector.print_summary()
+                if self.allocation_profiler is not None:
+                    self.allocation_profiler.print_report()
+                    self.memory_policy.print_report()
                 pygame.mixer.stop()
                 pygame.quit()
                 sys.exit()
     
 
+    @Tracer.trace(name='Game.render')
     def render(self):
         # Render current state
         if self.state_stack:
             self.state_stack[-1].render(canvas=self.canvas)
 
+        # Render frame stats
+        if self.settings['show_frame_stats']:
+            self.frame_stats_font.render(dest=self.canvas,
+                                         text=f'{int(self.frame_pacer.get_fps())} FPS  {self.frame_pacer.get_jitter():.2f} ms',
+                                         pos=(10, 10))
+
         # Render canvas to screen
-        if (constants.canvas_width, constants.canvas_height) != (self.screen_width, self.screen_height):
-            scaled_canvas = pygame.transform.scale(surface=self.canvas, size=(self.screen_width, self.screen_height))
-            utils.blit(dest=self.screen, source=scaled_canvas)
-        else:
-            utils.blit(dest=self.screen, source=self.canvas)
+        with Tracer.span(name='present canvas'):
+            if (constants.canvas_width, constants.canvas_height) != (self.screen_width, self.screen_height):
+                pygame.transform.scale(surface=self.canvas, size=(self.screen_width, self.screen_height), dest_surface=self.screen)
+            else:
+                utils.blit(dest=self.screen, source=self.canvas)
             
         # Update display
-        pygame.display.update()
+        with Tracer.span(name='pygame.display.update'):
+            pygame.display.update()
+
+        with Tracer.span(name='FrameCapture.capture'):
+            self.frame_capture.capture(surface=self.canvas)
+
+        if self.hitch_detector is not None:
+            self.hitch_detector.end_frame()
+        if self.allocation_profiler is not None:
+            self.allocation_profiler.end_frame(game=self)
+        self.memory_policy.update()
+
+
+    def is_animating(self):
+        if self.state_stack:
+            return self.state_stack[-1].is_animating()
+        return True
 
 
     def game_loop(self):
         while True:
-            pygame.display.set_caption(f'{self.title} ({int(self.clock.get_fps())} FPS)')
-            dt = self.clock.tick(self.fps_cap)/1000.0
+            if self.settings['idle_mode'] and not self.is_animating():
+                # Block until input arrives, nothing on screen changes in the meantime
+                pygame.display.set_caption(f'{self.title} (idle)')
+                self.memory_policy.on_idle()
+                events = [event for event in [pygame.event.wait(timeout=constants.idle_wait_timeout)] + pygame.event.get()
+                          if event.type != pygame.NOEVENT]
+                self.frame_pacer.reset()
+                if self.replay_recorder is not None:
+                    self.replay_recorder.record(dt=0, events=events)
+                self.update(dt=0, events=events)
+                if events:
+                    self.render()
+                continue
+
+            if self.settings['show_frame_stats']:
+                pygame.display.set_caption(f'{self.title} ({int(self.frame_pacer.get_fps())} FPS, {self.frame_pacer.get_jitter():.2f} ms jitter, '
+                                           f'{self.asset_manager.total_bytes/2**20:.1f} MB assets)')
+            else:
+                pygame.display.set_caption(f'{self.title} ({int(self.frame_pacer.get_fps())} FPS)')
+            with Tracer.span(name='FramePacer.tick'):
+                dt = self.frame_pacer.tick()
             events = pygame.event.get()
+            if self.replay_recorder is not None:
+                self.replay_recorder.record(dt=dt, events=events)
             self.update(dt=dt, events=events)
             self.render()
 
 
 if __name__ == '__main__':
-    game = Game()
-    game.game_loop()
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--record', metavar='PATH', help='record the session to a replay file')
+    parser.add_argument('--replay', metavar='PATH', help='play a replay file and report frame times')
+    parser.add_argument('--realtime', action='store_true', help='replay at recorded speed instead of as fast as possible')
+    parser.add_argument('--headless', action='store_true', help='replay without a window or audio device')
+    parser.add_argument('--checksums', metavar='PATH', help='write a CRC32 of every replayed frame to a file')
+    parser.add_argument('--trace', metavar='PATH', help='save timing spans in the Chrome trace event format, for ui.perfetto.dev')
+    parser.add_argument('--hitches', metavar='MS', nargs='?', type=float, const=constants.hitch_budget,
+                        help=f'log frames slower than MS milliseconds to data/hitches.log, default {constants.hitch_budget}')
+    parser.add_argument('--allocations', action='store_true', help='sample per-frame allocations with tracemalloc and report them per state')
+    parser.add_argument('--audio-latency', action='store_true', help='measure the audio latency of the Audio Latency setting and exit')
+    args = parser.parse_args()
+    if args.trace:
+        # Enabled before the game is created so loading is traced too
+        Tracer.enable()
+
+    if args.audio_latency:
+        settings_manager = SettingsManager()
+        audio_manager = AudioManager(settings_manager=settings_manager, buffer=int(settings_manager.load_all_settings()['audio_buffer']))
+        audio_manager.print_latency_report()
+        pygame.quit()
+    elif args.replay:
+        if args.headless:
+            os.environ['SDL_VIDEODRIVER'] = 'dummy'
+            os.environ['SDL_AUDIODRIVER'] = 'dummy'
+        replay_player = ReplayPlayer(path=args.replay)
+        game = Game(seed=replay_player.seed, settings=replay_player.settings)
+        if args.hitches is not None:
+            game.hitch_detector = HitchDetector(budget=args.hitches)
+        if args.allocations:
+            game.allocation_profiler = AllocationProfiler()
+        result = replay_player.run(game=game, realtime=args.realtime, checksums=bool(args.checksums))
+        ReplayPlayer.print_report(result=result)
+        if args.checksums:
+            with open(args.checksums, 'w') as file:
+                file.writelines(f'{checksum:08x}\n' for checksum in result['checksums'])
+        game.ai.shutdown()
+        if args.trace:
+            Tracer.dump(path=args.trace)
+        if args.hitches is not None:
+            game.hitch_detector.print_summary()
+        if args.allocations:
+            game.allocation_profiler.print_report()
+            game.memory_policy.print_report()
+        pygame.quit()
+    else:
+        game = Game()
+        game.trace_path = args.trace
+        if args.hitches is not None:
+            game.hitch_detector = HitchDetector(budget=args.hitches)
+        if args.allocations:
+            game.allocation_profiler = AllocationProfiler()
+        if args.record:
+            game.replay_recorder = ReplayRecorder(path=args.record, seed=game.random_streams.seed, settings=game.settings)
+        game.game_loop()
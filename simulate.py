@@ -0,0 +1,38 @@
+from src.library.essentials import *
+from src.classes.GameSimulation import GameSimulation, simulate_games
+from concurrent.futures import ProcessPoolExecutor
+import argparse
+import time
+
+def main():
+    parser = argparse.ArgumentParser(description='Play games headless on every core and save the results for balance testing')
+    parser.add_argument('--games', type=int, default=10000, help='number of games to play')
+    parser.add_argument('--seed', type=int, default=0, help='seed of the first game, the others follow it')
+    parser.add_argument('--policy', choices=GameSimulation.policies, default='greedy', help='how the simulated player picks moves')
+    parser.add_argument('--turns', type=int, default=24, help='turns per game')
+    parser.add_argument('--workers', type=int, default=None, help='worker processes, default is the number of CPUs')
+    parser.add_argument('--batch', type=int, default=250, help='games per task sent to a worker')
+    parser.add_argument('--output', default=os.path.join(dir.data, 'simulation.npz'), help='columnar results file')
+    args = parser.parse_args()
+    if args.games < 1:
+        parser.error('--games must be at least 1')
+    if args.batch < 1:
+        parser.error('--batch must be at least 1')
+
+    seeds = list(range(args.seed, args.seed + args.games))
+    batches = [seeds[i:i + args.batch] for i in range(0, len(seeds), args.batch)]
+
+    start_time = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=args.workers) as executor:
+        results = list(executor.map(simulate_games, batches, [args.policy]*len(batches), [args.turns]*len(batches)))
+    elapsed = time.perf_counter() - start_time
+
+    columns = {name: numpy.concatenate([result[name] for result in results]) for name in results[0]}
+    numpy.savez_compressed(args.output, card_columns=numpy.array(GameSimulation.get_card_columns()), **columns)
+
+    print(f'{args.games} games in {elapsed:.1f} s ({args.games/elapsed*60:.0f} games per minute), saved to {args.output}')
+    print(f"Score: mean {columns['score'].mean():.2f}, min {columns['score'].min()}, max {columns['score'].max()}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,91 @@
+from src.library.essentials import *
+import collections
+import tracemalloc
+
+class AllocationProfiler:
+    def __init__(self,
+                 sample_interval: int = constants.allocation_sample_interval,
+                 budget: int = constants.frame_allocation_budget):
+        """
+        Samples one frame in every sample_interval with tracemalloc and reports, per state, how much memory
+        the frame allocated at its peak and how much it left behind. Tracing slows the sampled frames down,
+        the other frames run untraced.
+
+        sample_interval = frames between sampled frames
+        budget = bytes a frame may allocate at its peak, frames above it are counted against their state
+        """
+        self.sample_interval = sample_interval
+        self.budget = budget
+        self.frame = 0
+        self.sampling = False
+        self.baseline = 0
+        # State name: list of (peak bytes, retained bytes, retained blocks) of its sampled frames
+        self.samples = collections.defaultdict(list)
+
+
+    # Class methods
+
+    @classmethod
+    def get_state_name(cls, game: object):
+        """
+        Returns name of the active state and its active substates, e.g. 'MenuState/Menu_TitleState'
+        """
+        names = []
+        stack = game.state_stack
+        while stack:
+            names.append(type(stack[-1]).__name__)
+            stack = getattr(stack[-1], 'substate_stack', None)
+        return '/'.join(names) or 'loading'
+
+
+    def begin_frame(self):
+        self.frame += 1
+        if self.frame % self.sample_interval:
+            return
+        tracemalloc.start()
+        self.sampling = True
+        self.baseline = tracemalloc.get_traced_memory()[0]
+
+
+    def end_frame(self, game: object):
+        """
+        Use this after the frame's render
+        Returns nothing
+        """
+        if not self.sampling:
+            return
+        snapshot = tracemalloc.take_snapshot()
+        peak = tracemalloc.get_traced_memory()[1] - self.baseline
+        tracemalloc.stop()
+        self.sampling = False
+
+        # Only allocations made during the frame are traced, the ones still alive were kept by the game
+        statistics = snapshot.statistics('filename')
+        self.samples[self.get_state_name(game=game)].append((peak,
+                                                             sum(stat.size for stat in statistics),
+                                                             sum(stat.count for stat in statistics)))
+
+
+    def get_report(self):
+        """
+        Returns dict of state name: dict of sampled frames, mean and max peak bytes, mean retained bytes and blocks, frames over budget
+        """
+        report = {}
+        for state, samples in self.samples.items():
+            peaks = [sample[0] for sample in samples]
+            report[state] = {
+                'frames': len(samples),
+                'mean_peak': sum(peaks)/len(samples),
+                'max_peak': max(peaks),
+                'mean_retained': sum(sample[1] for sample in samples)/len(samples),
+                'mean_blocks': sum(sample[2] for sample in samples)/len(samples),
+                'over_budget': sum(1 for peak in peaks if peak > self.budget),
+            }
+        return report
+
+
+    def print_report(self):
+        print(f'Allocations: every {self.sample_interval}th frame sampled, budget {self.budget/1024:.0f} KB per frame')
+        for state, stats in self.get_report().items():
+            print(f"  {state}: {stats['frames']} frames, peak mean {stats['mean_peak']/1024:.1f} KB max {stats['max_peak']/1024:.1f} KB, "
+                  f"retained {stats['mean_retained']/1024:.1f} KB in {stats['mean_blocks']:.0f} blocks, {stats['over_budget']} over budget")
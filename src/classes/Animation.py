@@ -0,0 +1,74 @@
+from src.library.essentials import *
+
+class Animation:
+    # Clips shared by every caller, see get_clip
+    clips = {}
+
+    def __init__(self,
+                 frames: list,
+                 loop: bool = False):
+        """
+        Ordered frames of one animation variant. Clips are shared, so the position in a clip is kept by its user
+
+        frames = list of surfaces in playback order
+        loop = True to wrap around after the last frame
+        """
+        self.frames = frames
+        self.loop = loop
+        self.length = len(frames)
+
+
+    # Class methods
+
+    @classmethod
+    def get_clip(cls,
+                 sprite_sheet: dict,
+                 sprite_names: list = None,
+                 scale: float = 1,
+                 flip_x: bool = False,
+                 flip_y: bool = False,
+                 loop: bool = False,
+                 mode: str = 'alpha'):
+        """
+        Use this to get the shared clip of a sprite sheet sequence, building it on first use
+        Returns Animation
+
+        sprite_sheet = spritesheet dict defined in spritesheets.py
+        sprite_names = names of the sprites in playback order. None for every sprite in sheet order
+        scale = scale factor, or (x, y) factors, applied once when the clip is built
+        flip_x, flip_y = True to flip every frame once when the clip is built
+        loop = True to wrap around after the last frame
+        mode = 'alpha' or 'colorkey', see utils.get_sprite
+        """
+        if sprite_names is None:
+            sprite_names = list(sprite_sheet['sprites'])
+        key = f"{sprite_sheet['file']}:{sprite_names}:{scale}:{flip_x}:{flip_y}:{loop}:{mode}"
+
+        if key not in cls.clips:
+            # Variants are derived from the plain clip so the sprite sheet is only cut once
+            if flip_x or flip_y:
+                base_clip = cls.get_clip(sprite_sheet=sprite_sheet, sprite_names=sprite_names, scale=scale, loop=loop, mode=mode)
+                frames = [pygame.transform.flip(surface=frame, flip_x=flip_x, flip_y=flip_y) for frame in base_clip.frames]
+            elif scale not in (1, (1, 1)):
+                base_clip = cls.get_clip(sprite_sheet=sprite_sheet, sprite_names=sprite_names, loop=loop, mode=mode)
+                frames = [pygame.transform.scale_by(surface=frame, factor=scale) for frame in base_clip.frames]
+            else:
+                frames = [utils.get_sprite(sprite_sheet=sprite_sheet, target_sprite=sprite_name, mode=mode) for sprite_name in sprite_names]
+            cls.clips[key] = cls(frames=frames, loop=loop)
+
+        return cls.clips[key]
+
+
+    def is_finished(self, frame_index: int):
+        return not self.loop and frame_index >= self.length
+
+
+    def get_frame(self, frame_index: int):
+        """
+        Returns Surface of the frame, or None once a non-looping clip has finished
+        """
+        if self.loop:
+            return self.frames[frame_index % self.length]
+        if 0 <= frame_index < self.length:
+            return self.frames[frame_index]
+        return None
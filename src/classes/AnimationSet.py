@@ -0,0 +1,38 @@
+from src.library.essentials import *
+
+class AnimationSet:
+    def __init__(self,
+                 frame_duration: float,
+                 clips: dict = None):
+        """
+        Named clips advanced by one shared clock, so any number of instances cost a single update per frame.
+        Instances remember the frame they started on and read their integer frame index from the clock.
+
+        frame_duration = seconds per frame
+        clips = dict of name: Animation
+        """
+        self.frame_duration = frame_duration
+        self.clips = clips if clips is not None else {}
+        self.time = 0
+        self.frame = 0
+
+
+    # Class methods
+
+    def add_clip(self, name: str, clip):
+        self.clips[name] = clip
+
+
+    def get_frame_index(self, start_frame: int):
+        return self.frame - start_frame
+
+
+    def get_frame(self, name: str, start_frame: int):
+        return self.clips[name].get_frame(frame_index=self.frame - start_frame)
+
+
+    # Main methods
+
+    def update(self, dt):
+        self.time += dt
+        self.frame = int(self.time/self.frame_duration)
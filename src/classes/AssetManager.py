@@ -0,0 +1,135 @@
+from src.library.essentials import *
+from src.classes.Tracer import Tracer
+
+class AssetManager:
+    def __init__(self, budget: int):
+        """
+        Reference counted cache for assets owned by states
+
+        budget = memory budget in bytes. While over it, unreferenced assets are evicted, least recently used first
+        """
+        self.budget = budget
+        self.assets = {}
+        self.total_bytes = 0
+
+
+    # Class methods
+
+    def get_asset_bytes(self, asset):
+        if isinstance(asset, pygame.Surface):
+            return asset.get_pitch()*asset.get_height()
+        elif isinstance(asset, dict):
+            return sum(self.get_asset_bytes(item) for item in asset.values())
+        elif isinstance(asset, list):
+            return sum(self.get_asset_bytes(item) for item in asset)
+        return 0
+
+
+    def acquire(self, owner: object, key: str, loader):
+        """
+        Use this to get a cached asset, loading it on first use
+        Returns the asset
+
+        owner = object holding a reference to the asset, usually a state
+        key = unique name of the asset
+        loader = function without arguments that loads the asset
+        """
+        if key in self.assets:
+            # Re-insert to mark as most recently used
+            entry = self.assets.pop(key)
+        else:
+            with Tracer.span(name=f'load {key}', category='asset'):
+                asset = loader()
+            entry = {'asset': asset, 'bytes': self.get_asset_bytes(asset), 'owners': set()}
+            self.total_bytes += entry['bytes']
+        entry['owners'].add(owner)
+        self.assets[key] = entry
+        self.evict()
+        return entry['asset']
+
+
+    def register(self, owner: object, key: str, asset):
+        """
+        Use this to track an asset built in code, replacing any asset with the same key
+        Returns the asset
+        """
+        if key in self.assets:
+            self.total_bytes -= self.assets.pop(key)['bytes']
+        return self.acquire(owner=owner, key=key, loader=lambda: asset)
+
+
+    def release(self, owner: object, key: str, keep_cached: bool = True):
+        """
+        Use this when an owner no longer needs an asset
+        Returns nothing
+
+        keep_cached = False to unload the asset right away if nothing else references it, e.g. for one-off intro assets
+        """
+        if key in self.assets:
+            self.assets[key]['owners'].discard(owner)
+            if not keep_cached and not self.assets[key]['owners']:
+                self.total_bytes -= self.assets.pop(key)['bytes']
+            self.evict()
+
+
+    def release_owner(self, owner: object):
+        for entry in self.assets.values():
+            entry['owners'].discard(owner)
+        self.evict()
+
+
+    def evict(self):
+        for key in list(self.assets):
+            if self.total_bytes <= self.budget:
+                break
+            if not self.assets[key]['owners']:
+                self.total_bytes -= self.assets.pop(key)['bytes']
+
+
+    def get_image(self, owner: object, dir: str, name: str, mode: str = None, colorkey: pygame.Color = (0, 0, 0)):
+        return self.acquire(owner=owner,
+                            key=f'image:{os.path.join(dir, name)}:{mode}',
+                            loader=lambda: utils.get_image(dir=dir, name=name, mode=mode, colorkey=colorkey))
+
+
+    def get_sprite(self, owner: object, sprite_sheet: dict, target_sprite: str, mode: str = 'colorkey', colorkey: pygame.Color = (0, 0, 0)):
+        return self.acquire(owner=owner,
+                            key=f'sprite:{sprite_sheet["file"]}:{target_sprite}:{mode}',
+                            loader=lambda: utils.get_sprite(sprite_sheet=sprite_sheet, target_sprite=target_sprite, mode=mode, colorkey=colorkey))
+
+
+    def get_text(self, owner: object, text: str, font: dict, size: str, color: pygame.Color, **kwargs):
+        key = f'text:{font["file"]}:{size}:{tuple(color)}:{sorted(kwargs.items())}:{text}'
+        return self.acquire(owner=owner,
+                            key=key,
+                            loader=lambda: utils.get_text(text=text, font=font, size=size, color=color, **kwargs))
+
+
+    def get_report(self):
+        """
+        Returns dict with total bytes, budget, bytes per owner and bytes per asset
+        """
+        owners = {}
+        assets = {}
+        for key, entry in self.assets.items():
+            assets[key] = entry['bytes']
+            if not entry['owners']:
+                owners['(unreferenced)'] = owners.get('(unreferenced)', 0) + entry['bytes']
+            for owner in entry['owners']:
+                owner_name = type(owner).__name__
+                owners[owner_name] = owners.get(owner_name, 0) + entry['bytes']
+        return {
+            'total_bytes': self.total_bytes,
+            'budget': self.budget,
+            'owners': owners,
+            'assets': assets,
+        }
+
+
+    def print_report(self):
+        report = self.get_report()
+        print(f"Assets: {report['total_bytes']/2**20:.2f} MB of {report['budget']/2**20:.0f} MB budget")
+        for owner_name, owner_bytes in sorted(report['owners'].items(), key=lambda item: -item[1]):
+            print(f'  {owner_name}: {owner_bytes/2**20:.2f} MB')
+        for key, asset_bytes in sorted(report['assets'].items(), key=lambda item: -item[1]):
+            print(f'    {asset_bytes/2**20:8.2f} MB  {key}')
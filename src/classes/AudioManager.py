@@ -0,0 +1,202 @@
+from src.library.essentials import *
+import time
+
+class AudioManager:
+    # Largest buffer fallbacks go up to, the buffer the game used before latency profiles
+    max_buffer = 4096
+
+    def __init__(self,
+                 settings_manager: object = None,
+                 buffer: int = 1024,
+                 frequency: int = 44100,
+                 channels: int = 2,
+                 mixer_channels: int = 8,
+                 reserved_channels: int = 3,
+                 check_interval: float = 2):
+        """
+        Mixer setup for a latency profile: the buffer size from the audio_buffer setting, 16 bit signed samples
+        like the sound files so nothing is converted while mixing, decoded sounds kept in memory and channels
+        started up front. While the ambience streams, its position is compared to the clock; if it falls behind,
+        the mixer is underrunning and the next larger buffer is used and saved.
+
+        settings_manager = SettingsManager the game loaded its settings with, to save a fallback buffer size
+        buffer = samples per mixer buffer, see the audio_buffer setting
+        frequency = samples per second
+        channels = 1 for mono, 2 for stereo
+        mixer_channels = number of pygame.mixer.Channel
+        reserved_channels = channels only played on explicitly, e.g. sfx and the two soundtrack channels
+        check_interval = seconds of music between underrun checks
+        """
+        self.settings_manager = settings_manager
+        self.buffer = buffer
+        self.frequency = frequency
+        self.channels = channels
+        self.mixer_channels = mixer_channels
+        self.reserved_channels = reserved_channels
+        self.check_interval = check_interval
+
+        self.sounds = {}
+        self.music_manager = None
+        self.check_start = None
+        self.underrun_checks = 0
+        self.fallbacks = 0
+        # pygame.init opens the mixer with the pre_init values, it is only reopened if they differ
+        if pygame.mixer.get_init() != (self.frequency, -16, self.channels):
+            self.open_mixer()
+        self.prewarm()
+
+
+    # Class methods
+
+    def get_buffer_time(self):
+        """
+        Returns seconds of audio in one mixer buffer, the least a sound can lag behind the call that plays it
+        """
+        return self.buffer/self.frequency
+
+
+    def open_mixer(self):
+        # Channel and music volumes do not survive reopening the mixer
+        volumes = None
+        if pygame.mixer.get_init():
+            volumes = ([pygame.mixer.Channel(i).get_volume() for i in range(pygame.mixer.get_num_channels())], pygame.mixer.music.get_volume())
+            pygame.mixer.quit()
+        pygame.mixer.init(frequency=self.frequency, size=-16, channels=self.channels, buffer=self.buffer)
+        pygame.mixer.set_num_channels(self.mixer_channels)
+        if volumes is not None:
+            for i, volume in enumerate(volumes[0][:self.mixer_channels]):
+                pygame.mixer.Channel(i).set_volume(volume)
+            pygame.mixer.music.set_volume(volumes[1])
+        # Only the buffer size changes, the frequency and sample format stay the same, so decoded sounds are still valid
+
+
+    def prewarm(self):
+        """
+        Use this after the mixer starts so the first real sound does not pay for starting the channels
+        Returns nothing
+        """
+        pygame.mixer.set_num_channels(self.mixer_channels)
+        pygame.mixer.set_reserved(self.reserved_channels)
+        silence = pygame.mixer.Sound(buffer=bytes(self.buffer*self.channels*2))
+        for i in range(self.mixer_channels):
+            channel = pygame.mixer.Channel(i)
+            if not channel.get_busy():
+                channel.play(silence)
+
+
+    def get_sound(self, name: str, sound_dir: str = dir.sfx):
+        """
+        Use this to get a decoded sound, loading it on first use
+        Returns Sound
+        """
+        path = os.path.join(sound_dir, name)
+        if path not in self.sounds:
+            self.sounds[path] = pygame.mixer.Sound(file=path)
+        return self.sounds[path]
+
+
+    def preload(self, names: list, sound_dir: str = dir.sfx):
+        """
+        Use this while loading, e.g. for the sounds of a state's buttons, so playing them never reads the disk
+        Returns nothing
+        """
+        for name in names:
+            self.get_sound(name=name, sound_dir=sound_dir)
+
+
+    def play_sound(self, sound_channel: pygame.mixer.Channel, sound_name: str, loops: int = 0, maxtime: int = 0, fade_ms: int = 0):
+        """
+        Use this instead of utils.sound_play for sounds that answer input, the decoded sound is reused
+        Returns nothing
+        """
+        sound_channel.play(self.get_sound(name=sound_name), loops=loops, maxtime=maxtime, fade_ms=fade_ms)
+
+
+    def fall_back(self):
+        """
+        Use this when the mixer underruns. Switches to the next larger buffer of the audio_buffer setting and saves it
+        Returns True if a larger buffer was available
+        """
+        if self.buffer >= self.max_buffer:
+            return False
+        print(f'WARNING: audio is underrunning with a {self.buffer} sample buffer, switching to {self.buffer*2}')
+        self.buffer *= 2
+        self.fallbacks += 1
+        if self.settings_manager is not None:
+            self.settings_manager.set_setting('audio_buffer', self.buffer)
+        self.open_mixer()
+        self.prewarm()
+        if self.music_manager is not None:
+            self.music_manager.restart()
+        self.check_start = None
+        return True
+
+
+    def update(self):
+        """
+        Use this at the start of every frame, after reading input
+        Returns nothing
+        """
+        frame_start = time.perf_counter()
+        if not pygame.mixer.music.get_busy():
+            self.check_start = None
+            return
+        if self.check_start is None:
+            self.check_start = (frame_start, pygame.mixer.music.get_pos())
+            return
+        elapsed = frame_start - self.check_start[0]
+        if elapsed < self.check_interval:
+            return
+
+        # The music position only moves when the mixer fills a buffer, so a position behind the clock means late buffers
+        lag = elapsed - (pygame.mixer.music.get_pos() - self.check_start[1])/1000
+        self.check_start = (frame_start, pygame.mixer.music.get_pos())
+        if lag > max(2*self.get_buffer_time(), 0.02):
+            self.underrun_checks += 1
+            if self.underrun_checks >= 2:
+                self.underrun_checks = 0
+                self.fall_back()
+        else:
+            self.underrun_checks = 0
+
+
+    def measure_latency(self, trials: int = 20, sound_channel: pygame.mixer.Channel = None):
+        """
+        Use this to measure how long a sound takes from the event that plays it until the mixer has mixed it.
+        Plays a one sample sound through play_sound and waits for its channel to finish, which the mixer thread does once the sample is mixed
+        Returns dict of the buffer time, event-to-mix times and estimated event-to-playback latency in milliseconds
+
+        sound_channel = channel to play the probe on, defaults to channel 0
+        """
+        if sound_channel is None:
+            sound_channel = pygame.mixer.Channel(0)
+        # Never on disk, cached so play_sound finds it like any other sound
+        self.sounds[os.path.join(dir.sfx, 'latency_probe')] = pygame.mixer.Sound(buffer=bytes(self.channels*2))
+        event_to_mix_times = []
+        for _ in range(trials):
+            sound_channel.stop()
+            # Stands in for the timestamp of the input event that triggers the sound
+            event_time = time.perf_counter()
+            self.play_sound(sound_channel=sound_channel, sound_name='latency_probe')
+            while sound_channel.get_busy() and time.perf_counter() - event_time < 1:
+                time.sleep(0.0002)
+            event_to_mix_times.append(time.perf_counter() - event_time)
+            # Spread the trials over different points of the mixer's buffer cycle
+            time.sleep(self.get_buffer_time()*random.random())
+
+        event_to_mix = sorted(event_to_mix_times)
+        mean_event_to_mix = sum(event_to_mix)/len(event_to_mix)
+        return {
+            'buffer': self.get_buffer_time()*1000,
+            'mean_event_to_mix': mean_event_to_mix*1000,
+            'max_event_to_mix': event_to_mix[-1]*1000,
+            # Mixed audio still waits for the buffer in front of it to play out
+            'estimated_latency': (mean_event_to_mix + self.get_buffer_time())*1000,
+        }
+
+
+    def print_latency_report(self, trials: int = 20):
+        report = self.measure_latency(trials=trials)
+        print(f'Audio: {self.frequency} Hz, {self.buffer} sample buffer ({report["buffer"]:.1f} ms), driver {pygame.mixer.get_driver()}')
+        print(f'  event to mix mean {report["mean_event_to_mix"]:.1f} ms, max {report["max_event_to_mix"]:.1f} ms')
+        print(f'  estimated event to playback {report["estimated_latency"]:.1f} ms, {self.fallbacks} underrun fallbacks')
@@ -0,0 +1,272 @@
+from src.library.essentials import *
+import struct
+
+class Board:
+    # Layers of the board array, one uint8 per cell each
+    TILE = 0
+    ROTATION = 1
+    OWNER = 2
+    FRUIT = 3
+    GROWTH = 4
+    LAYER_COUNT = 5
+
+    # Tile types. Rotation 0 is drawn as listed, each rotation turns the tile a quarter clockwise
+    tile_types = ('empty', 'straight', 'corner', 'tee')
+    # Fruit types. 0 means no fruit
+    fruit_types = (None, 'orange', 'blueberry', 'grape', 'strawberry', 'peach', 'coconut', 'golden_apple')
+
+    # Connection bits, clockwise from north. Shifting left by one rotates a mask a quarter clockwise
+    N = 1
+    E = 2
+    S = 4
+    W = 8
+    directions = {N: (0, -1), E: (1, 0), S: (0, 1), W: (-1, 0)}
+
+    # Connections of every tile type and rotation, indexed [tile, rotation]
+    base_connections = (0, N|S, N|E, N|E|S)
+    connections = numpy.array([[((mask << rotation) | (mask >> (4 - rotation))) & 15 for rotation in range(4)]
+                               for mask in base_connections], dtype=numpy.uint8)
+
+    # Caches of card tiles and of the slices used by shift
+    card_tiles = {}
+    shift_slices = {}
+
+    serial_magic = b'GGBD'
+    serial_version = 1
+    serial_header = struct.Struct('<4sBBB')
+
+    def __init__(self, grid: dict = tilemaps.garden['grid'], layers: numpy.ndarray = None):
+        """
+        Garden grid stored as one small uint8 array of shape (layers, rows, columns).
+        Snapshots share the array until one side writes to it, so the AI can branch off thousands of positions cheaply.
+
+        grid = grid dict from tilemaps.py
+        layers = existing array to wrap, e.g. from a snapshot or from_bytes
+        """
+        self.grid = grid
+        self.columns = grid['columns']
+        self.rows = grid['rows']
+        self.entrance = grid.get('entrance')
+
+        if layers is None:
+            layers = numpy.zeros((self.LAYER_COUNT, self.rows, self.columns), dtype=numpy.uint8)
+        self.layers = layers
+        self.owns_layers = layers.flags.writeable
+
+
+    # Class methods
+
+    @classmethod
+    def get_card_tile(cls, name: str):
+        """
+        Use this to find the tile placed by a path card, e.g. 'path_es' or 'strike_nsw'
+        Returns (tile type, rotation)
+        """
+        if name not in cls.card_tiles:
+            mask = 0
+            for letter in name.split('_')[-1]:
+                mask |= {'n': cls.N, 'e': cls.E, 's': cls.S, 'w': cls.W}[letter]
+            tile_type, rotation = numpy.argwhere(cls.connections == mask)[0]
+            cls.card_tiles[name] = (int(tile_type), int(rotation))
+        return cls.card_tiles[name]
+
+
+    @classmethod
+    def shift(cls, array: numpy.ndarray, direction: int):
+        """
+        Returns array where every cell holds the value of its neighbour in a direction, 0 past the edge
+        """
+        key = (direction, array.shape)
+        if key not in cls.shift_slices:
+            dx, dy = cls.directions[direction]
+            rows, columns = array.shape
+            cls.shift_slices[key] = ((slice(max(0, -dy), rows - max(0, dy)), slice(max(0, -dx), columns - max(0, dx))),
+                                     (slice(max(0, dy), rows - max(0, -dy)), slice(max(0, dx), columns - max(0, -dx))))
+        dest, source = cls.shift_slices[key]
+        shifted = numpy.zeros(array.shape, dtype=array.dtype)
+        shifted[dest] = array[source]
+        return shifted
+
+
+    @classmethod
+    def opposite(cls, direction: int):
+        return ((direction << 2) | (direction >> 2)) & 15
+
+
+    def snapshot(self):
+        """
+        Use this to branch off a copy of the board. The array is only copied by whichever board writes first
+        Returns Board
+        """
+        self.layers.flags.writeable = False
+        self.owns_layers = False
+        return Board(grid=self.grid, layers=self.layers)
+
+
+    def make_writable(self):
+        if not self.owns_layers:
+            self.layers = self.layers.copy()
+            self.owns_layers = True
+
+
+    def get_layer(self, layer: int):
+        """
+        Returns read-only view of one layer, e.g. board.get_layer(Board.FRUIT)
+        """
+        view = self.layers[layer]
+        view.flags.writeable = False
+        return view
+
+
+    def get_cell(self, x: int, y: int):
+        """
+        Returns dict with the tile, rotation, owner, fruit and growth of a cell
+        """
+        tile, rotation, owner, fruit, growth = self.layers[:, y, x].tolist()
+        return {
+            'tile': self.tile_types[tile],
+            'rotation': rotation,
+            'owner': owner,
+            'fruit': self.fruit_types[fruit],
+            'growth': growth,
+        }
+
+
+    def set_tile(self, x: int, y: int, tile_type: int, rotation: int = 0, owner: int = 0):
+        self.make_writable()
+        self.layers[self.TILE, y, x] = tile_type
+        self.layers[self.ROTATION, y, x] = rotation % 4
+        self.layers[self.OWNER, y, x] = owner
+
+
+    def clear_tile(self, x: int, y: int):
+        self.set_tile(x=x, y=y, tile_type=0)
+
+
+    def set_fruit(self, x: int, y: int, fruit: str, growth: int = 0):
+        """
+        Use this to plant or remove a fruit
+        Returns nothing
+
+        fruit = name from fruit_types, None to remove
+        growth = growth stage of the fruit
+        """
+        self.make_writable()
+        self.layers[self.FRUIT, y, x] = self.fruit_types.index(fruit)
+        self.layers[self.GROWTH, y, x] = growth if fruit is not None else 0
+
+
+    def grow_fruits(self, amount: int = 1, max_growth: int = 255):
+        self.make_writable()
+        fruits = self.layers[self.FRUIT] != 0
+        self.layers[self.GROWTH][fruits] = numpy.minimum(self.layers[self.GROWTH][fruits].astype(numpy.int16) + amount, max_growth)
+
+
+    def get_connections(self):
+        """
+        Returns array of connection bits of every cell
+        """
+        return self.connections[self.layers[self.TILE], self.layers[self.ROTATION]]
+
+
+    def get_links(self):
+        """
+        Returns array of the sides of every cell that connect to a neighbouring path which connects back.
+        The entrance cell's north side counts as linked when its tile opens to the north
+        """
+        connections = self.get_connections()
+        links = numpy.zeros_like(connections)
+        for direction in self.directions:
+            facing = self.shift(array=connections, direction=direction) & self.opposite(direction=direction)
+            links |= numpy.where(((connections & direction) != 0) & (facing != 0), direction, 0).astype(numpy.uint8)
+        if self.entrance is not None:
+            links[self.entrance[1], self.entrance[0]] |= connections[self.entrance[1], self.entrance[0]] & self.N
+        return links
+
+
+    def get_open_ends(self):
+        """
+        Returns array of the sides of every cell that point to an empty, in-bounds cell without a fruit, i.e. where the path can grow
+        """
+        connections = self.get_connections()
+        free = (self.layers[self.TILE] == 0) & (self.layers[self.FRUIT] == 0)
+        open_ends = numpy.zeros_like(connections)
+        for direction in self.directions:
+            open_ends |= numpy.where(((connections & direction) != 0) & self.shift(array=free, direction=direction), direction, 0).astype(numpy.uint8)
+        return open_ends
+
+
+    def get_fruit_links(self):
+        """
+        Returns bool array of fruit cells that a path points into
+        """
+        connections = self.get_connections()
+        reached = numpy.zeros((self.rows, self.columns), dtype=bool)
+        for direction in self.directions:
+            reached |= (self.shift(array=connections, direction=direction) & self.opposite(direction=direction)) != 0
+        return reached & (self.layers[self.FRUIT] != 0)
+
+
+    def get_placement_mask(self, tile_type: int, rotation: int):
+        """
+        Use this to find every cell a path tile can be placed on
+        Returns bool array, True where the cell is free and the tile links to an existing path or the entrance
+        """
+        mask = int(self.connections[tile_type, rotation % 4])
+        connections = self.get_connections()
+        free = (self.layers[self.TILE] == 0) & (self.layers[self.FRUIT] == 0)
+        linked = numpy.zeros((self.rows, self.columns), dtype=bool)
+        for direction in self.directions:
+            if mask & direction:
+                linked |= (self.shift(array=connections, direction=direction) & self.opposite(direction=direction)) != 0
+        if self.entrance is not None and mask & self.N:
+            linked[self.entrance[1], self.entrance[0]] = True
+        return free & linked
+
+
+    def get_cell_rect(self, x: int, y: int):
+        """
+        Returns Rect of a cell on the canvas
+        """
+        cell_size = self.grid['cell_size']
+        return pygame.Rect(self.grid['pos'][0] + x*cell_size, self.grid['pos'][1] + y*cell_size, cell_size, cell_size)
+
+
+    def get_cell_at(self, pos: tuple):
+        """
+        Returns (x, y) of the cell under a canvas position, or None
+        """
+        x = int((pos[0] - self.grid['pos'][0])//self.grid['cell_size'])
+        y = int((pos[1] - self.grid['pos'][1])//self.grid['cell_size'])
+        if 0 <= x < self.columns and 0 <= y < self.rows:
+            return (x, y)
+        return None
+
+
+    def get_key(self):
+        """
+        Returns bytes identifying the position, stable across processes, e.g. for a transposition table
+        """
+        return self.layers.tobytes()
+
+
+    def to_bytes(self):
+        """
+        Returns bytes of a small header followed by the raw layers
+        """
+        return self.serial_header.pack(self.serial_magic, self.serial_version, self.rows, self.columns) + self.layers.tobytes()
+
+
+    @classmethod
+    def from_bytes(cls, data: bytes, grid: dict = tilemaps.garden['grid']):
+        """
+        Use this to load a board written by to_bytes. The layers are read-only until the first write
+        Returns Board
+        """
+        magic, version, rows, columns = cls.serial_header.unpack_from(data)
+        if magic != cls.serial_magic or version != cls.serial_version:
+            raise ValueError('Invalid board data')
+        if (rows, columns) != (grid['rows'], grid['columns']):
+            grid = dict(grid, rows=rows, columns=columns)
+        layers = numpy.frombuffer(data, dtype=numpy.uint8, count=cls.LAYER_COUNT*rows*columns, offset=cls.serial_header.size)
+        return cls(grid=grid, layers=layers.reshape((cls.LAYER_COUNT, rows, columns)))
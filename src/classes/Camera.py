@@ -0,0 +1,156 @@
+from src.library.essentials import *
+
+class Camera:
+    def __init__(self,
+                 world_size: tuple,
+                 min_zoom: float = 0.5,
+                 max_zoom: float = 4,
+                 steps_per_octave: int = 8,
+                 zoom_speed: float = 12):
+        """
+        Pan and zoom from world pixels to the canvas.
+        Rendering always uses a discrete zoom step so scaled chunks and sprites can be cached per step.
+
+        world_size = (width, height) of the world in pixels
+        min_zoom, max_zoom = zoom limits
+        steps_per_octave = discrete zoom steps per doubling of the zoom
+        zoom_speed = how fast the zoom eases towards its target, higher is faster
+        """
+        self.world_width, self.world_height = world_size
+        self.min_zoom = min_zoom
+        self.max_zoom = max_zoom
+        self.steps_per_octave = steps_per_octave
+        self.zoom_speed = zoom_speed
+
+        self.x = self.world_width/2
+        self.y = self.world_height/2
+        self.zoom = 1
+        self.target_zoom = 1
+        self.zoom_anchor = None
+
+        # Sprites pre-scaled per zoom step, least recently used step first
+        self.sprite_cache = {}
+        self.scale_count = 0
+
+
+    # Class methods
+
+    def get_zoom_step(self):
+        """
+        Returns the discrete zoom step closest to the current zoom. 1 is always a step
+        """
+        return 2**(round(math.log2(self.zoom)*self.steps_per_octave)/self.steps_per_octave)
+
+
+    def get_view(self):
+        """
+        Returns FRect of the world visible on the canvas
+        """
+        zoom_step = self.get_zoom_step()
+        view = pygame.FRect(0, 0, constants.canvas_width/zoom_step, constants.canvas_height/zoom_step)
+        view.center = (self.x, self.y)
+        return view
+
+
+    def world_to_canvas(self, pos: tuple):
+        zoom_step = self.get_zoom_step()
+        view = self.get_view()
+        return ((pos[0] - view.x)*zoom_step, (pos[1] - view.y)*zoom_step)
+
+
+    def canvas_to_world(self, pos: tuple):
+        zoom_step = self.get_zoom_step()
+        view = self.get_view()
+        return (pos[0]/zoom_step + view.x, pos[1]/zoom_step + view.y)
+
+
+    def clamp(self):
+        # Keep the view inside the world, or centered when the world is smaller than the view
+        view = self.get_view()
+        if view.width >= self.world_width:
+            self.x = self.world_width/2
+        else:
+            self.x = min(max(self.x, view.width/2), self.world_width - view.width/2)
+        if view.height >= self.world_height:
+            self.y = self.world_height/2
+        else:
+            self.y = min(max(self.y, view.height/2), self.world_height - view.height/2)
+
+
+    def pan(self, dx: float, dy: float):
+        """
+        Use this to move the camera by a distance in canvas pixels
+        Returns nothing
+        """
+        zoom_step = self.get_zoom_step()
+        self.x += dx/zoom_step
+        self.y += dy/zoom_step
+        self.clamp()
+
+
+    def zoom_to(self, zoom: float, anchor: tuple = None):
+        """
+        Use this to ease the zoom towards a new value
+        Returns nothing
+
+        zoom = target zoom, clamped to the zoom limits
+        anchor = canvas position that stays over the same world position while zooming, e.g. the mouse. None for the center
+        """
+        self.target_zoom = min(max(zoom, self.min_zoom), self.max_zoom)
+        self.zoom_anchor = anchor
+
+
+    def get_sprite(self,
+                   key: str,
+                   lods: dict,
+                   world_size: float
+                  ) -> pygame.Surface:
+        """
+        Use this to get a sprite scaled for the current zoom step. It is scaled once per step from the closest level of detail
+        Returns Surface
+
+        key = unique name of the sprite
+        lods = dict of native size in pixels: Surface, e.g. a fruit from the 16px and 32px sheets
+        world_size = size of the sprite in world pixels
+        """
+        zoom_step = self.get_zoom_step()
+        if zoom_step in self.sprite_cache:
+            # Re-insert to mark as most recently used
+            sprites = self.sprite_cache.pop(zoom_step)
+        else:
+            sprites = {}
+            if len(self.sprite_cache) >= constants.zoom_cache_levels:
+                del self.sprite_cache[next(iter(self.sprite_cache))]
+        self.sprite_cache[zoom_step] = sprites
+
+        if key not in sprites:
+            canvas_size = max(1, round(world_size*zoom_step))
+            native_size = min((size for size in lods if size >= canvas_size), default=max(lods))
+            sprites[key] = pygame.transform.scale_by(surface=lods[native_size], factor=canvas_size/native_size)
+            self.scale_count += 1
+        return sprites[key]
+
+
+    # Main methods
+
+    def update(self, dt):
+        if self.zoom == self.target_zoom:
+            return
+
+        if self.zoom_anchor is not None:
+            anchor_world_pos = self.canvas_to_world(pos=self.zoom_anchor)
+
+        # Ease in log space so zooming in and out feel the same
+        log_zoom = math.log2(self.zoom)
+        log_target = math.log2(self.target_zoom)
+        log_zoom += (log_target - log_zoom)*min(1, self.zoom_speed*dt)
+        if abs(log_target - log_zoom) < 0.001:
+            self.zoom = self.target_zoom
+        else:
+            self.zoom = 2**log_zoom
+
+        if self.zoom_anchor is not None:
+            zoom_step = self.get_zoom_step()
+            self.x = anchor_world_pos[0] - (self.zoom_anchor[0] - constants.canvas_width/2)/zoom_step
+            self.y = anchor_world_pos[1] - (self.zoom_anchor[1] - constants.canvas_height/2)/zoom_step
+        self.clamp()
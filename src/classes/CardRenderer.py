@@ -0,0 +1,106 @@
+from src.library.essentials import *
+
+class CardRenderer:
+    def __init__(self,
+                 scale: float = 1,
+                 hover_scale: float = 1.25,
+                 angle_step: float = 2,
+                 shadow_offset: tuple = (4, 6),
+                 shadow_color: pygame.Color = (0, 0, 0, 90),
+                 outline_color: pygame.Color = colors.mono_35):
+        """
+        Card faces composited once with their shadow and outline, then kept per quantized angle and hover state.
+        Drawing a card never resamples it after its first use.
+
+        scale = size of the card on the canvas relative to the sprite sheet
+        hover_scale = extra scale of hovered and dragged cards
+        angle_step = rotation in degrees between two cached angles
+        shadow_offset = offset of the drop shadow in canvas pixels
+        shadow_color = RGBA color of the drop shadow
+        outline_color = color of the 1px outline around the card
+        """
+        self.scale = scale
+        self.hover_scale = hover_scale
+        self.angle_step = angle_step
+        self.shadow_offset = shadow_offset
+        self.shadow_color = shadow_color
+        self.outline_color = outline_color
+
+        self.sprite_sheets = {}
+        self.faces = {}
+        self.variants = {}
+        self.render_count = 0
+
+
+    # Class methods
+
+    def get_card_size(self, hovered: bool = False):
+        """
+        Returns (width, height) of an unrotated card on the canvas, without its shadow
+        """
+        scale = self.scale*self.hover_scale if hovered else self.scale
+        return (round(96*scale), round(128*scale))
+
+
+    def quantize_angle(self, angle: float):
+        return round(angle/self.angle_step)*self.angle_step
+
+
+    def get_face(self, sprite_sheet: dict, name: str, hovered: bool = False):
+        """
+        Composite the card art, outline and drop shadow into one surface.
+        The card is centered so rotating the surface rotates the card around its own center.
+        """
+        key = (sprite_sheet['file'], name, hovered)
+        if key not in self.faces:
+            if sprite_sheet['file'] not in self.sprite_sheets:
+                self.sprite_sheets[sprite_sheet['file']] = utils.get_sprite_sheet(sprite_sheet=sprite_sheet, mode='alpha')
+            card = pygame.transform.scale(surface=self.sprite_sheets[sprite_sheet['file']][name], size=self.get_card_size(hovered=hovered))
+            card = utils.effect_outline(surface=card, distance=1, color=self.outline_color, no_corner=True)
+
+            padding = max(abs(self.shadow_offset[0]), abs(self.shadow_offset[1]))
+            face = pygame.Surface(size=(card.get_width() + 2*padding, card.get_height() + 2*padding), flags=pygame.SRCALPHA)
+            utils.blit(dest=face, source=utils.effect_silhouette(surface=card, color=self.shadow_color),
+                       pos=(padding + self.shadow_offset[0], padding + self.shadow_offset[1]))
+            utils.blit(dest=face, source=card, pos=(padding, padding))
+            self.faces[key] = face
+            self.render_count += 1
+        return self.faces[key]
+
+
+    def get_card(self,
+                 sprite_sheet: dict,
+                 name: str,
+                 angle: float = 0,
+                 hovered: bool = False
+                ) -> pygame.Surface:
+        """
+        Use this to get a card ready to draw. Draw it with pos_anchor='center'
+        Returns Surface
+
+        sprite_sheet = cards_path, cards_event or cards_fruit
+        name = name of the card in the sprite sheet
+        angle = rotation in degrees, counterclockwise. Rounded to the nearest angle step
+        hovered = True for the enlarged hover variant
+        """
+        angle = self.quantize_angle(angle=angle)
+        key = (sprite_sheet['file'], name, angle, hovered)
+        if key not in self.variants:
+            face = self.get_face(sprite_sheet=sprite_sheet, name=name, hovered=hovered)
+            if angle == 0:
+                self.variants[key] = face
+            else:
+                self.variants[key] = pygame.transform.rotate(surface=face, angle=angle)
+                self.render_count += 1
+        return self.variants[key]
+
+
+    def prerender(self, sprite_sheet: dict, names: list, angles: list):
+        """
+        Use this while loading to bake every variant a hand can show, so the first fan does not hitch
+        Returns nothing
+        """
+        for name in names:
+            self.get_card(sprite_sheet=sprite_sheet, name=name, hovered=True)
+            for angle in angles:
+                self.get_card(sprite_sheet=sprite_sheet, name=name, angle=angle)
@@ -0,0 +1,108 @@
+from src.library.essentials import *
+import struct
+
+class Deck:
+    # Counts of the draw and discard piles, followed by both piles as raw int16
+    serial_header = struct.Struct('<HH')
+
+    def __init__(self, deck: dict, rng: numpy.random.Generator):
+        """
+        Draw and discard piles of one card type stored as small int arrays of card ids.
+        Snapshots copy the two piles and the generator state, never the card dicts.
+
+        deck = deck dict defined in decks.py
+        rng = generator of the deck's own random stream, see RandomStreams
+        """
+        self.sprite_sheet = deck['sprite_sheet']
+        self.card_names = tuple(deck['cards'])
+        self.card_ids = {name: i for i, name in enumerate(self.card_names)}
+        self.rng = rng
+
+        all_cards = numpy.repeat(numpy.arange(len(self.card_names), dtype=numpy.int16), list(deck['cards'].values()))
+        self.size = len(all_cards)
+        # Both piles are allocated for the whole deck, the top of a pile is at its count - 1
+        self.draw_pile = all_cards
+        self.draw_count = self.size
+        self.discard_pile = numpy.zeros(self.size, dtype=numpy.int16)
+        self.discard_count = 0
+        self.shuffle()
+
+
+    # Class methods
+
+    def shuffle(self):
+        self.rng.shuffle(self.draw_pile[:self.draw_count])
+
+
+    def reshuffle(self):
+        """
+        Use this to put the discard pile under the draw pile and shuffle both
+        Returns nothing
+        """
+        self.draw_pile[self.draw_count:self.draw_count + self.discard_count] = self.discard_pile[:self.discard_count]
+        self.draw_count += self.discard_count
+        self.discard_count = 0
+        self.shuffle()
+
+
+    def draw(self, amount: int = 1):
+        """
+        Use this to take cards from the top of the draw pile, reshuffling the discard pile in when it runs out
+        Returns list of card names, shorter than amount if both piles run out
+        """
+        cards = []
+        for _ in range(amount):
+            if self.draw_count == 0:
+                if self.discard_count == 0:
+                    break
+                self.reshuffle()
+            self.draw_count -= 1
+            cards.append(self.card_names[self.draw_pile[self.draw_count]])
+        return cards
+
+
+    def peek(self, amount: int = 1):
+        """
+        Returns list of the names of the top cards without drawing them, e.g. for the reveal event
+        """
+        top = self.draw_pile[max(0, self.draw_count - amount):self.draw_count]
+        return [self.card_names[card_id] for card_id in top[::-1]]
+
+
+    def discard(self, name: str):
+        if self.draw_count + self.discard_count >= self.size:
+            print('WARNING: discarded card does not belong to the deck')
+            return
+        self.discard_pile[self.discard_count] = self.card_ids[name]
+        self.discard_count += 1
+
+
+    def get_snapshot(self):
+        """
+        Returns tuple of the draw pile, discard pile and generator state, to restore with restore_snapshot
+        """
+        return (self.draw_pile[:self.draw_count].copy(), self.discard_pile[:self.discard_count].copy(), self.rng.bit_generator.state)
+
+
+    def restore_snapshot(self, snapshot: tuple):
+        draw_pile, discard_pile, rng_state = snapshot
+        self.draw_count = len(draw_pile)
+        self.draw_pile[:self.draw_count] = draw_pile
+        self.discard_count = len(discard_pile)
+        self.discard_pile[:self.discard_count] = discard_pile
+        self.rng.bit_generator.state = rng_state
+
+
+    def to_bytes(self):
+        """
+        Returns bytes of both piles for the save file. The generator state is saved with RandomStreams
+        """
+        return (self.serial_header.pack(self.draw_count, self.discard_count)
+                + self.draw_pile[:self.draw_count].tobytes() + self.discard_pile[:self.discard_count].tobytes())
+
+
+    def load_bytes(self, data: bytes):
+        self.draw_count, self.discard_count = self.serial_header.unpack_from(data)
+        piles = numpy.frombuffer(data, dtype=numpy.int16, count=self.draw_count + self.discard_count, offset=self.serial_header.size)
+        self.draw_pile[:self.draw_count] = piles[:self.draw_count]
+        self.discard_pile[:self.discard_count] = piles[self.draw_count:]
@@ -0,0 +1,222 @@
+from src.library.essentials import *
+import queue
+import struct
+import threading
+import time
+import zlib
+
+class FrameCapture:
+    png_signature = b'\x89PNG\r\n\x1a\n'
+
+    def __init__(self,
+                 surface: pygame.Surface,
+                 buffer_count: int = constants.capture_buffer_count,
+                 output_dir: str = os.path.join(dir.data, 'captures')):
+        """
+        Screenshots and video capture of a surface without stalling the frame. The main thread only copies the
+        pixels into one of a ring of preallocated buffers, a worker thread encodes them. When every buffer is
+        still waiting to be encoded the frame is dropped instead of waiting.
+
+        surface = surface to capture, usually the game canvas
+        buffer_count = number of frames that can wait for the worker
+        output_dir = folder screenshots and videos are written to
+        """
+        self.size = surface.get_size()
+        self.pitch = surface.get_pitch()
+        self.bytes_per_pixel = surface.get_bytesize()
+        # Byte offsets of red, green and blue inside a pixel, on a little-endian machine
+        self.channel_offsets = [shift//8 for shift in surface.get_shifts()[:3]]
+        self.output_dir = output_dir
+
+        self.buffers = [numpy.empty((self.size[1], self.pitch), dtype=numpy.uint8) for _ in range(buffer_count)]
+        self.free_buffers = queue.SimpleQueue()
+        for index in range(buffer_count):
+            self.free_buffers.put(index)
+        self.jobs = queue.SimpleQueue()
+        self.worker = None
+
+        self.video_file = None
+        self.video_path = None
+        self.video_frames = 0
+        self.video_framerate = 60
+        self.screenshot_requested = False
+
+        self.captured_frames = 0
+        self.dropped_frames = 0
+        # Running totals, a video capture can run for any number of frames
+        self.copy_time = 0
+        self.max_copy_time = 0
+        self.encoded_frames = 0
+        self.encode_time = 0
+
+
+    # Class methods
+
+    @classmethod
+    def get_png_chunk(cls, chunk_type: bytes, data: bytes):
+        return struct.pack('>I', len(data)) + chunk_type + data + struct.pack('>I', zlib.crc32(chunk_type + data))
+
+
+    @classmethod
+    def encode_png(cls, pixels: numpy.ndarray):
+        """
+        Returns bytes of an RGB PNG. zlib releases the GIL while compressing, so the game keeps running meanwhile
+
+        pixels = uint8 array of shape (height, width, 3)
+        """
+        height, width, _ = pixels.shape
+        # Every row starts with filter type 0
+        rows = numpy.zeros((height, width*3 + 1), dtype=numpy.uint8)
+        rows[:, 1:] = pixels.reshape(height, width*3)
+        return (cls.png_signature
+                + cls.get_png_chunk(chunk_type=b'IHDR', data=struct.pack('>IIBBBBB', width, height, 8, 2, 0, 0, 0))
+                + cls.get_png_chunk(chunk_type=b'IDAT', data=zlib.compress(rows.tobytes(), 6))
+                + cls.get_png_chunk(chunk_type=b'IEND', data=b''))
+
+
+    def get_path(self, extension: str):
+        os.makedirs(self.output_dir, exist_ok=True)
+        return os.path.join(self.output_dir, f"capture_{time.strftime('%Y%m%d_%H%M%S')}_{self.captured_frames}.{extension}")
+
+
+    def get_worker(self):
+        if self.worker is None or not self.worker.is_alive():
+            self.worker = threading.Thread(target=self.work_loop, name='capture', daemon=True)
+            self.worker.start()
+        return self.worker
+
+
+    def grab(self, surface: pygame.Surface):
+        """
+        Use this to copy the surface into a free buffer
+        Returns buffer index, or None if the frame was dropped
+        """
+        try:
+            index = self.free_buffers.get_nowait()
+        except queue.Empty:
+            self.dropped_frames += 1
+            return None
+        start_time = time.perf_counter()
+        self.buffers[index][...] = numpy.frombuffer(surface.get_buffer(), dtype=numpy.uint8).reshape(self.size[1], self.pitch)
+        copy_time = time.perf_counter() - start_time
+        self.copy_time += copy_time
+        self.max_copy_time = max(self.max_copy_time, copy_time)
+        self.captured_frames += 1
+        return index
+
+
+    def request_screenshot(self):
+        """
+        Use this to save the surface as a PNG the next time capture is called
+        Returns nothing
+        """
+        self.screenshot_requested = True
+
+
+    def start_video(self, framerate: int = 60):
+        """
+        Use this to start writing every captured frame to a raw video file, see stop_video for converting it
+        Returns nothing
+
+        framerate = frame rate the video is played back at, usually the game's fps cap
+        """
+        if self.video_file is not None:
+            return
+        self.video_framerate = framerate
+        self.video_path = self.get_path(extension='raw')
+        self.video_file = open(self.video_path, 'wb')
+        self.video_frames = 0
+
+
+    def stop_video(self):
+        if self.video_file is None:
+            return
+        # Closed by the worker after the frames queued before it are written
+        self.jobs.put(('stop', self.video_file))
+        self.get_worker()
+        # Frames are written with the surface's own bytes per pixel, 4 includes an unused padding byte
+        channel_order = 'rgb' if self.channel_offsets == [0, 1, 2] else 'bgr'
+        pixel_format = channel_order + ('24' if self.bytes_per_pixel == 3 else '0')
+        print(f'Capture: {self.video_frames} frames written to {self.video_path}, convert with '
+              f'ffmpeg -f rawvideo -pixel_format {pixel_format} -video_size {self.size[0]}x{self.size[1]} '
+              f'-framerate {self.video_framerate} -i {self.video_path} capture.mp4')
+        self.video_file = None
+
+
+    def capture(self, surface: pygame.Surface):
+        """
+        Use this once per frame after render
+        Returns nothing
+        """
+        if self.video_file is not None:
+            index = self.grab(surface=surface)
+            if index is not None:
+                self.video_frames += 1
+                self.jobs.put(('video', (index, self.video_file)))
+                self.get_worker()
+        if self.screenshot_requested:
+            self.screenshot_requested = False
+            index = self.grab(surface=surface)
+            if index is not None:
+                self.jobs.put(('png', (index, self.get_path(extension='png'))))
+                self.get_worker()
+
+
+    def work_loop(self):
+        while True:
+            job, job_data = self.jobs.get()
+            if job == 'close':
+                return
+            start_time = time.perf_counter()
+            try:
+                if job == 'stop':
+                    job_data.close()
+                elif job == 'video':
+                    index, file = job_data
+                    # Raw pixels are written as they are in memory, including the padding byte
+                    file.write(numpy.ascontiguousarray(self.buffers[index][:, :self.size[0]*self.bytes_per_pixel]))
+                elif job == 'png':
+                    index, path = job_data
+                    pixels = self.buffers[index][:, :self.size[0]*self.bytes_per_pixel].reshape(self.size[1], self.size[0], self.bytes_per_pixel)
+                    with open(path, 'wb') as file:
+                        file.write(self.encode_png(pixels=pixels[:, :, self.channel_offsets]))
+            except OSError as error:
+                print(f'WARNING: capture could not be written, {error}')
+            finally:
+                if job in ('video', 'png'):
+                    self.free_buffers.put(job_data[0])
+                    self.encoded_frames += 1
+                    self.encode_time += time.perf_counter() - start_time
+
+
+    def close(self):
+        """
+        Use this before quitting, waits until every captured frame is written
+        Returns nothing
+        """
+        self.stop_video()
+        if self.worker is not None and self.worker.is_alive():
+            self.jobs.put(('close', None))
+            self.worker.join()
+
+
+    def get_report(self):
+        """
+        Returns dict of captured and dropped frames, and the main thread copy and worker encode times in milliseconds
+        """
+        return {
+            'captured': self.captured_frames,
+            'dropped': self.dropped_frames,
+            'mean_copy': self.copy_time/self.captured_frames*1000 if self.captured_frames else 0,
+            'max_copy': self.max_copy_time*1000,
+            'mean_encode': self.encode_time/self.encoded_frames*1000 if self.encoded_frames else 0,
+        }
+
+
+    def print_report(self):
+        report = self.get_report()
+        if not report['captured'] and not report['dropped']:
+            return
+        print(f"Capture: {report['captured']} frames captured, {report['dropped']} dropped, "
+              f"copy {report['mean_copy']:.2f} ms mean {report['max_copy']:.2f} ms max on the main thread, "
+              f"encode {report['mean_encode']:.2f} ms mean on the worker")
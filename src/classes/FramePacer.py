@@ -0,0 +1,81 @@
+from src.library.essentials import *
+import time
+import statistics
+from collections import deque
+
+class FramePacer:
+    def __init__(self,
+                 fps_cap: int,
+                 precise: bool = True,
+                 spin_threshold: float = 0.002,
+                 sample_size: int = 120):
+        """
+        Replacement for pygame.time.Clock with accurate frame pacing
+
+        fps_cap = frames per second to limit to. 0 means no limit (e.g. when vsync paces presentation)
+        precise = True to sleep most of the frame and spin the rest, False to only sleep like clock.tick
+        spin_threshold = seconds before the target time at which sleeping stops and spinning starts
+        sample_size = number of frame intervals kept for the fps and jitter statistics
+        """
+        self.frame_time = 1/fps_cap if fps_cap > 0 else 0
+        self.precise = precise
+        self.spin_threshold = spin_threshold
+
+        self.intervals = deque(maxlen=sample_size)
+        self.last_tick_time = time.perf_counter()
+        self.next_frame_time = self.last_tick_time + self.frame_time
+
+
+    # Class methods
+
+    def reset(self):
+        """
+        Use this after the loop was blocked (e.g. idle mode) so the pause is not measured as a frame
+        """
+        self.last_tick_time = time.perf_counter()
+        self.next_frame_time = self.last_tick_time + self.frame_time
+
+
+    def get_fps(self):
+        if not self.intervals:
+            return 0
+        return len(self.intervals)/sum(self.intervals)
+
+
+    def get_jitter(self):
+        """
+        Returns standard deviation of recent frame intervals in milliseconds
+        """
+        if len(self.intervals) < 2:
+            return 0
+        return statistics.pstdev(self.intervals)*1000
+
+
+    # Main methods
+
+    def tick(self):
+        """
+        Wait until the next frame is due
+        Returns seconds passed since the previous tick
+        """
+        if self.frame_time:
+            remaining = self.next_frame_time - time.perf_counter()
+            if self.precise:
+                if remaining > self.spin_threshold:
+                    time.sleep(remaining - self.spin_threshold)
+                while time.perf_counter() < self.next_frame_time:
+                    pass
+            elif remaining > 0:
+                time.sleep(remaining)
+
+        now = time.perf_counter()
+        dt = now - self.last_tick_time
+        self.last_tick_time = now
+        self.intervals.append(dt)
+
+        # Schedule from the ideal time to avoid drift, but resync after a long frame instead of rushing to catch up
+        self.next_frame_time += self.frame_time
+        if self.next_frame_time < now:
+            self.next_frame_time = now + self.frame_time
+
+        return dt
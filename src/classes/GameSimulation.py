@@ -0,0 +1,172 @@
+from src.library.essentials import *
+from src.classes.Board import Board
+from src.classes.Deck import Deck
+from src.classes.RandomStreams import RandomStreams
+from src.classes.ScoreEngine import ScoreEngine
+
+class GameSimulation:
+    policies = ('greedy', 'random')
+    deck_names = ('path', 'event', 'fruit')
+
+    def __init__(self,
+                 seed: int,
+                 policy: str = 'greedy',
+                 turns: int = 24,
+                 hand_size: int = 5,
+                 max_growth: int = 3):
+        """
+        One complete game on the models only, without display, audio or assets, for batch balance testing.
+        Every turn a fruit is planted, an event is drawn, the hand is refilled and the player places one path card.
+
+        seed = master seed of the game's random streams
+        policy = 'greedy' plays the card and cell with the best score delta, 'random' any legal placement
+        turns = number of turns in a game
+        hand_size = path cards in hand after refilling
+        max_growth = growth stage fruits stop growing at
+        """
+        if policy not in self.policies:
+            print(f'WARNING: unknown simulation policy {policy}, using greedy')
+            policy = 'greedy'
+        self.seed = seed
+        self.policy = policy
+        self.turns = turns
+        self.hand_size = hand_size
+        self.max_growth = max_growth
+
+        self.random_streams = RandomStreams(seed=seed)
+        self.rng = self.random_streams.get_generator(name='simulation')
+        self.board = Board()
+        self.score_engine = ScoreEngine(board=self.board)
+        self.decks = {name: Deck(deck=getattr(decks, name), rng=self.random_streams.get_generator(name=f'deck_{name}'))
+                      for name in self.deck_names}
+
+        self.hand = []
+        self.turn = 0
+        self.passes = 0
+        self.bonus = 0
+        self.card_usage = {}
+
+
+    # Class methods
+
+    @classmethod
+    def get_card_columns(cls):
+        """
+        Returns list of 'deck:card' names, the order of the card usage columns
+        """
+        return [f'{name}:{card}' for name in cls.deck_names for card in getattr(decks, name)['cards']]
+
+
+    def use_card(self, deck_name: str, card: str):
+        key = f'{deck_name}:{card}'
+        self.card_usage[key] = self.card_usage.get(key, 0) + 1
+        self.decks[deck_name].discard(name=card)
+
+
+    def plant_fruit(self):
+        for card in self.decks['fruit'].draw():
+            free = (self.board.layers[Board.TILE] == 0) & (self.board.layers[Board.FRUIT] == 0)
+            if self.board.entrance is not None:
+                free[self.board.entrance[1], self.board.entrance[0]] = False
+            cells = numpy.argwhere(free)
+            if len(cells):
+                y, x = cells[self.rng.integers(len(cells))].tolist()
+                self.board.set_fruit(x=x, y=y, fruit=card)
+                self.score_engine.path_network.on_fruit_changed(x=x, y=y)
+            self.use_card(deck_name='fruit', card=card)
+
+
+    def play_event(self):
+        for card in self.decks['event'].draw():
+            # Only the point card changes the score model so far, the others are counted for usage
+            if card == 'point':
+                self.bonus += 1
+                self.score_engine.set_modifiers(bonus=self.bonus)
+            self.use_card(deck_name='event', card=card)
+
+
+    def choose_move(self):
+        """
+        Returns (card, x, y, tile type, rotation) for the policy, or None if no card in hand can be placed
+        """
+        moves = []
+        best_delta = -1
+        for card in dict.fromkeys(self.hand):
+            tile_type, rotation = Board.get_card_tile(name=card)
+            deltas = self.score_engine.preview_scores(tile_type=tile_type, rotation=rotation)
+            if self.policy == 'greedy':
+                card_best = deltas.max()
+                if card_best < 0 or card_best < best_delta:
+                    continue
+                if card_best > best_delta:
+                    moves = []
+                    best_delta = card_best
+                cells = numpy.argwhere(deltas == card_best)
+            else:
+                cells = numpy.argwhere(deltas >= 0)
+            moves.extend((card, x, y, tile_type, rotation) for y, x in cells.tolist())
+        if not moves:
+            return None
+        return moves[self.rng.integers(len(moves))]
+
+
+    def play_turn(self):
+        self.plant_fruit()
+        self.play_event()
+        self.hand += self.decks['path'].draw(amount=self.hand_size - len(self.hand))
+
+        move = self.choose_move()
+        if move is None:
+            # Nothing fits, the oldest card is thrown away
+            self.passes += 1
+            if self.hand:
+                self.decks['path'].discard(name=self.hand.pop(0))
+        else:
+            card, x, y, tile_type, rotation = move
+            self.score_engine.apply_move(move=(x, y, tile_type, rotation))
+            self.hand.remove(card)
+            self.use_card(deck_name='path', card=card)
+
+        self.board.grow_fruits(amount=1, max_growth=self.max_growth)
+        self.score_engine.refresh()
+        self.turn += 1
+
+
+    def run(self):
+        """
+        Use this to play the whole game
+        Returns dict with the seed, final score, turns played, passes and card usage
+        """
+        while self.turn < self.turns:
+            self.play_turn()
+        return {
+            'seed': self.seed,
+            'score': self.score_engine.score,
+            'turns': self.turn,
+            'passes': self.passes,
+            'card_usage': self.card_usage,
+        }
+
+
+def simulate_games(seeds: list, policy: str = 'greedy', turns: int = 24):
+    """
+    Use this as a process pool task. Plays one game per seed
+    Returns dict of column name: numpy array, card usage as a (games, cards) array in get_card_columns order
+    """
+    card_columns = GameSimulation.get_card_columns()
+    card_index = {name: i for i, name in enumerate(card_columns)}
+    columns = {
+        'seed': numpy.array(seeds, dtype=numpy.int64),
+        'score': numpy.zeros(len(seeds), dtype=numpy.int32),
+        'turns': numpy.zeros(len(seeds), dtype=numpy.int16),
+        'passes': numpy.zeros(len(seeds), dtype=numpy.int16),
+        'card_usage': numpy.zeros((len(seeds), len(card_columns)), dtype=numpy.int16),
+    }
+    for i, seed in enumerate(seeds):
+        result = GameSimulation(seed=seed, policy=policy, turns=turns).run()
+        columns['score'][i] = result['score']
+        columns['turns'][i] = result['turns']
+        columns['passes'][i] = result['passes']
+        for card, count in result['card_usage'].items():
+            columns['card_usage'][i, card_index[card]] = count
+    return columns
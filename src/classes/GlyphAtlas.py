@@ -0,0 +1,173 @@
+from src.library.essentials import *
+
+class GlyphAtlas:
+    # Atlases shared by every caller, see get_atlas
+    atlases = {}
+
+    def __init__(self,
+                 font: dict,
+                 size: str,
+                 color: pygame.Color,
+                 long_shadow: bool = True,
+                 long_shadow_direction = 'bottom',
+                 long_shadow_color: pygame.Color = None,
+                 outline: bool = True,
+                 outline_color: pygame.Color = colors.mono_35,
+                 charset: str = ''.join(chr(i) for i in range(32, 127))):
+        """
+        Pre-rendered glyphs of one font style, for text that changes every frame
+        Takes the same style arguments as utils.get_text
+
+        charset = characters to bake up front. Other characters are added the first time they are drawn
+        """
+        self.text_font = pygame.font.Font(os.path.join(dir.fonts, font['file']), font['sizes'][size])
+        self.color = color
+        self.long_shadow = long_shadow
+        self.long_shadow_direction = long_shadow_direction
+        self.long_shadow_color = long_shadow_color
+        if self.long_shadow and self.long_shadow_color is None:
+            self.long_shadow_color = utils.color_darken(color=color, factor=0.5)
+        self.outline = outline
+        self.outline_color = outline_color
+        self.deco_distance = utils.get_font_deco_distance(font=font, size=size)
+        self.outline_distance = self.deco_distance if self.outline else 0
+
+        self.advances = {}
+        self.kerning = {}
+        self.glyph_areas = {}
+        self.charset = ''
+        self.build_atlas(charset=charset)
+
+
+    # Class methods
+
+    @classmethod
+    def get_atlas(cls, font: dict, size: str, color: pygame.Color, **kwargs):
+        """
+        Use this to get the shared atlas for a font style, baking it on first use
+        Returns GlyphAtlas
+        """
+        key = f'{font["file"]}:{size}:{tuple(color)}:{sorted(kwargs.items())}'
+        if key not in cls.atlases:
+            cls.atlases[key] = cls(font=font, size=size, color=color, **kwargs)
+        return cls.atlases[key]
+
+
+    def build_atlas(self, charset: str):
+        """
+        Bake every glyph into three layers stacked in one surface: outline, long shadow and body.
+        Drawing all outlines, then all shadows, then all bodies reproduces utils.get_text for the whole string.
+        """
+        self.charset = ''.join(dict.fromkeys(self.charset + charset))
+
+        glyph_layers = []
+        for char in self.charset:
+            body = self.text_font.render(text=char, antialias=False, color=self.color)
+            if self.long_shadow:
+                body_with_shadow = utils.effect_long_shadow(surface=body, direction=self.long_shadow_direction,
+                                                            distance=self.deco_distance, color=self.long_shadow_color)
+                shadow = utils.effect_silhouette(surface=body_with_shadow, color=self.long_shadow_color)
+            else:
+                body_with_shadow = body
+                shadow = None
+            if self.outline:
+                outline = utils.effect_outline(surface=utils.effect_silhouette(surface=body_with_shadow, color=self.outline_color),
+                                               distance=self.outline_distance, color=self.outline_color)
+            else:
+                outline = None
+            glyph_layers.append((char, outline, shadow, body))
+            self.advances[char] = body.get_width()
+            self.shadow_padding = (body_with_shadow.get_width() - body.get_width(), body_with_shadow.get_height() - body.get_height())
+
+        self.cell_width = max(self.advances.values()) + 3*self.deco_distance
+        self.cell_height = self.text_font.get_height() + 3*self.deco_distance
+        self.atlas = pygame.Surface(size=(self.cell_width*len(glyph_layers), self.cell_height*3), flags=pygame.SRCALPHA)
+        for i, (char, outline, shadow, body) in enumerate(glyph_layers):
+            areas = []
+            for row, layer in enumerate((outline, shadow, body)):
+                if layer is None:
+                    areas.append(None)
+                    continue
+                pos = (i*self.cell_width, row*self.cell_height)
+                utils.blit(dest=self.atlas, source=layer, pos=pos)
+                areas.append(pygame.Rect(pos, layer.get_size()))
+            self.glyph_areas[char] = areas
+
+
+    def get_kerning(self, left: str, right: str):
+        pair = left + right
+        if pair not in self.kerning:
+            self.kerning[pair] = self.text_font.size(pair)[0] - self.advances[left] - self.advances[right]
+        return self.kerning[pair]
+
+
+    def get_size(self, text: str):
+        """
+        Returns (width, height) of the text as utils.get_text would render it
+        """
+        missing = ''.join(char for char in text if char not in self.advances)
+        if missing:
+            self.build_atlas(charset=missing)
+
+        width = 0
+        previous = None
+        for char in text:
+            if previous is not None:
+                width += self.get_kerning(left=previous, right=char)
+            width += self.advances[char]
+            previous = char
+
+        width += self.shadow_padding[0] + 2*self.outline_distance
+        height = self.text_font.get_height() + self.shadow_padding[1] + 2*self.outline_distance
+        return (width, height)
+
+
+    # Main methods
+
+    def render(self,
+               dest: pygame.Surface,
+               text: str,
+               pos: tuple = (0, 0),
+               pos_anchor: str = 'topleft'
+              ) -> pygame.Rect:
+        """
+        Use this to draw text with a single batched blit
+        Returns Rect covering the drawn text
+
+        dest = surface to draw to
+        text = text to draw
+        pos = position on the dest surface
+        pos_anchor = center, topleft, topright, bottomleft, bottomright, midtop, midbottom, midleft, midright
+        """
+        rect = pygame.Rect((0, 0), self.get_size(text=text))
+        setattr(rect, pos_anchor, pos)
+
+        outline_blits = []
+        shadow_blits = []
+        body_blits = []
+        x = rect.x
+        previous = None
+        for char in text:
+            if previous is not None:
+                x += self.get_kerning(left=previous, right=char)
+            outline_area, shadow_area, body_area = self.glyph_areas[char]
+            if outline_area is not None:
+                outline_blits.append((self.atlas, (x, rect.y), outline_area))
+            if shadow_area is not None:
+                shadow_blits.append((self.atlas, (x + self.outline_distance, rect.y + self.outline_distance), shadow_area))
+            body_blits.append((self.atlas, (x + self.outline_distance, rect.y + self.outline_distance), body_area))
+            x += self.advances[char]
+            previous = char
+
+        dest.blits(blit_sequence=outline_blits + shadow_blits + body_blits, doreturn=False)
+        return rect
+
+
+    def get_text(self, text: str) -> pygame.Surface:
+        """
+        Use this instead of utils.get_text when the same style is rendered often
+        Returns Surface
+        """
+        surface = pygame.Surface(size=self.get_size(text=text), flags=pygame.SRCALPHA)
+        self.render(dest=surface, text=text)
+        return surface
@@ -0,0 +1,195 @@
+from src.library.essentials import *
+from src.classes.CardRenderer import CardRenderer
+
+class HandLayout:
+    def __init__(self,
+                 game: object,
+                 card_renderer: CardRenderer,
+                 pos: tuple = (constants.canvas_width/2, constants.canvas_height - 30),
+                 max_width: int = 760,
+                 card_spacing: int = 84,
+                 fan_angle: float = 4,
+                 fan_drop: float = 5,
+                 play_line: int = constants.canvas_height - 220,
+                 move_speed: float = 14):
+        """
+        Fanned hand of cards. Card targets are recomputed only when the hand changes,
+        every frame only eases the cards towards them and draws the cached variants from the CardRenderer.
+
+        pos = canvas position of the center of the hand
+        max_width = width the card centers are squeezed into when the hand is large
+        card_spacing = distance between card centers when the hand fits
+        fan_angle = rotation in degrees between two neighbouring cards
+        fan_drop = how far the outer cards sink, grows with the square of the distance to the center
+        play_line = canvas y above which a dropped card counts as played
+        move_speed = how fast cards ease towards their targets, higher is faster
+        """
+        self.game = game
+        self.card_renderer = card_renderer
+        self.pos = pos
+        self.max_width = max_width
+        self.card_spacing = card_spacing
+        self.fan_angle = fan_angle
+        self.fan_drop = fan_drop
+        self.play_line = play_line
+        self.move_speed = move_speed
+
+        self.cards = []
+        self.hovered_card = None
+        self.dragged_card = None
+        self.drag_offset = (0, 0)
+        self.played_card = None
+
+        self.layout_dirty = True
+        self.layout_count = 0
+        self.moving = False
+
+
+    # Class methods
+
+    def add_card(self, sprite_sheet: dict, name: str, pos: tuple = (constants.canvas_width + 100, constants.canvas_height)):
+        """
+        Use this to draw a card into the hand
+        Returns the card dict
+
+        pos = canvas position the card slides in from
+        """
+        card = {
+            'sprite_sheet': sprite_sheet,
+            'name': name,
+            'x': pos[0],
+            'y': pos[1],
+            'angle': 0,
+            'target': (pos[0], pos[1], 0),
+        }
+        self.cards.append(card)
+        self.layout_dirty = True
+        return card
+
+
+    def remove_card(self, card: dict):
+        self.cards.remove(card)
+        if self.hovered_card is card:
+            self.hovered_card = None
+        if self.dragged_card is card:
+            self.dragged_card = None
+        self.layout_dirty = True
+
+
+    def move_card(self, card: dict, index: int):
+        self.cards.remove(card)
+        self.cards.insert(index, card)
+        self.layout_dirty = True
+
+
+    def compute_layout(self):
+        spacing = self.card_spacing
+        if len(self.cards) > 1:
+            spacing = min(self.card_spacing, self.max_width/(len(self.cards) - 1))
+
+        for i, card in enumerate(self.cards):
+            offset = i - (len(self.cards) - 1)/2
+            card['target'] = (self.pos[0] + offset*spacing,
+                              self.pos[1] + offset**2*self.fan_drop,
+                              -offset*self.fan_angle)
+
+        self.layout_dirty = False
+        self.layout_count += 1
+
+
+    def get_mouse_pos(self):
+        mouse_x, mouse_y = pygame.mouse.get_pos()
+        return (mouse_x*constants.canvas_width/self.game.screen_width, mouse_y*constants.canvas_height/self.game.screen_height)
+
+
+    def get_card_at(self, pos: tuple):
+        """
+        Returns the topmost card under a canvas position, or None
+        """
+        width, height = self.card_renderer.get_card_size()
+        for card in reversed(self.cards):
+            # Rotate the position into the card's own axes
+            angle = math.radians(self.card_renderer.quantize_angle(angle=card['angle']))
+            dx = pos[0] - card['x']
+            dy = pos[1] - card['y']
+            local_x = dx*math.cos(angle) - dy*math.sin(angle)
+            local_y = dx*math.sin(angle) + dy*math.cos(angle)
+            if abs(local_x) <= width/2 and abs(local_y) <= height/2:
+                return card
+        return None
+
+
+    def is_animating(self):
+        return self.layout_dirty or self.moving or self.dragged_card is not None
+
+
+    # Main methods
+
+    def update(self, dt, events):
+        if self.played_card is not None:
+            self.played_card = None
+        if self.layout_dirty:
+            self.compute_layout()
+
+        mouse_pos = self.get_mouse_pos()
+        for event in events:
+            if event.type == pygame.MOUSEBUTTONDOWN and event.button == 1 and self.hovered_card is not None:
+                self.dragged_card = self.hovered_card
+                self.drag_offset = (mouse_pos[0] - self.dragged_card['x'], mouse_pos[1] - self.dragged_card['y'])
+            elif event.type == pygame.MOUSEBUTTONUP and event.button == 1 and self.dragged_card is not None:
+                card = self.dragged_card
+                self.dragged_card = None
+                if mouse_pos[1] < self.play_line:
+                    self.remove_card(card=card)
+                    self.played_card = card
+                else:
+                    index = sum(1 for other in self.cards if other is not card and other['target'][0] < card['x'])
+                    if index != self.cards.index(card):
+                        self.move_card(card=card, index=index)
+                if self.layout_dirty:
+                    self.compute_layout()
+
+        if self.dragged_card is None:
+            self.hovered_card = self.get_card_at(pos=mouse_pos)
+        else:
+            self.hovered_card = self.dragged_card
+        if self.hovered_card is not None:
+            utils.set_cursor(cursor=cursors.hand)
+
+        step = min(1, self.move_speed*dt)
+        self.moving = False
+        for card in self.cards:
+            if card is self.dragged_card:
+                card['x'] = mouse_pos[0] - self.drag_offset[0]
+                card['y'] = mouse_pos[1] - self.drag_offset[1]
+                card['angle'] = 0
+                continue
+
+            target_x, target_y, target_angle = card['target']
+            if card is self.hovered_card:
+                # Lift the hovered card upright so it is fully readable
+                target_y = constants.canvas_height - self.card_renderer.get_card_size(hovered=True)[1]/2 - 10
+                target_angle = 0
+            card['x'] += (target_x - card['x'])*step
+            card['y'] += (target_y - card['y'])*step
+            card['angle'] += (target_angle - card['angle'])*step
+            if abs(target_x - card['x']) < 0.5 and abs(target_y - card['y']) < 0.5 and abs(target_angle - card['angle']) < 0.1:
+                card['x'], card['y'], card['angle'] = target_x, target_y, target_angle
+            else:
+                self.moving = True
+
+
+    def render(self, canvas):
+        blit_sequence = []
+        top_blit = None
+        for card in self.cards:
+            surface = self.card_renderer.get_card(sprite_sheet=card['sprite_sheet'], name=card['name'],
+                                                  angle=card['angle'], hovered=card is self.hovered_card)
+            blit = (surface, surface.get_rect(center=(round(card['x']), round(card['y']))))
+            if card is self.hovered_card:
+                top_blit = blit
+            else:
+                blit_sequence.append(blit)
+        if top_blit is not None:
+            blit_sequence.append(top_blit)
+        canvas.blits(blit_sequence=blit_sequence, doreturn=False)
@@ -0,0 +1,131 @@
+from src.library.essentials import *
+from src.classes.Tracer import Tracer
+import collections
+import time
+
+class HitchDetector:
+    def __init__(self,
+                 budget: float = constants.hitch_budget,
+                 log_size: int = constants.hitch_log_size,
+                 log_path: str = os.path.join(dir.data, 'hitches.log')):
+        """
+        Flags frames whose update and render take longer than the budget and keeps what ran during them:
+        the slowest spans by self time, asset loads, file access and state transitions.
+        Spans come from Tracer, which is enabled with a small event buffer if it is not tracing already.
+        Every hitch is appended to the log file as it happens, so the log survives a crash and keeps earlier sessions.
+
+        budget = milliseconds of update and render a frame may take
+        log_size = most recent hitches kept, in memory and in the log file
+        log_path = file hitches are appended to, one json object per line
+        """
+        self.budget = budget
+        self.log_path = log_path
+        self.log_size = log_size
+        self.hitches = collections.deque(maxlen=log_size)
+        self.start_time = time.perf_counter()
+        self.frame = 0
+        self.frame_start = None
+        self.frame_event_count = 0
+        # Totals over every hitch, not only the ones still in the log
+        self.hitch_count = 0
+        self.worst_hitch = None
+        self.offender_times = collections.Counter()
+        self.offender_counts = collections.Counter()
+
+        if not Tracer.enabled:
+            Tracer.enable(max_events=8192)
+
+
+    # Class methods
+
+    @classmethod
+    def get_self_times(cls, events: list):
+        """
+        Returns Counter of span name: milliseconds spent in the span itself, not in spans nested inside it
+        """
+        self_times = collections.Counter()
+        threads = collections.defaultdict(list)
+        for name, category, start, duration, thread_id, args in events:
+            if duration is not None:
+                threads[thread_id].append((start, -duration, name))
+        for spans in threads.values():
+            # Sorted by start, a parent before the children it contains
+            stack = []
+            for start, duration, name in sorted(spans):
+                end = start - duration
+                while stack and stack[-1][0] <= start:
+                    stack.pop()
+                self_times[name] -= duration/1e6
+                if stack:
+                    self_times[stack[-1][1]] += duration/1e6
+                stack.append((end, name))
+        return self_times
+
+
+    def begin_frame(self):
+        self.frame_start = time.perf_counter_ns()
+        self.frame_event_count = Tracer.event_count
+
+
+    def end_frame(self):
+        """
+        Use this after the frame's render
+        Returns hitch dict if the frame was over budget, otherwise None
+        """
+        if self.frame_start is None:
+            return None
+        self.frame += 1
+        duration = (time.perf_counter_ns() - self.frame_start)/1e6
+        self.frame_start = None
+        if duration <= self.budget:
+            return None
+
+        events = Tracer.get_events_since(event_count=self.frame_event_count)
+        self_times = self.get_self_times(events=events)
+        hitch = {
+            'frame': self.frame,
+            'time': round(time.perf_counter() - self.start_time, 3),
+            'duration': round(duration, 2),
+            'spans': [(name, round(self_time, 2)) for name, self_time in self_times.most_common(5)],
+            'assets': [name for name, category, *_ in events if category == 'asset'],
+            'io': [name for name, category, *_ in events if category == 'io'],
+            'transitions': [name for name, category, *_ in events if category == 'transition'],
+        }
+        self.hitches.append(hitch)
+        self.append_log(hitch=hitch)
+        self.hitch_count += 1
+        if self.worst_hitch is None or duration > self.worst_hitch['duration']:
+            self.worst_hitch = hitch
+        self.offender_times.update(self_times)
+        if self_times:
+            self.offender_counts[self_times.most_common(1)[0][0]] += 1
+        return hitch
+
+
+    def append_log(self, hitch: dict):
+        """
+        Use this to add a hitch to the log file, which is trimmed to the last log_size hitches
+        Returns nothing
+        """
+        try:
+            with open(self.log_path, 'a+') as file:
+                file.write(json.dumps(hitch) + '\n')
+                file.seek(0)
+                lines = file.readlines()
+                if len(lines) > self.log_size:
+                    file.seek(0)
+                    file.truncate()
+                    file.writelines(lines[-self.log_size:])
+        except OSError:
+            print(f'WARNING: hitch log could not be written to {self.log_path}')
+
+
+    def print_summary(self):
+        print(f'Hitches: {self.hitch_count} of {self.frame} frames over {self.budget} ms')
+        if not self.hitch_count:
+            return
+        worst = self.worst_hitch
+        print(f"  worst: {worst['duration']} ms at frame {worst['frame']}, {', '.join(name for name, _ in worst['spans'][:3])}")
+        print('  top offenders by time spent in hitch frames:')
+        for name, self_time in self.offender_times.most_common(5):
+            print(f'    {name}: {self_time:.1f} ms, slowest span in {self.offender_counts[name]} hitches')
@@ -0,0 +1,110 @@
+from src.library.essentials import *
+import gc
+import time
+
+class MemoryPolicy:
+    def __init__(self,
+                 young_threshold: int = 700,
+                 full_interval: int = 10,
+                 max_defer: float = constants.gc_max_defer):
+        """
+        Keeps full garbage collections out of animated frames. Young collections stay automatic, full ones only
+        run at state transitions, idle frames, or once they have been put off for max_defer seconds.
+        Objects still alive after loading are frozen so full collections no longer scan the loaded assets.
+
+        young_threshold = allocations before a generation 0 collection, as gc.set_threshold
+        full_interval = generation 1 collections after which a full collection is due, the default of gc
+        max_defer = seconds a due full collection may wait for an idle frame or transition
+        """
+        self.full_interval = full_interval
+        self.max_defer = max_defer
+        # Generation 2 never fills up on its own, collect_full is the only way it gets collected
+        gc.set_threshold(young_threshold, full_interval, 2**31 - 1)
+
+        self.due_time = None
+        self.collection_start = 0
+        self.pause_times = {0: [], 1: [], 2: []}
+        self.max_pause = 0
+        self.forced_collections = 0
+        gc.callbacks.append(self.on_collection)
+
+
+    # Class methods
+
+    def on_collection(self, phase: str, info: dict):
+        if phase == 'start':
+            self.collection_start = time.perf_counter()
+        else:
+            pause = time.perf_counter() - self.collection_start
+            self.pause_times[info['generation']].append(pause)
+            self.max_pause = max(self.max_pause, pause)
+
+
+    def is_full_collection_due(self):
+        return gc.get_count()[2] >= self.full_interval
+
+
+    def collect_full(self, freeze: bool = False):
+        """
+        Use this where a pause goes unnoticed
+        Returns nothing
+
+        freeze = move everything that survives into the permanent generation, e.g. after loading assets
+        """
+        gc.collect()
+        if freeze:
+            gc.freeze()
+        self.due_time = None
+
+
+    def on_transition(self):
+        """
+        Use this when a state is entered or exited, the frame is already different from the last one
+        Returns nothing
+        """
+        self.collect_full(freeze=True)
+
+
+    def on_idle(self):
+        """
+        Use this before the game loop blocks on input
+        Returns nothing
+        """
+        if self.is_full_collection_due():
+            self.collect_full()
+
+
+    def update(self):
+        """
+        Use this once per frame, after render
+        Returns nothing
+        """
+        if not self.is_full_collection_due():
+            return
+        if self.due_time is None:
+            self.due_time = time.perf_counter()
+        elif time.perf_counter() - self.due_time > self.max_defer:
+            # Never idle, e.g. with idle mode off, so memory is still reclaimed now and then
+            self.forced_collections += 1
+            self.collect_full()
+
+
+    def get_report(self):
+        """
+        Returns dict of collection counts and pauses in milliseconds, per generation
+        """
+        return {
+            'collections': {generation: len(pauses) for generation, pauses in self.pause_times.items()},
+            'mean_pause': {generation: sum(pauses)/len(pauses)*1000 if pauses else 0 for generation, pauses in self.pause_times.items()},
+            'max_pause': self.max_pause*1000,
+            'forced_collections': self.forced_collections,
+            'frozen_objects': gc.get_freeze_count(),
+        }
+
+
+    def print_report(self):
+        report = self.get_report()
+        print(f"GC: {report['frozen_objects']} frozen objects, max pause {report['max_pause']:.2f} ms, "
+              f"{report['forced_collections']} full collections forced mid-game")
+        for generation, count in report['collections'].items():
+            print(f"  generation {generation}: {count} collections, mean {report['mean_pause'][generation]:.3f} ms")
@@ -0,0 +1,232 @@
+from src.library.essentials import *
+from src.classes.Board import Board
+from src.classes.ScoreEngine import ScoreEngine
+from concurrent.futures import BrokenExecutor, ProcessPoolExecutor
+from multiprocessing import shared_memory
+import time
+
+def run_rollouts(shared_name: str,
+                 shape: tuple,
+                 moves: list,
+                 draw_pile: list,
+                 modifiers: dict,
+                 time_budget: float,
+                 rollout_depth: int,
+                 seed: int):
+    """
+    Worker side of MonteCarloAI. Runs rollouts from a board in shared memory until the time budget runs out
+    Returns dict of resulting board key: [visits, total score] and list of (move, resulting board key)
+
+    moves = list of (card name, x, y) this worker explores
+    draw_pile = path card names that can still be drawn
+    """
+    rng = numpy.random.Generator(numpy.random.PCG64(seed))
+    shared = shared_memory.SharedMemory(name=shared_name)
+    try:
+        # The board is tiny, copying it lets the shared block be released right away
+        root = Board(layers=numpy.ndarray(shape, dtype=numpy.uint8, buffer=shared.buf).copy())
+    finally:
+        shared.close()
+
+    # Moves are grouped by the board they lead to, e.g. a path and a strike card with the same shape
+    move_keys = []
+    table = {}
+    children = {}
+    for card, x, y in moves:
+        child = root.snapshot()
+        tile_type, rotation = Board.get_card_tile(name=card)
+        child.set_tile(x=x, y=y, tile_type=tile_type, rotation=rotation)
+        key = child.get_key()
+        move_keys.append(((card, x, y), key))
+        if key not in table:
+            table[key] = [0, 0]
+            children[key] = child
+    if not table:
+        return table, move_keys
+
+    deadline = time.perf_counter() + time_budget
+    keys = list(table)
+    draw_pile = numpy.array([Board.get_card_tile(name=card) for card in draw_pile], dtype=numpy.int8).reshape(-1, 2)
+    while time.perf_counter() < deadline:
+        # UCB1 over the distinct positions, every position is tried once first
+        total_visits = sum(stats[0] for stats in table.values())
+        key = max(keys, key=lambda key: float('inf') if table[key][0] == 0 else
+                  table[key][1]/table[key][0] + 2*math.sqrt(math.log(total_visits)/table[key][0]))
+
+        board = children[key].snapshot()
+        score_engine = ScoreEngine(board=board)
+        score_engine.set_modifiers(**modifiers)
+        for tile_type, rotation in draw_pile[rng.permutation(len(draw_pile))[:rollout_depth]].tolist():
+            deltas = score_engine.preview_scores(tile_type=tile_type, rotation=rotation)
+            cells = numpy.argwhere(deltas >= 0)
+            if len(cells) == 0:
+                continue
+            # Mostly greedy rollouts, with some random play so the bot does not only see its own best line
+            if rng.random() < 0.7:
+                cells = numpy.argwhere(deltas == deltas.max())
+            y, x = cells[rng.integers(len(cells))].tolist()
+            score_engine.apply_move(move=(x, y, tile_type, rotation))
+
+        table[key][0] += 1
+        table[key][1] += score_engine.score
+    return table, move_keys
+
+
+class MonteCarloAI:
+    def __init__(self,
+                 time_budget: float = 1,
+                 rollout_depth: int = 6,
+                 workers: int = None,
+                 table_size: int = 256):
+        """
+        Move search for hints and bots, run in worker processes so the frame never waits for it.
+        request_move starts a search and poll returns its result once the workers finish, without blocking.
+
+        time_budget = seconds each worker spends on rollouts
+        rollout_depth = number of future path cards played in each rollout
+        workers = number of worker processes, None for the number of CPUs
+        table_size = number of finished searches kept, so asking twice for the same position is instant
+        """
+        self.time_budget = time_budget
+        self.rollout_depth = rollout_depth
+        self.workers = workers or os.cpu_count() or 1
+        self.table_size = table_size
+
+        self.executor = None
+        self.futures = []
+        self.shared = None
+        self.request_key = None
+        self.fallback_move = None
+        self.result = None
+        self.transposition_table = {}
+
+
+    # Class methods
+
+    def get_executor(self):
+        # Started on first use, spawning processes is too slow for the first frame
+        if self.executor is None:
+            self.executor = ProcessPoolExecutor(max_workers=self.workers)
+        return self.executor
+
+
+    def is_busy(self):
+        return bool(self.futures)
+
+
+    def request_move(self,
+                     board: Board,
+                     hand: list,
+                     draw_pile: list,
+                     modifiers: dict = None,
+                     seed: int = 0):
+        """
+        Use this to start looking for the best path card to play. Replaces any search in progress
+        Returns nothing
+
+        board = current board
+        hand = path card names the player can play
+        draw_pile = path card names that can still be drawn, e.g. deck.peek(deck.draw_count)
+        modifiers = kwargs of ScoreEngine.set_modifiers
+        seed = seed of the rollouts, e.g. from the 'ai' random stream, so a search is reproducible
+        """
+        self.cancel()
+        modifiers = modifiers or {}
+        self.request_key = (board.get_key(), tuple(sorted(hand)), tuple(sorted(draw_pile)), tuple(sorted(modifiers.items(), key=str)))
+        if self.request_key in self.transposition_table:
+            self.result = self.transposition_table[self.request_key]
+            return
+
+        moves = []
+        for card in dict.fromkeys(hand):
+            tile_type, rotation = Board.get_card_tile(name=card)
+            for y, x in numpy.argwhere(board.get_placement_mask(tile_type=tile_type, rotation=rotation)).tolist():
+                moves.append((card, x, y))
+        if not moves:
+            self.result = {'move': None, 'expected_score': None, 'rollouts': 0}
+            self.transposition_table[self.request_key] = self.result
+            return
+
+        self.fallback_move = moves[0]
+        # Workers attach to the board by name instead of receiving a pickled copy each
+        self.shared = shared_memory.SharedMemory(create=True, size=board.layers.nbytes)
+        numpy.ndarray(board.layers.shape, dtype=numpy.uint8, buffer=self.shared.buf)[:] = board.layers
+
+        executor = self.get_executor()
+        chunks = [moves[i::self.workers] for i in range(min(self.workers, len(moves)))]
+        self.futures = [executor.submit(run_rollouts, self.shared.name, board.layers.shape, chunk, list(draw_pile),
+                                        modifiers, self.time_budget, self.rollout_depth, seed + i)
+                        for i, chunk in enumerate(chunks)]
+
+
+    def poll(self):
+        """
+        Use this every update while a search runs. Never blocks
+        Returns dict with the move as (card name, x, y), its expected score and the number of rollouts, or None while searching.
+        If the workers fail, the move is the first legal one with no expected score
+        """
+        if self.result is not None:
+            result, self.result = self.result, None
+            return result
+        if not self.futures or not all(future.done() for future in self.futures):
+            return None
+
+        table = {}
+        move_keys = []
+        try:
+            for future in self.futures:
+                worker_table, worker_move_keys = future.result()
+                move_keys.extend(worker_move_keys)
+                for key, (visits, total) in worker_table.items():
+                    stats = table.setdefault(key, [0, 0])
+                    stats[0] += visits
+                    stats[1] += total
+        except Exception as error:
+            # e.g. BrokenProcessPool after a worker was killed, the next search starts a new pool
+            print(f'WARNING: AI search failed, playing the first legal move instead, {error!r}')
+            if isinstance(error, BrokenExecutor):
+                self.executor.shutdown(wait=False, cancel_futures=True)
+                self.executor = None
+            return {'move': self.fallback_move, 'expected_score': None, 'rollouts': 0}
+        finally:
+            self.release()
+
+        best_move = None
+        best_score = None
+        for move, key in move_keys:
+            visits, total = table[key]
+            if visits and (best_score is None or total/visits > best_score):
+                best_move = move
+                best_score = total/visits
+        result = {'move': best_move, 'expected_score': best_score, 'rollouts': sum(stats[0] for stats in table.values())}
+
+        if len(self.transposition_table) >= self.table_size:
+            del self.transposition_table[next(iter(self.transposition_table))]
+        self.transposition_table[self.request_key] = result
+        return result
+
+
+    def release(self):
+        self.futures = []
+        if self.shared is not None:
+            self.shared.close()
+            self.shared.unlink()
+            self.shared = None
+
+
+    def cancel(self):
+        """
+        Use this to drop a search in progress, e.g. when the player moves first. Running workers finish their budget in the background
+        Returns nothing
+        """
+        for future in self.futures:
+            future.cancel()
+        self.release()
+        self.result = None
+
+
+    def shutdown(self):
+        self.cancel()
+        if self.executor is not None:
+            self.executor.shutdown(wait=False, cancel_futures=True)
+            self.executor = None
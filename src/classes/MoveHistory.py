@@ -0,0 +1,177 @@
+from src.library.essentials import *
+from src.classes.Board import Board
+
+class MoveHistory:
+    def __init__(self, board: Board, decks: dict = None, node: tuple = None):
+        """
+        Undo and redo of moves, storing only the cells and deck slots each move changed.
+        Moves are linked to the move before them, so branches share everything before the point they split at, e.g. AI search positions.
+
+        board = Board the moves are played on
+        decks = dict of deck name: Deck played alongside the board
+        node = last move of an existing history, see branch
+        """
+        self.board = board
+        self.decks = decks or {}
+        # (previous node, move, delta, number of moves), None before the first move
+        self.node = node
+        self.redo_nodes = []
+
+        # Private copies of the last committed state, compared against to find what a move changed
+        self.base_layers = board.layers.reshape(Board.LAYER_COUNT, -1).copy()
+        self.base_decks = {name: self.get_deck_state(deck=deck) for name, deck in self.decks.items()}
+
+
+    # Class methods
+
+    @classmethod
+    def get_deck_state(cls, deck: object):
+        return {
+            'draw_pile': deck.draw_pile.copy(),
+            'discard_pile': deck.discard_pile.copy(),
+            'counts': (deck.draw_count, deck.discard_count),
+            'rng': deck.rng.bit_generator.state,
+        }
+
+
+    @classmethod
+    def get_changes(cls, base: numpy.ndarray, current: numpy.ndarray):
+        """
+        Returns (indices, values before, values after) of the columns that differ, or None if nothing changed
+        """
+        changed = base != current
+        if changed.ndim > 1:
+            changed = changed.any(axis=0)
+        indices = numpy.flatnonzero(changed)
+        if len(indices) == 0:
+            return None
+        return indices.astype(numpy.int32), base[..., indices], current[..., indices]
+
+
+    def get_layers(self):
+        return self.board.layers.reshape(Board.LAYER_COUNT, -1)
+
+
+    def commit(self, move: object = None):
+        """
+        Use this after each move, once the board and decks are updated. Clears the redo moves
+        Returns number of board cells the move changed
+
+        move = any label of the move, e.g. (card name, x, y), returned by get_moves
+        """
+        layers = self.get_layers()
+        board_changes = self.get_changes(base=self.base_layers, current=layers)
+        if board_changes is not None:
+            self.base_layers[:, board_changes[0]] = board_changes[2]
+
+        deck_changes = {}
+        for name, deck in self.decks.items():
+            base = self.base_decks[name]
+            state = {
+                'draw_pile': self.get_changes(base=base['draw_pile'], current=deck.draw_pile),
+                'discard_pile': self.get_changes(base=base['discard_pile'], current=deck.discard_pile),
+                'counts': (base['counts'], (deck.draw_count, deck.discard_count)),
+                'rng': (base['rng'], deck.rng.bit_generator.state),
+            }
+            for pile in ('draw_pile', 'discard_pile'):
+                if state[pile] is not None:
+                    base[pile][state[pile][0]] = state[pile][2]
+            base['counts'] = state['counts'][1]
+            base['rng'] = state['rng'][1]
+            deck_changes[name] = state
+
+        depth = self.node[3] + 1 if self.node is not None else 1
+        self.node = (self.node, move, (board_changes, deck_changes), depth)
+        self.redo_nodes.clear()
+        return len(board_changes[0]) if board_changes is not None else 0
+
+
+    def apply_delta(self, delta: tuple, undo: bool):
+        """
+        Use this to write one move's values, before it for undo or after it for redo
+        Returns list of (x, y) cells that changed, e.g. to update the PathNetwork and ScoreEngine
+        """
+        board_changes, deck_changes = delta
+        side = 1 if undo else 2
+        cells = []
+        if board_changes is not None:
+            self.board.make_writable()
+            self.get_layers()[:, board_changes[0]] = board_changes[side]
+            self.base_layers[:, board_changes[0]] = board_changes[side]
+            cells = [(node % self.board.columns, node // self.board.columns) for node in board_changes[0].tolist()]
+
+        for name, state in deck_changes.items():
+            # A branch without decks still undoes the board part of moves made before it
+            if name not in self.decks:
+                continue
+            deck = self.decks[name]
+            base = self.base_decks[name]
+            for pile in ('draw_pile', 'discard_pile'):
+                if state[pile] is not None:
+                    getattr(deck, pile)[state[pile][0]] = state[pile][side]
+                    base[pile][state[pile][0]] = state[pile][side]
+            deck.draw_count, deck.discard_count = base['counts'] = state['counts'][side - 1]
+            deck.rng.bit_generator.state = base['rng'] = state['rng'][side - 1]
+        return cells
+
+
+    def can_undo(self):
+        return self.node is not None
+
+
+    def can_redo(self):
+        return bool(self.redo_nodes)
+
+
+    def undo(self):
+        """
+        Use this to take back the last move
+        Returns list of (x, y) cells that changed, empty if there is nothing to undo
+        """
+        if self.node is None:
+            return []
+        cells = self.apply_delta(delta=self.node[2], undo=True)
+        self.redo_nodes.append(self.node)
+        self.node = self.node[0]
+        return cells
+
+
+    def redo(self):
+        """
+        Use this to play an undone move again
+        Returns list of (x, y) cells that changed, empty if there is nothing to redo
+        """
+        if not self.redo_nodes:
+            return []
+        self.node = self.redo_nodes.pop()
+        return self.apply_delta(delta=self.node[2], undo=False)
+
+
+    def get_depth(self):
+        """
+        Returns number of moves played, not counting undone ones
+        """
+        return self.node[3] if self.node is not None else 0
+
+
+    def get_moves(self):
+        """
+        Returns list of the labels of the moves played, oldest first
+        """
+        moves = []
+        node = self.node
+        while node is not None:
+            moves.append(node[1])
+            node = node[0]
+        return moves[::-1]
+
+
+    def branch(self, decks: dict = None):
+        """
+        Use this to try moves from the current position without touching this history, e.g. in an AI search.
+        The board is shared copy-on-write and the moves so far are shared, not copied
+        Returns MoveHistory
+
+        decks = copies of the decks for the branch, None to branch the board only
+        """
+        return MoveHistory(board=self.board.snapshot(), decks=decks, node=self.node)
@@ -0,0 +1,174 @@
+from src.library.essentials import *
+from src.classes.Tracer import Tracer
+import queue
+import threading
+
+class MusicManager:
+    def __init__(self,
+                 music_channels: tuple = (1, 2),
+                 music_volume: float = 1,
+                 ambience_volume: float = 1,
+                 crossfade: int = constants.music_crossfade):
+        """
+        Soundtracks and ambience without blocking the frame. Soundtracks are decoded by a worker thread and
+        played on two channels, so a new soundtrack fades in on one while the old one fades out on the other.
+        An intro is followed by its loop through the channel queue, which the mixer switches to on the same sample.
+        Ambience is long, so it is streamed from disk by pygame.mixer.music instead of being decoded up front.
+
+        music_channels = the two pygame.mixer.Channel numbers soundtracks alternate between, reserved so sounds never take them
+        music_volume = volume of soundtracks
+        ambience_volume = volume of the ambience stream
+        crossfade = milliseconds soundtracks fade over when one replaces another
+        """
+        self.channels = [pygame.mixer.Channel(i) for i in music_channels]
+        self.crossfade = crossfade
+        for channel in self.channels:
+            channel.set_volume(music_volume)
+        pygame.mixer.music.set_volume(ambience_volume)
+        # A queued sound still plays after stop and fadeout, replacing it with silence is how a queue is cleared
+        self.silence = pygame.mixer.Sound(buffer=bytes(4))
+
+        # Name: decoded Sound, written by the worker
+        self.tracks = {}
+        self.requested = set()
+        self.requests = queue.SimpleQueue()
+        self.worker = None
+
+        self.active = 0
+        self.playlist = None
+        self.pending = None
+        self.ambience = None
+
+
+    # Class methods
+
+    def get_worker(self):
+        if self.worker is None or not self.worker.is_alive():
+            self.worker = threading.Thread(target=self.decode_loop, name='music', daemon=True)
+            self.worker.start()
+        return self.worker
+
+
+    def decode_loop(self):
+        while True:
+            name = self.requests.get()
+            try:
+                with Tracer.span(name=f'decode {name}', category='io'):
+                    # Decoding releases the GIL, the game keeps running meanwhile
+                    self.tracks[name] = pygame.mixer.Sound(file=os.path.join(dir.music, name))
+            except (pygame.error, OSError) as error:
+                print(f'WARNING: music {name} could not be decoded, {error}')
+                self.requested.discard(name)
+
+
+    def prefetch(self, names: list):
+        """
+        Use this ahead of a state that plays these tracks, e.g. while its parent state is shown
+        Returns nothing
+        """
+        for name in names:
+            if name is not None and name not in self.requested:
+                self.requested.add(name)
+                self.requests.put(name)
+        self.get_worker()
+
+
+    def is_ready(self, names: list):
+        return all(name is None or name in self.tracks for name in names)
+
+
+    def play_music(self, intro: str, loop: str = None, fade_ms: int = None):
+        """
+        Use this to switch soundtracks. Starts as soon as the tracks are decoded, the current soundtrack keeps playing until then
+        Returns nothing
+
+        intro = track played once first, e.g. 'menu_intro.ogg'
+        loop = track repeated after the intro, None to stop after the intro
+        fade_ms = milliseconds of crossfade with the current soundtrack, defaults to crossfade
+        """
+        if (intro, loop) == self.playlist and self.pending is None:
+            return
+        self.pending = (intro, loop, self.crossfade if fade_ms is None else fade_ms)
+        self.prefetch(names=[intro, loop])
+        self.start_pending()
+
+
+    def stop_channel(self, channel: pygame.mixer.Channel, fade_ms: int = 0):
+        channel.queue(self.silence)
+        if fade_ms:
+            channel.fadeout(fade_ms)
+        else:
+            channel.stop()
+
+
+    def stop_music(self, fade_ms: int = None):
+        """
+        Use this to fade out the current soundtrack
+        Returns nothing
+        """
+        self.pending = None
+        self.playlist = None
+        for channel in self.channels:
+            if channel.get_busy():
+                self.stop_channel(channel=channel, fade_ms=self.crossfade if fade_ms is None else fade_ms)
+
+
+    def start_pending(self):
+        if self.pending is None or not self.is_ready(names=self.pending[:2]):
+            return
+        intro, loop, fade_ms = self.pending
+        self.pending = None
+        old_channel = self.channels[self.active]
+        if old_channel.get_busy():
+            self.stop_channel(channel=old_channel, fade_ms=fade_ms)
+        else:
+            fade_ms = 0
+
+        self.active = 1 - self.active
+        channel = self.channels[self.active]
+        channel.play(self.tracks[intro], fade_ms=fade_ms)
+        channel.queue(self.tracks[loop] if loop is not None else self.silence)
+        self.playlist = (intro, loop)
+
+
+    def play_ambience(self, name: str, fade_ms: int = 3000):
+        """
+        Use this to start a looping ambience stream, replacing the current one
+        Returns nothing
+        """
+        self.ambience = name
+        # Only the stream header is read here, the mixer reads the rest while playing
+        pygame.mixer.music.load(os.path.join(dir.music, name))
+        pygame.mixer.music.play(loops=-1, fade_ms=fade_ms)
+
+
+    def restart(self):
+        """
+        Use this after the mixer is reopened, which stops every channel. The format stays the same, so decoded tracks are still valid
+        Returns nothing
+        """
+        if self.playlist is not None and self.playlist[1] is not None:
+            channel = self.channels[self.active]
+            channel.play(self.tracks[self.playlist[1]])
+            channel.queue(self.tracks[self.playlist[1]])
+        if self.ambience is not None:
+            self.play_ambience(name=self.ambience, fade_ms=0)
+
+
+    def update(self):
+        """
+        Use this once per frame, it also runs while idle since the idle wait times out
+        Returns nothing
+        """
+        self.start_pending()
+        if self.playlist is None or self.playlist[1] is None:
+            return
+        channel = self.channels[self.active]
+        # The queued loop started playing, queue it again so it repeats without a gap
+        if channel.get_queue() is None:
+            loop = self.tracks[self.playlist[1]]
+            if channel.get_busy():
+                channel.queue(loop)
+            else:
+                channel.play(loop)
+                channel.queue(loop)
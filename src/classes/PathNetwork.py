@@ -0,0 +1,184 @@
+from src.library.essentials import *
+from src.classes.Board import Board
+
+class PathNetwork:
+    def __init__(self, board: Board):
+        """
+        Connected path networks of a Board, kept up to date with union-find as tiles change.
+        Placing a tile only merges its neighbours, removing one only rebuilds the network it belonged to.
+
+        board = board to index. Call on_tile_changed / on_fruit_changed after every change to it
+        """
+        self.board = board
+        self.cell_count = board.rows*board.columns
+        # The entrance is an extra node after the cells
+        self.entrance_node = self.cell_count
+
+        self.parent = list(range(self.cell_count + 1))
+        self.size = [1]*(self.cell_count + 1)
+        self.members = {node: [node] for node in range(self.cell_count + 1)}
+        self.fruits = {node: set() for node in range(self.cell_count + 1)}
+        self.is_path = [False]*self.cell_count
+
+        for y in range(board.rows):
+            for x in range(board.columns):
+                if board.layers[Board.TILE, y, x] != 0:
+                    self.add_path(node=y*board.columns + x)
+
+
+    # Class methods
+
+    def get_node_connections(self, node: int):
+        return int(Board.connections[self.board.layers[Board.TILE].flat[node], self.board.layers[Board.ROTATION].flat[node]])
+
+
+    def get_neighbour(self, node: int, direction: int):
+        """
+        Returns the node next to a cell in a direction, or None past the edge
+        """
+        dx, dy = Board.directions[direction]
+        x = node % self.board.columns + dx
+        y = node // self.board.columns + dy
+        if 0 <= x < self.board.columns and 0 <= y < self.board.rows:
+            return y*self.board.columns + x
+        return None
+
+
+    def find(self, node: int):
+        root = node
+        while self.parent[root] != root:
+            root = self.parent[root]
+        # Path compression
+        while self.parent[node] != root:
+            self.parent[node], node = root, self.parent[node]
+        return root
+
+
+    def union(self, a: int, b: int):
+        root_a = self.find(node=a)
+        root_b = self.find(node=b)
+        if root_a == root_b:
+            return
+        if self.size[root_a] < self.size[root_b]:
+            root_a, root_b = root_b, root_a
+        # Union by size, the smaller network's lists are merged into the larger one's
+        self.parent[root_b] = root_a
+        self.size[root_a] += self.size[root_b]
+        self.members[root_a].extend(self.members.pop(root_b))
+        self.fruits[root_a] |= self.fruits.pop(root_b)
+
+
+    def add_path(self, node: int):
+        self.is_path[node] = True
+        connections = self.get_node_connections(node=node)
+        for direction in Board.directions:
+            if not connections & direction:
+                continue
+            neighbour = self.get_neighbour(node=node, direction=direction)
+            if neighbour is None:
+                continue
+            if self.is_path[neighbour]:
+                if self.get_node_connections(node=neighbour) & Board.opposite(direction=direction):
+                    self.union(a=node, b=neighbour)
+            elif self.board.layers[Board.FRUIT].flat[neighbour] != 0:
+                self.fruits[self.find(node=node)].add(neighbour)
+
+        entrance = self.board.entrance
+        if entrance is not None and node == entrance[1]*self.board.columns + entrance[0] and connections & Board.N:
+            self.union(a=node, b=self.entrance_node)
+
+
+    def rebuild(self, root: int, excluded: int):
+        """
+        Recompute the network of a root from scratch, without one node. Only touches that network's members
+        """
+        members = self.members.pop(root)
+        self.fruits.pop(root)
+        for node in members:
+            self.parent[node] = node
+            self.size[node] = 1
+            self.members[node] = [node]
+            self.fruits[node] = set()
+        for node in members:
+            if node != excluded and node != self.entrance_node:
+                self.add_path(node=node)
+
+
+    def on_tile_changed(self, x: int, y: int):
+        """
+        Use this after placing, removing or replacing a tile on the board
+        Returns nothing
+        """
+        node = y*self.board.columns + x
+        if self.is_path[node]:
+            self.is_path[node] = False
+            self.rebuild(root=self.find(node=node), excluded=node)
+        if self.board.layers[Board.TILE, y, x] != 0:
+            self.add_path(node=node)
+
+
+    def on_fruit_changed(self, x: int, y: int):
+        """
+        Use this after planting or removing a fruit on the board
+        Returns nothing
+        """
+        node = y*self.board.columns + x
+        has_fruit = self.board.layers[Board.FRUIT, y, x] != 0
+        for direction in Board.directions:
+            neighbour = self.get_neighbour(node=node, direction=direction)
+            if neighbour is None or not self.is_path[neighbour]:
+                continue
+            if self.get_node_connections(node=neighbour) & Board.opposite(direction=direction):
+                fruits = self.fruits[self.find(node=neighbour)]
+                if has_fruit:
+                    fruits.add(node)
+                else:
+                    fruits.discard(node)
+
+
+    def get_node(self, cell):
+        """
+        Returns the node of an (x, y) cell, or the entrance node for None
+        """
+        if cell is None:
+            return self.entrance_node
+        return cell[1]*self.board.columns + cell[0]
+
+
+    def is_connected(self, a: tuple, b: tuple = None):
+        """
+        Use this to check if two path cells are on the same network
+        Returns bool
+
+        a, b = (x, y) of path cells. b = None for the entrance
+        """
+        node_a = self.get_node(cell=a)
+        node_b = self.get_node(cell=b)
+        for node in (node_a, node_b):
+            if node != self.entrance_node and not self.is_path[node]:
+                return False
+        return self.find(node=node_a) == self.find(node=node_b)
+
+
+    def get_reached_fruits(self, cell: tuple = None):
+        """
+        Use this to find the fruits a network leads into
+        Returns set of (x, y) fruit cells
+
+        cell = (x, y) of any path cell of the network, None for the network connected to the entrance
+        """
+        node = self.get_node(cell=cell)
+        if node != self.entrance_node and not self.is_path[node]:
+            return set()
+        return {(fruit % self.board.columns, fruit // self.board.columns) for fruit in self.fruits[self.find(node=node)]}
+
+
+    def get_network(self, cell: tuple = None):
+        """
+        Returns set of (x, y) path cells on the same network as a cell, None for the entrance network
+        """
+        node = self.get_node(cell=cell)
+        if node != self.entrance_node and not self.is_path[node]:
+            return set()
+        return {(member % self.board.columns, member // self.board.columns)
+                for member in self.members[self.find(node=node)] if member != self.entrance_node}
@@ -0,0 +1,41 @@
+from src.library.essentials import *
+import zlib
+
+class RandomStreams:
+    def __init__(self, seed: int = None):
+        """
+        Independent seeded random generators, one per subsystem, e.g. 'deck_path' or 'visual'.
+        Each stream only depends on the seed and its own name, so drawing from one never shifts another,
+        and game outcomes stay the same whatever the frame rate or the number of particles.
+
+        seed = master seed, None for a random one. Keep it to reproduce a game
+        """
+        if seed is None:
+            seed = int(numpy.random.SeedSequence().entropy % 2**63)
+        self.seed = seed
+        self.generators = {}
+
+
+    # Class methods
+
+    def get_generator(self, name: str) -> numpy.random.Generator:
+        """
+        Use this to get the generator of a subsystem, created on first use
+        Returns numpy Generator
+        """
+        if name not in self.generators:
+            seed_sequence = numpy.random.SeedSequence(entropy=self.seed, spawn_key=(zlib.crc32(name.encode()),))
+            self.generators[name] = numpy.random.Generator(numpy.random.PCG64(seed_sequence))
+        return self.generators[name]
+
+
+    def get_state(self):
+        """
+        Returns dict of stream name: generator state, to restore with set_state
+        """
+        return {name: generator.bit_generator.state for name, generator in self.generators.items()}
+
+
+    def set_state(self, state: dict):
+        for name, generator_state in state.items():
+            self.get_generator(name=name).bit_generator.state = generator_state
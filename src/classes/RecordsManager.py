@@ -0,0 +1,163 @@
+from src.library.essentials import *
+from src.classes.Tracer import Tracer
+import queue
+import sqlite3
+import threading
+import time
+
+class RecordsManager:
+    schema_version = 1
+    columns = ('id', 'score', 'date', 'seed', 'turns', 'duration')
+    # Sort orders of the records screen: column and direction. Ties are broken by the row id in the same direction,
+    # so descending orders list the newest first and ascending orders the oldest first
+    orders = {
+        'score': ('score', 'DESC'),
+        'date': ('date', 'DESC'),
+        'seed': ('seed', 'ASC'),
+    }
+
+    def __init__(self, path: str = os.path.join(dir.data, 'records.db'), batch_size: int = 256):
+        """
+        Finished games stored in a local SQLite database with an index per sort order.
+        Games are added on a background thread so the end of a game never waits for the disk,
+        and pages are read with keyset queries so every page costs the same however many games are stored.
+
+        path = database file
+        batch_size = most records written in one transaction
+        """
+        self.path = path
+        self.batch_size = batch_size
+        self.connection = self.connect()
+        self.connection.executescript(f'''
+            CREATE TABLE IF NOT EXISTS records (
+                id INTEGER PRIMARY KEY,
+                score INTEGER NOT NULL,
+                date REAL NOT NULL,
+                seed INTEGER NOT NULL,
+                turns INTEGER NOT NULL,
+                duration REAL NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS records_score ON records (score);
+            CREATE INDEX IF NOT EXISTS records_date ON records (date);
+            CREATE INDEX IF NOT EXISTS records_seed ON records (seed);
+            PRAGMA user_version = {self.schema_version};
+        ''')
+
+        self.write_queue = queue.Queue()
+        self.write_thread = None
+
+
+    # Class methods
+
+    def connect(self):
+        # Write-ahead logging lets the screen read while a game is being written
+        connection = sqlite3.connect(self.path)
+        connection.execute('PRAGMA journal_mode = WAL')
+        connection.execute('PRAGMA synchronous = NORMAL')
+        return connection
+
+
+    def add_record(self, score: int, seed: int, turns: int, duration: float, date: float = None):
+        """
+        Use this when a game ends. Only queues the record, it is written on the background thread
+        Returns nothing
+
+        score = final score
+        seed = master seed of the game's RandomStreams
+        turns = number of turns played
+        duration = seconds the game took
+        date = unix time the game ended, now if None
+        """
+        self.write_queue.put((score, date if date is not None else time.time(), seed, turns, duration))
+        if self.write_thread is None or not self.write_thread.is_alive():
+            self.write_thread = threading.Thread(target=self.write_loop, name='records', daemon=True)
+            self.write_thread.start()
+
+
+    def write_loop(self):
+        connection = self.connect()
+        try:
+            while True:
+                records = [self.write_queue.get()]
+                if records[0] is None:
+                    return
+                # Records that queued up meanwhile share one transaction
+                while len(records) < self.batch_size and not self.write_queue.empty():
+                    records.append(self.write_queue.get())
+                stop = records[-1] is None
+                if stop:
+                    records.pop()
+                try:
+                    with Tracer.span(name='RecordsManager.insert', category='io', args={'records': len(records)}), connection:
+                        connection.executemany('INSERT INTO records (score, date, seed, turns, duration) VALUES (?, ?, ?, ?, ?)', records)
+                except sqlite3.Error as error:
+                    print(f'WARNING: records could not be saved, {error}')
+                if stop:
+                    return
+        finally:
+            connection.close()
+
+
+    def flush(self):
+        """
+        Use this before reading records that were just added, or before quitting
+        Returns nothing
+        """
+        if self.write_thread is not None and self.write_thread.is_alive():
+            self.write_queue.put(None)
+            self.write_thread.join()
+
+
+    def get_row(self, row: tuple):
+        return dict(zip(self.columns, row))
+
+
+    def get_page(self, order: str = 'score', limit: int = 10, after: dict = None, seed: int = None):
+        """
+        Use this for the top records or one page of the records screen
+        Returns list of record dicts
+
+        order = key of orders
+        limit = number of records
+        after = last record of the previous page, None for the first page
+        seed = only records of games played with this seed
+        """
+        column, direction = self.orders[order]
+        comparison = '<' if direction == 'DESC' else '>'
+        conditions = []
+        parameters = []
+        if seed is not None:
+            conditions.append('seed = ?')
+            parameters.append(seed)
+        if after is not None:
+            # Row values continue from the previous page through the index instead of skipping rows with OFFSET
+            conditions.append(f'({column}, id) {comparison} (?, ?)')
+            parameters += [after[column], after['id']]
+        where = f'WHERE {" AND ".join(conditions)}' if conditions else ''
+        rows = self.connection.execute(f'SELECT {", ".join(self.columns)} FROM records {where} '
+                                       f'ORDER BY {column} {direction}, id {direction} LIMIT ?', parameters + [limit])
+        return [self.get_row(row=row) for row in rows]
+
+
+    def get_top(self, order: str = 'score', limit: int = 10):
+        """
+        Returns list of the first limit record dicts in an order, e.g. the high scores
+        """
+        return self.get_page(order=order, limit=limit)
+
+
+    def get_best_by_seed(self, seed: int):
+        """
+        Returns best record dict of a seed, or None if it was never played
+        """
+        records = self.get_page(order='score', limit=1, seed=seed)
+        return records[0] if records else None
+
+
+    def get_count(self):
+        return self.connection.execute('SELECT COUNT(*) FROM records').fetchone()[0]
+
+
+    def close(self):
+        self.flush()
+        self.connection.close()
@@ -0,0 +1,120 @@
+from src.library.essentials import *
+from src.classes.ReplayRecorder import ReplayRecorder
+import statistics
+import time
+import zlib
+
+class ReplayPlayer:
+    def __init__(self, path: str):
+        """
+        Feeds a log written by ReplayRecorder back into Game.update and Game.render and times every frame.
+        Create the Game with this replay's seed and settings before running it.
+
+        path = file written by ReplayRecorder
+        """
+        with open(path, 'rb') as file:
+            self.data = file.read()
+
+        magic, version, self.seed, settings_length = ReplayRecorder.file_header.unpack_from(self.data)
+        if magic != ReplayRecorder.magic or version != ReplayRecorder.version:
+            raise ValueError(f'{path} is not a replay of this version')
+        offset = ReplayRecorder.file_header.size
+        self.settings = json.loads(self.data[offset:offset + settings_length])
+        self.frames_offset = offset + settings_length
+
+
+    # Class methods
+
+    def get_frames(self):
+        """
+        Returns generator of (dt, mouse position, events) for every recorded frame
+        """
+        offset = self.frames_offset
+        while offset < len(self.data):
+            dt, mouse_x, mouse_y, event_count = ReplayRecorder.frame_header.unpack_from(self.data, offset)
+            offset += ReplayRecorder.frame_header.size
+            events = []
+            for _ in range(event_count):
+                event_type, attributes_length = ReplayRecorder.event_header.unpack_from(self.data, offset)
+                offset += ReplayRecorder.event_header.size
+                attributes = json.loads(self.data[offset:offset + attributes_length])
+                offset += attributes_length
+                # Quitting ends the replay instead of closing the game
+                if event_type != pygame.QUIT:
+                    events.append(pygame.event.Event(event_type, {key: tuple(value) if isinstance(value, list) else value
+                                                                  for key, value in attributes.items()}))
+            yield dt, (mouse_x, mouse_y), events
+
+
+    def run(self, game: object, realtime: bool = False, checksums: bool = False):
+        """
+        Use this to replay the whole log
+        Returns dict with the frame times in seconds and, if enabled, a CRC32 of the canvas after every frame
+
+        game = Game created with this replay's seed and settings
+        realtime = True to wait out each frame's recorded dt, False to run as fast as possible
+        checksums = True to checksum the canvas after every frame, outside the timed part
+        """
+        frame_times = []
+        frame_checksums = []
+        next_frame_time = time.perf_counter()
+        for dt, mouse_pos, events in self.get_frames():
+            if realtime:
+                next_frame_time += dt
+                remaining = next_frame_time - time.perf_counter()
+                if remaining > 0:
+                    time.sleep(remaining)
+            # Keep the window responsive, a real quit stops the replay early
+            if any(event.type == pygame.QUIT for event in pygame.event.get()):
+                break
+            pygame.mouse.set_pos(mouse_pos)
+
+            start_time = time.perf_counter()
+            game.update(dt=dt, events=events)
+            game.render()
+            frame_times.append(time.perf_counter() - start_time)
+
+            if checksums:
+                frame_checksums.append(zlib.crc32(pygame.image.tobytes(game.canvas, 'RGB')))
+
+        return {
+            'frame_times': frame_times,
+            'checksums': frame_checksums,
+            'frame_budget': 1/(self.settings['fps_cap'] + 1),
+        }
+
+
+    @classmethod
+    def get_report(cls, result: dict):
+        """
+        Returns dict of frame time statistics in milliseconds
+        """
+        frame_times = sorted(result['frame_times'])
+        if not frame_times:
+            return {'frames': 0}
+        percentile = lambda p: frame_times[min(len(frame_times) - 1, int(p*len(frame_times)))]*1000
+        return {
+            'frames': len(frame_times),
+            'total': sum(frame_times)*1000,
+            'mean': statistics.fmean(frame_times)*1000,
+            'p50': percentile(0.5),
+            'p95': percentile(0.95),
+            'p99': percentile(0.99),
+            'max': frame_times[-1]*1000,
+            'over_budget': sum(1 for frame_time in frame_times if frame_time > result['frame_budget']),
+            'checksum': zlib.crc32(numpy.array(result['checksums'], dtype=numpy.uint32).tobytes()) if result['checksums'] else None,
+        }
+
+
+    @classmethod
+    def print_report(cls, result: dict):
+        report = cls.get_report(result=result)
+        if not report['frames']:
+            print('Replay: no frames')
+            return
+        print(f"Replay: {report['frames']} frames in {report['total']:.0f} ms")
+        print(f"  mean {report['mean']:.2f} ms, p50 {report['p50']:.2f} ms, p95 {report['p95']:.2f} ms, "
+              f"p99 {report['p99']:.2f} ms, max {report['max']:.2f} ms")
+        print(f"  {report['over_budget']} frames over the {result['frame_budget']*1000:.2f} ms budget")
+        if report['checksum'] is not None:
+            print(f"  checksum of all frames {report['checksum']:08x}")
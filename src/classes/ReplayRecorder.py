@@ -0,0 +1,57 @@
+from src.library.essentials import *
+import struct
+
+class ReplayRecorder:
+    magic = b'GGRP'
+    version = 1
+    # magic, version, master seed, length of the settings json
+    file_header = struct.Struct('<4sBQI')
+    # dt, mouse x, mouse y, number of events
+    frame_header = struct.Struct('<dhhH')
+    # event type, length of the attributes json
+    event_header = struct.Struct('<IH')
+
+    def __init__(self, path: str, seed: int, settings: dict):
+        """
+        Binary log of every frame's dt, mouse position and events, replayed by ReplayPlayer.
+        The master seed and settings are stored up front so the replayed game makes the same random draws.
+
+        path = file to write
+        seed = master seed of the game's RandomStreams
+        settings = game settings at the start of the recording
+        """
+        self.path = path
+        self.frame_count = 0
+        settings_json = json.dumps(settings).encode()
+        self.file = open(path, 'wb')
+        self.file.write(self.file_header.pack(self.magic, self.version, seed, len(settings_json)))
+        self.file.write(settings_json)
+
+
+    # Class methods
+
+    @classmethod
+    def encode_event(cls, event: pygame.event.Event):
+        # Only plain values are kept, e.g. a window object cannot be replayed anyway
+        attributes = {key: value for key, value in event.dict.items()
+                      if isinstance(value, (int, float, str, bool, tuple, list)) or value is None}
+        attributes_json = json.dumps(attributes, separators=(',', ':')).encode()
+        return cls.event_header.pack(event.type, len(attributes_json)) + attributes_json
+
+
+    def record(self, dt: float, events: list):
+        """
+        Use this once per frame, before the frame's update
+        Returns nothing
+        """
+        mouse_x, mouse_y = pygame.mouse.get_pos()
+        self.file.write(self.frame_header.pack(dt, mouse_x, mouse_y, len(events)))
+        for event in events:
+            self.file.write(self.encode_event(event=event))
+        self.frame_count += 1
+
+
+    def close(self):
+        if not self.file.closed:
+            self.file.close()
+            print(f'Replay: {self.frame_count} frames saved to {self.path}')
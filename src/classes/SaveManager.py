@@ -0,0 +1,188 @@
+from src.library.essentials import *
+from src.classes.Tracer import Tracer
+import mmap
+import struct
+import threading
+import zlib
+
+class SaveManager:
+    magic = b'GGSV'
+    version = 1
+    # magic, version, number of sections
+    file_header = struct.Struct('<4sHH')
+    # name, offset, length, crc32 of the payload
+    section_entry = struct.Struct('<16sQQI')
+
+    def __init__(self, path: str = os.path.join(dir.data, 'save.bin')):
+        """
+        Versioned binary save file made of named sections, e.g. the raw board layers and the deck piles.
+        Only sections that changed are serialized again, the file is written on a background thread
+        to a temporary file and renamed over the old one, and loading maps the file instead of reading it.
+
+        path = save file
+        """
+        self.path = path
+        self.sections = {}
+        self.write_thread = None
+        self.pending_sections = None
+        self.lock = threading.Lock()
+        self.mapping = None
+        self.write_count = 0
+
+
+    # Class methods
+
+    def set_section(self, name: str, payload: bytes):
+        """
+        Use this to replace one section. The others keep the bytes they were last given
+        Returns nothing
+        """
+        self.sections[name] = bytes(payload)
+
+
+    def save_game(self,
+                  board: object = None,
+                  decks: dict = None,
+                  random_streams: object = None,
+                  meta: dict = None):
+        """
+        Use this to autosave, e.g. at the end of a turn. Pass only what changed since the last save
+        Returns nothing
+
+        board = Board
+        decks = dict of deck name: Deck
+        random_streams = RandomStreams
+        meta = small json-compatible dict, e.g. the turn, score and hand
+        """
+        if board is not None:
+            self.set_section(name='board', payload=board.to_bytes())
+        for name, deck in (decks or {}).items():
+            self.set_section(name=f'deck_{name}', payload=deck.to_bytes())
+        if random_streams is not None:
+            self.set_section(name='rng', payload=json.dumps(random_streams.get_state()).encode())
+        if meta is not None:
+            self.set_section(name='meta', payload=json.dumps(meta).encode())
+        self.save_async()
+
+
+    def save_async(self):
+        """
+        Use this to write the current sections without blocking. Saves requested while writing are merged into one write
+        Returns nothing
+        """
+        with self.lock:
+            self.pending_sections = dict(self.sections)
+            # Cleared by the writer under the same lock once it finds nothing pending, so a running writer always picks this up
+            if self.write_thread is not None:
+                return
+            self.write_thread = threading.Thread(target=self.write_loop, name='autosave', daemon=True)
+            self.write_thread.start()
+
+
+    def write_loop(self):
+        while True:
+            with self.lock:
+                sections = self.pending_sections
+                self.pending_sections = None
+                if sections is None:
+                    self.write_thread = None
+                    return
+            # The writer must keep running until it clears write_thread, or no later save would start one
+            try:
+                self.write_file(sections=sections)
+            except OSError as error:
+                print(f'WARNING: save file could not be written, {error}')
+
+
+    @Tracer.trace(category='io')
+    def write_file(self, sections: dict):
+        offset = self.file_header.size + self.section_entry.size*len(sections)
+        entries = []
+        for name, payload in sections.items():
+            entries.append(self.section_entry.pack(name.encode(), offset, len(payload), zlib.crc32(payload)))
+            offset += len(payload)
+
+        temp_path = self.path + '.tmp'
+        with open(temp_path, 'wb') as file:
+            file.write(self.file_header.pack(self.magic, self.version, len(sections)))
+            file.writelines(entries)
+            file.writelines(sections.values())
+            file.flush()
+            os.fsync(file.fileno())
+        try:
+            # The old save stays intact until the new one is complete
+            os.replace(temp_path, self.path)
+            self.write_count += 1
+        except OSError:
+            print('WARNING: save file is in use, keeping the previous save')
+
+
+    def wait(self):
+        """
+        Use this before quitting so the last save is not lost
+        Returns nothing
+        """
+        write_thread = self.write_thread
+        if write_thread is not None:
+            write_thread.join()
+
+
+    def load(self, verify: bool = True):
+        """
+        Use this to resume. Sections are views into the mapped file, nothing is copied until the game writes to it
+        Returns dict of section name: memoryview, or None if there is no valid save
+
+        verify = check every section's crc32
+        """
+        if not os.path.exists(self.path) or os.path.getsize(self.path) < self.file_header.size:
+            return None
+        self.close()
+        with open(self.path, 'rb') as file:
+            self.mapping = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+
+        magic, version, section_count = self.file_header.unpack_from(self.mapping)
+        if magic != self.magic or version != self.version:
+            print('WARNING: save file is from another version')
+            self.close()
+            return None
+        if self.file_header.size + section_count*self.section_entry.size > len(self.mapping):
+            print('WARNING: save file is truncated')
+            self.close()
+            return None
+
+        entries = []
+        for i in range(section_count):
+            name, offset, length, crc = self.section_entry.unpack_from(self.mapping, self.file_header.size + i*self.section_entry.size)
+            if offset + length > len(self.mapping):
+                print('WARNING: save file is truncated')
+                self.close()
+                return None
+            entries.append((name.rstrip(b'\0').decode(), offset, length, crc))
+
+        view = memoryview(self.mapping)
+        sections = {}
+        for name, offset, length, crc in entries:
+            payload = view[offset:offset + length]
+            if verify and zlib.crc32(payload) != crc:
+                print('WARNING: save file is corrupted')
+                payload.release()
+                for section in sections.values():
+                    section.release()
+                view.release()
+                self.close()
+                return None
+            sections[name] = payload
+            # Sections kept for the next save are copies, so the mapping can be closed before the file is replaced
+            self.sections[name] = bytes(payload)
+        view.release()
+        return sections
+
+
+    def close(self):
+        if self.mapping is not None:
+            try:
+                self.mapping.close()
+            except BufferError:
+                # A loaded board still reads from the file, the mapping is closed once it is garbage collected
+                pass
+            self.mapping = None
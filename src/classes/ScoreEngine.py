@@ -0,0 +1,185 @@
+from src.library.essentials import *
+from src.classes.Board import Board
+from src.classes.PathNetwork import PathNetwork
+
+class ScoreEngine:
+    # Points of a harvested fruit before event modifiers. Each growth stage adds 1 point
+    fruit_values = {
+        'orange': 1,
+        'blueberry': 1,
+        'grape': 2,
+        'strawberry': 2,
+        'peach': 3,
+        'coconut': 3,
+        'golden_apple': 5,
+    }
+
+    def __init__(self, board: Board, path_network: PathNetwork = None):
+        """
+        Score of a board: every fruit reached by the path network from the entrance, plus event modifiers.
+        The full score is computed with array operations, placing a tile only adds the fruits its merged networks bring in.
+
+        board = board to score
+        path_network = PathNetwork of the board, built if None
+        """
+        self.board = board
+        self.path_network = path_network if path_network is not None else PathNetwork(board=board)
+        self.bonus = 0
+        self.fruit_multipliers = {}
+        self.value_table = None
+        self.set_modifiers()
+
+
+    # Class methods
+
+    def set_modifiers(self, bonus: int = 0, fruit_multipliers: dict = None):
+        """
+        Use this when event cards change the scoring, e.g. the point card or a seasonal fruit
+        Returns nothing
+
+        bonus = flat points added to the score
+        fruit_multipliers = dict of fruit name: multiplier of its value
+        """
+        self.bonus = bonus
+        self.fruit_multipliers = fruit_multipliers or {}
+        # Indexed by the board's fruit layer, 0 is no fruit
+        self.value_table = numpy.array([0] + [self.fruit_values[fruit]*self.fruit_multipliers.get(fruit, 1)
+                                              for fruit in Board.fruit_types[1:]], dtype=numpy.int32)
+        self.score = self.get_full_score()
+
+
+    def get_reached_mask(self):
+        """
+        Returns bool array of path cells connected to the entrance, by flooding the links with array shifts
+        """
+        links = self.board.get_links()
+        reached = numpy.zeros((self.board.rows, self.board.columns), dtype=bool)
+        entrance = self.board.entrance
+        if entrance is None or not links[entrance[1], entrance[0]] & Board.N:
+            return reached
+        reached[entrance[1], entrance[0]] = True
+
+        link_masks = {direction: (links & direction) != 0 for direction in Board.directions}
+        while True:
+            grown = reached.copy()
+            for direction, linked in link_masks.items():
+                grown |= linked & Board.shift(array=reached, direction=direction)
+            if (grown == reached).all():
+                return reached
+            reached = grown
+
+
+    def get_reached_fruits_mask(self, reached: numpy.ndarray = None):
+        """
+        Returns bool array of fruit cells that a path connected to the entrance leads into
+        """
+        if reached is None:
+            reached = self.get_reached_mask()
+        connections = self.board.get_connections()
+        fruits = numpy.zeros_like(reached)
+        for direction in Board.directions:
+            pointing = reached & ((connections & Board.opposite(direction=direction)) != 0)
+            fruits |= Board.shift(array=pointing, direction=direction)
+        return fruits & (self.board.layers[Board.FRUIT] != 0)
+
+
+    def get_full_score(self):
+        """
+        Use this after changes other than placing a tile, e.g. removing paths or growing fruits
+        Returns int
+        """
+        fruit_points = self.value_table[self.board.layers[Board.FRUIT]] + self.board.layers[Board.GROWTH]
+        return int(fruit_points[self.get_reached_fruits_mask()].sum()) + self.bonus
+
+
+    def get_fruit_points(self, node: int):
+        return int(self.value_table[self.board.layers[Board.FRUIT].flat[node]] + self.board.layers[Board.GROWTH].flat[node])
+
+
+    def get_move_delta(self, x: int, y: int, tile_type: int, rotation: int):
+        """
+        Use this to find how many points placing a tile would add, touching only the cell's neighbours and the networks they join
+        Returns int, or None if the cell is taken
+        """
+        board = self.board
+        network = self.path_network
+        if board.layers[Board.TILE, y, x] != 0 or board.layers[Board.FRUIT, y, x] != 0:
+            return None
+
+        node = y*board.columns + x
+        mask = int(Board.connections[tile_type, rotation % 4])
+        entrance_root = network.find(node=network.entrance_node)
+        joins_entrance = board.entrance == (x, y) and bool(mask & Board.N)
+        roots = set()
+        new_fruits = set()
+        for direction in Board.directions:
+            if not mask & direction:
+                continue
+            neighbour = network.get_neighbour(node=node, direction=direction)
+            if neighbour is None:
+                continue
+            if network.is_path[neighbour]:
+                if network.get_node_connections(node=neighbour) & Board.opposite(direction=direction):
+                    root = network.find(node=neighbour)
+                    joins_entrance = joins_entrance or root == entrance_root
+                    roots.add(root)
+            elif board.layers[Board.FRUIT].flat[neighbour] != 0:
+                new_fruits.add(neighbour)
+
+        if not joins_entrance:
+            return 0
+        for root in roots:
+            if root != entrance_root:
+                new_fruits |= network.fruits[root]
+        new_fruits -= network.fruits[entrance_root]
+        return sum(self.get_fruit_points(node=fruit) for fruit in new_fruits)
+
+
+    def preview_score(self, move: tuple):
+        """
+        Use this to show the score a move would lead to, e.g. while hovering a cell with a path card
+        Returns int, or None if the move is not possible
+
+        move = (x, y, tile type, rotation)
+        """
+        delta = self.get_move_delta(*move)
+        if delta is None:
+            return None
+        return self.score + delta
+
+
+    def preview_scores(self, tile_type: int, rotation: int):
+        """
+        Use this to evaluate one tile on every cell at once, e.g. for the AI
+        Returns int array of score deltas, -1 where the tile cannot be placed
+        """
+        deltas = numpy.full((self.board.rows, self.board.columns), -1, dtype=numpy.int32)
+        for y, x in numpy.argwhere(self.board.get_placement_mask(tile_type=tile_type, rotation=rotation)).tolist():
+            deltas[y, x] = self.get_move_delta(x=x, y=y, tile_type=tile_type, rotation=rotation)
+        return deltas
+
+
+    def apply_move(self, move: tuple, owner: int = 0):
+        """
+        Use this to place a tile on the board and update the score incrementally
+        Returns points gained
+        """
+        x, y, tile_type, rotation = move
+        delta = self.get_move_delta(x=x, y=y, tile_type=tile_type, rotation=rotation)
+        if delta is None:
+            print('WARNING: cell is already taken')
+            return 0
+        self.board.set_tile(x=x, y=y, tile_type=tile_type, rotation=rotation, owner=owner)
+        self.path_network.on_tile_changed(x=x, y=y)
+        self.score += delta
+        return delta
+
+
+    def refresh(self):
+        """
+        Use this after fruits grow or change. Sums the fruits already known to the entrance network instead of flooding the board
+        Returns nothing
+        """
+        network = self.path_network
+        fruits = network.fruits[network.find(node=network.entrance_node)]
+        self.score = sum(self.get_fruit_points(node=fruit) for fruit in fruits) + self.bonus
@@ -1,4 +1,5 @@
 from src.library.essentials import *
+from src.classes.Tracer import Tracer
 
 class SettingsManager():
     def __init__(self):
@@ -46,9 +47,45 @@ class SettingsManager():
                 'value_label': ['off', 'on'],
                 'value_default': 0,
             },
+            {
+                'id': 'idle_mode',
+                'label': 'Idle Mode',
+                'value': [0, 1],
+                'value_label': ['off', 'on'],
+                'value_default': 1,
+            },
+            {
+                'id': 'vsync',
+                'label': 'VSync',
+                'value': [0, 1],
+                'value_label': ['off', 'on'],
+                'value_default': 0,
+            },
+            {
+                'id': 'frame_pacing',
+                'label': 'Frame Pacing',
+                'value': [0, 1],
+                'value_label': ['standard', 'precise'],
+                'value_default': 1,
+            },
+            {
+                'id': 'show_frame_stats',
+                'label': 'Frame Stats',
+                'value': [0, 1],
+                'value_label': ['off', 'on'],
+                'value_default': 0,
+            },
+            {
+                'id': 'audio_buffer',
+                'label': 'Audio Latency',
+                'value': [256, 512, 1024, 2048, 4096],
+                'value_label': ['6 ms', '12 ms', '23 ms', '46 ms', '93 ms'],
+                'value_default': 1024,
+            },
         ]
 
 
+    @Tracer.trace(category='io')
     def load_all_settings_index(self):
         self.current_settings_index = []
         with open(self.settings_file, "r") as fp:
@@ -61,6 +98,7 @@ class SettingsManager():
         return self.current_settings_index
 
 
+    @Tracer.trace(category='io')
     def load_all_settings(self):
         self.current_settings = {}
         # when settings file is missing
@@ -76,9 +114,16 @@ class SettingsManager():
                     key, value = line.strip().split('=')
                     self.current_settings[key] = float(value)
 
+                # when settings file is missing newly added settings
+                for setting in self.settings_list:
+                    if setting['id'] not in self.current_settings:
+                        fp.write(f"{setting['id']}={setting['value_default']}\n")
+                        self.current_settings[setting['id']] = setting['value_default']
+
         return self.current_settings
     
 
+    @Tracer.trace(category='io')
     def load_setting(self, setting):
         with open(self.settings_file, "r") as fp:
             for line in fp.readlines():
@@ -87,6 +132,7 @@ class SettingsManager():
                     return float(value)
                 
 
+    @Tracer.trace(category='io')
     def set_setting(self, setting, index):
         with open(self.settings_file, "r") as fp:
             lines = fp.readlines()
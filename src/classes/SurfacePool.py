@@ -0,0 +1,43 @@
+from src.library.essentials import *
+
+class SurfacePool:
+    def __init__(self):
+        """
+        Reusable scratch surfaces for per-frame temporaries, keyed by size and flags
+        """
+        self.free_surfaces = {}
+        self.acquired_keys = {}
+        self.allocations = 0
+
+
+    # Class methods
+
+    def acquire(self, size: tuple, flags: int = 0) -> pygame.Surface:
+        """
+        Use this to borrow a scratch surface. Its pixels are left over from the previous user
+        Returns Surface
+
+        size = (width, height) of the surface
+        flags = pygame surface flags, e.g. pygame.SRCALPHA
+        """
+        key = ((int(size[0]), int(size[1])), flags)
+        if self.free_surfaces.get(key):
+            surface = self.free_surfaces[key].pop()
+        else:
+            surface = pygame.Surface(size=key[0], flags=flags)
+            self.allocations += 1
+        self.acquired_keys[surface] = key
+        return surface
+
+
+    def release(self, surface: pygame.Surface):
+        """
+        Use this to return a surface borrowed with acquire
+        Returns nothing
+        """
+        key = self.acquired_keys.pop(surface)
+        self.free_surfaces.setdefault(key, []).append(surface)
+
+
+    def clear(self):
+        self.free_surfaces = {}
@@ -0,0 +1,153 @@
+from src.library.essentials import *
+
+class Tilemap:
+    def __init__(self, tilemap: dict):
+        """
+        Static map layers baked into fixed-size chunk surfaces.
+        Only chunks inside the view are drawn, and a chunk is only re-baked after one of its tiles changes.
+
+        tilemap = tilemap dict defined in tilemaps.py
+        """
+        self.tile_size = tilemap['tile_size']
+        self.width = tilemap['width']
+        self.height = tilemap['height']
+        self.chunk_size = tilemap['chunk_size']
+        self.chunk_pixel_size = self.chunk_size*self.tile_size
+        self.chunk_columns = math.ceil(self.width/self.chunk_size)
+        self.chunk_rows = math.ceil(self.height/self.chunk_size)
+        self.grid = tilemap.get('grid')
+
+        self.tile_sprites = utils.get_sprite_sheet(sprite_sheet=tilemap['tileset'], mode='alpha')
+        self.image_layers = [utils.get_image(dir=layer['dir'], name=layer['name'], mode='colorkey')
+                             for layer in tilemap['image_layers']]
+
+        # Tile layers are drawn in order on top of the image layers
+        self.tile_layers = {}
+        for layer in tilemap['tile_layers']:
+            tiles = [[None]*self.width for _ in range(self.height)]
+            for y, row in enumerate(layer.get('rows', [])):
+                for x, symbol in enumerate(row):
+                    tiles[y][x] = layer['legend'].get(symbol)
+            self.tile_layers[layer['id']] = tiles
+
+        self.chunks = {}
+        self.dirty_chunks = {(cx, cy) for cx in range(self.chunk_columns) for cy in range(self.chunk_rows)}
+        self.bake_count = 0
+
+        # Chunks pre-scaled per zoom step, least recently used step first
+        self.scaled_chunks = {}
+        self.scale_count = 0
+
+
+    # Class methods
+
+    def get_pixel_size(self):
+        return (self.width*self.tile_size, self.height*self.tile_size)
+
+
+    def get_tile(self, layer: str, x: int, y: int):
+        return self.tile_layers[layer][y][x]
+
+
+    def set_tile(self, layer: str, x: int, y: int, tile: str):
+        """
+        Use this to change a tile. Its chunk is re-baked the next time it is drawn
+        Returns nothing
+
+        layer = id of the tile layer
+        x, y = tile coordinates
+        tile = name of the sprite in the tileset, None to clear
+        """
+        if self.tile_layers[layer][y][x] != tile:
+            self.tile_layers[layer][y][x] = tile
+            self.dirty_chunks.add((x//self.chunk_size, y//self.chunk_size))
+
+
+    def bake_chunk(self, cx: int, cy: int):
+        chunk_rect = pygame.Rect(cx*self.chunk_pixel_size, cy*self.chunk_pixel_size, self.chunk_pixel_size, self.chunk_pixel_size)
+        chunk_rect = chunk_rect.clip(pygame.Rect((0, 0), self.get_pixel_size()))
+
+        chunk = self.chunks.get((cx, cy))
+        if chunk is None:
+            chunk = pygame.Surface(size=chunk_rect.size)
+            chunk.set_colorkey((0, 0, 0))
+            self.chunks[(cx, cy)] = chunk
+        chunk.fill(color=(0, 0, 0))
+
+        for image in self.image_layers:
+            chunk.blit(source=image, dest=(0, 0), area=chunk_rect)
+
+        first_x = cx*self.chunk_size
+        first_y = cy*self.chunk_size
+        for tiles in self.tile_layers.values():
+            for y in range(first_y, min(first_y + self.chunk_size, self.height)):
+                for x in range(first_x, min(first_x + self.chunk_size, self.width)):
+                    if tiles[y][x] is not None:
+                        chunk.blit(source=self.tile_sprites[tiles[y][x]],
+                                   dest=((x - first_x)*self.tile_size, (y - first_y)*self.tile_size))
+
+        self.dirty_chunks.discard((cx, cy))
+        self.bake_count += 1
+        for chunks in self.scaled_chunks.values():
+            chunks.pop((cx, cy), None)
+
+
+    def get_scaled_chunk(self, cx: int, cy: int, zoom: float):
+        if zoom in self.scaled_chunks:
+            # Re-insert to mark as most recently used
+            chunks = self.scaled_chunks.pop(zoom)
+        else:
+            chunks = {}
+            if len(self.scaled_chunks) >= constants.zoom_cache_levels:
+                del self.scaled_chunks[next(iter(self.scaled_chunks))]
+        self.scaled_chunks[zoom] = chunks
+
+        if (cx, cy) not in chunks:
+            # Scale to the rounded edges of the chunk so neighbours meet without gaps
+            chunk = self.chunks[(cx, cy)]
+            left = round(cx*self.chunk_pixel_size*zoom)
+            top = round(cy*self.chunk_pixel_size*zoom)
+            right = round((cx*self.chunk_pixel_size + chunk.get_width())*zoom)
+            bottom = round((cy*self.chunk_pixel_size + chunk.get_height())*zoom)
+            chunks[(cx, cy)] = pygame.transform.scale(surface=chunk, size=(right - left, bottom - top))
+            self.scale_count += 1
+        return chunks[(cx, cy)]
+
+
+    # Main methods
+
+    def render(self,
+               dest: pygame.Surface,
+               view: pygame.Rect = None,
+               zoom: float = 1
+              ) -> int:
+        """
+        Use this to draw the chunks that intersect the view
+        Returns number of chunks drawn
+
+        dest = surface to draw to
+        view = Rect or FRect of the map in pixels that maps to the dest's topleft. None for the dest's size at (0, 0)
+        zoom = scale of the map on the dest. Use a few discrete steps (see Camera), each one keeps its own cache of scaled chunks
+        """
+        if view is None:
+            view = pygame.FRect((0, 0), (dest.get_width()/zoom, dest.get_height()/zoom))
+
+        first_cx = max(0, int(view.left//self.chunk_pixel_size))
+        last_cx = min(self.chunk_columns - 1, int(math.ceil(view.right/self.chunk_pixel_size)) - 1)
+        first_cy = max(0, int(view.top//self.chunk_pixel_size))
+        last_cy = min(self.chunk_rows - 1, int(math.ceil(view.bottom/self.chunk_pixel_size)) - 1)
+
+        blit_sequence = []
+        for cy in range(first_cy, last_cy + 1):
+            for cx in range(first_cx, last_cx + 1):
+                if (cx, cy) in self.dirty_chunks:
+                    self.bake_chunk(cx=cx, cy=cy)
+                if zoom == 1:
+                    blit_sequence.append((self.chunks[(cx, cy)], (cx*self.chunk_pixel_size - view.x, cy*self.chunk_pixel_size - view.y)))
+                else:
+                    blit_sequence.append((self.get_scaled_chunk(cx=cx, cy=cy, zoom=zoom),
+                                          (round(cx*self.chunk_pixel_size*zoom) - round(view.x*zoom),
+                                           round(cy*self.chunk_pixel_size*zoom) - round(view.y*zoom))))
+
+        dest.blits(blit_sequence=blit_sequence, doreturn=False)
+        return len(blit_sequence)
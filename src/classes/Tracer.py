@@ -0,0 +1,154 @@
+from src.library.core import *
+import collections
+import contextlib
+import functools
+import itertools
+import threading
+import time
+
+class Tracer:
+    """
+    Timing spans of loading, update and render, saved in the Chrome trace event format for Perfetto or chrome://tracing.
+    Used through the class itself so utils can trace without a game object. While disabled, span returns a shared
+    null context and traced functions cost one flag check.
+    Only imports core, since utils imports this module.
+    """
+    enabled = False
+    # Events as (name, category, start ns, duration ns or None for instants, thread id, args), the oldest are dropped past max_events
+    events = collections.deque(maxlen=200000)
+    thread_names = {}
+    # Number of events ever added, also counting dropped ones, e.g. to find the events of one frame
+    event_count = 0
+    null_span = contextlib.nullcontext()
+    start_time = time.perf_counter_ns()
+
+
+    # Class methods
+
+    @classmethod
+    def enable(cls, max_events: int = 200000):
+        """
+        Use this to start recording, clearing earlier events
+        Returns nothing
+
+        max_events = most spans kept, about 200 bytes each
+        """
+        cls.events = collections.deque(maxlen=max_events)
+        cls.thread_names = {}
+        cls.event_count = 0
+        cls.start_time = time.perf_counter_ns()
+        cls.enabled = True
+
+
+    @classmethod
+    def disable(cls):
+        cls.enabled = False
+
+
+    @classmethod
+    def add_event(cls, name: str, category: str, start: int, duration: int, args: dict):
+        thread_id = threading.get_ident()
+        if thread_id not in cls.thread_names:
+            cls.thread_names[thread_id] = threading.current_thread().name
+        cls.events.append((name, category, start, duration, thread_id, args))
+        cls.event_count += 1
+
+
+    @classmethod
+    @contextlib.contextmanager
+    def record_span(cls, name: str, category: str, args: dict):
+        start = time.perf_counter_ns()
+        try:
+            yield
+        finally:
+            cls.add_event(name=name, category=category, start=start, duration=time.perf_counter_ns() - start, args=args)
+
+
+    @classmethod
+    def span(cls, name: str, category: str = 'game', args: dict = None):
+        """
+        Use this as a context manager around the code to time, e.g. with Tracer.span(name='load_assets'):
+        Returns context manager
+        """
+        if not cls.enabled:
+            return cls.null_span
+        return cls.record_span(name=name, category=category, args=args)
+
+
+    @classmethod
+    def instant(cls, name: str, category: str = 'game', args: dict = None):
+        """
+        Use this to mark a moment without a duration, e.g. a state transition
+        Returns nothing
+        """
+        if cls.enabled:
+            cls.add_event(name=name, category=category, start=time.perf_counter_ns(), duration=None, args=args)
+
+
+    @classmethod
+    def trace(cls, name: str = None, category: str = 'game'):
+        """
+        Use this to decorate a function so every call is a span, e.g. @Tracer.trace(category='utils')
+        Returns decorator
+
+        name = span name, the function's qualified name if None
+        """
+        def decorator(function):
+            span_name = name or function.__qualname__
+
+            @functools.wraps(function)
+            def wrapper(*args, **kwargs):
+                if not cls.enabled:
+                    return function(*args, **kwargs)
+                with cls.record_span(name=span_name, category=category, args=None):
+                    return function(*args, **kwargs)
+            return wrapper
+        return decorator
+
+
+    @classmethod
+    def get_events_since(cls, event_count: int):
+        """
+        Returns list of the events added after event_count was read, as far as they are still kept
+        """
+        new_events = min(cls.event_count - event_count, len(cls.events))
+        return list(itertools.islice(reversed(cls.events), new_events))[::-1]
+
+
+    @classmethod
+    def get_trace(cls):
+        """
+        Returns dict in the Chrome trace event format, one track per thread
+        """
+        process_id = os.getpid()
+        trace_events = [{'name': 'thread_name', 'ph': 'M', 'pid': process_id, 'tid': thread_id, 'args': {'name': thread_name}}
+                        for thread_id, thread_name in cls.thread_names.items()]
+        for name, category, start, duration, thread_id, args in list(cls.events):
+            event = {
+                'name': name,
+                'cat': category,
+                'ph': 'X',
+                'ts': (start - cls.start_time)/1000,
+                'pid': process_id,
+                'tid': thread_id,
+            }
+            if duration is None:
+                event['ph'] = 'i'
+                event['s'] = 't'
+            else:
+                event['dur'] = duration/1000
+            if args:
+                event['args'] = args
+            trace_events.append(event)
+        return {'traceEvents': trace_events, 'displayTimeUnit': 'ms'}
+
+
+    @classmethod
+    def dump(cls, path: str):
+        """
+        Use this to save the recorded spans, then open the file in ui.perfetto.dev
+        Returns nothing
+        """
+        with open(path, 'w') as file:
+            json.dump(cls.get_trace(), file)
+        print(f'Trace: {len(cls.events)} spans saved to {path}')
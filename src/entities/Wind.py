@@ -1,26 +1,27 @@
 from src.library.essentials import *
 from src.template.BaseEntity import BaseEntity
+from src.classes.AnimationSet import AnimationSet
 
 class Wind(BaseEntity):
     def __init__(self,
                  surface: pygame.Surface,
-                 sprites: dict):
+                 animation_set: AnimationSet,
+                 rng: numpy.random.Generator):
         BaseEntity.__init__(self)
-        self.x = random.randint(0, surface.get_width())
-        self.y = random.randint(-32, surface.get_height()-32)
+        self.x = int(rng.integers(0, surface.get_width(), endpoint=True))
+        self.y = int(rng.integers(-32, surface.get_height()-32, endpoint=True))
 
-        self.sprites = sprites
+        self.animation_set = animation_set
         self.surface = surface
 
-        self.current_stage = 1     
-        self.time_passed = 0
-        self.time_interval = 0.1
+        self.start_frame = self.animation_set.frame
+        self.current_stage = 0
         self.x_step = 7
         self.y_offset = 0
-        if random.random() <= 0.5:
-            self.flip = True
+        if rng.random() <= 0.5:
+            self.clip = self.animation_set.clips['wind_flipped']
         else:
-            self.flip = False
+            self.clip = self.animation_set.clips['wind']
 
 
     # Class methods
@@ -32,19 +33,18 @@ class Wind(BaseEntity):
     # Main methods
 
     def update(self, dt, events):
-        self.time_passed += dt
-        self.current_stage = round(self.time_passed/self.time_interval) + 1
-        if self.current_stage >= len(self.sprites):
+        self.current_stage = self.animation_set.get_frame_index(start_frame=self.start_frame)
+        if self.clip.is_finished(frame_index=self.current_stage):
             self.active = False
 
 
     def render(self):
-        if self.current_stage < len(self.sprites):
-            sprite = self.sprites[f'wind_{self.current_stage}'] 
-            if self.flip:
-                sprite = pygame.transform.flip(surface=sprite, flip_x=False, flip_y=True)
+        sprite = self.clip.get_frame(frame_index=self.current_stage)
+        if sprite is not None:
             utils.blit(dest=self.surface,
                                source=sprite,
-                               pos=(self.x - self.x_step*self.current_stage, self.y + self.y_offset), pos_anchor='topleft')
+                               pos=(self.x - self.x_step*(self.current_stage + 1), self.y + self.y_offset), pos_anchor='topleft')
+
+        
 
         
\ No newline at end of file
@@ -1,8 +1,10 @@
 import src.library.resources.colors as colors
 import src.library.resources.constants as constants
 import src.library.resources.cursors as cursors
+import src.library.resources.decks as decks
 import src.library.resources.dir as dir
 import src.library.resources.fonts as fonts
 import src.library.resources.spritesheets as spritesheets
+import src.library.resources.tilemaps as tilemaps
 import src.library.resources.tweencurves as tweencurves
 
@@ -2,3 +2,23 @@ canvas_width = 1280    #default: 1280
 canvas_height = 720    #default: 720
 window_width = 1280    #default: 1280
 window_height = 720    #default: 720
+
+idle_timeout = 15           #default: 15, seconds without input before ambient animations pause
+idle_wait_timeout = 250     #default: 250, milliseconds to block on the event queue while idle
+
+asset_memory_budget = 256*2**20    #default: 256 MB, unreferenced assets are evicted above this
+
+zoom_cache_levels = 4    #default: 4, zoom steps that keep pre-scaled chunks and sprites
+
+ai_time_budget = 1    #default: 1, seconds the AI workers search for a move
+
+hitch_budget = 50       #default: 50, milliseconds of update and render before a frame counts as a hitch
+hitch_log_size = 100    #default: 100, most recent hitches kept in the hitch log
+
+gc_max_defer = 30                       #default: 30, seconds a due full garbage collection waits for an idle frame
+allocation_sample_interval = 30         #default: 30, frames between frames sampled with tracemalloc
+frame_allocation_budget = 256*2**10     #default: 256 KB, peak memory a frame may allocate
+
+capture_buffer_count = 8    #default: 8, captured frames that can wait for encoding before frames are dropped, 3.5 MB each
+
+music_crossfade = 2000    #default: 2000, milliseconds a new soundtrack fades in while the old one fades out
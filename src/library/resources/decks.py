@@ -0,0 +1,53 @@
+import src.library.resources.spritesheets as spritesheets
+
+path = {
+    'sprite_sheet': spritesheets.cards_path,
+    'cards': {
+        'path_ns': 2,
+        'path_ew': 2,
+        'path_ne': 2,
+        'path_es': 2,
+        'path_sw': 2,
+        'path_nw': 2,
+        'path_nes': 2,
+        'path_esw': 2,
+        'path_nsw': 2,
+        'path_new': 2,
+        'strike_ns': 1,
+        'strike_ew': 1,
+        'strike_ne': 1,
+        'strike_es': 1,
+        'strike_sw': 1,
+        'strike_nw': 1,
+        'strike_nes': 1,
+        'strike_esw': 1,
+        'strike_nsw': 1,
+        'strike_new': 1,
+    },
+}
+
+event = {
+    'sprite_sheet': spritesheets.cards_event,
+    'cards': {
+        'free': 2,
+        'keep': 2,
+        'merge': 2,
+        'point': 2,
+        'redraw': 2,
+        'remove': 2,
+        'reveal': 2,
+        'swap': 2,
+    },
+}
+
+fruit = {
+    'sprite_sheet': spritesheets.cards_fruit,
+    'cards': {
+        'blueberry': 3,
+        'coconut': 3,
+        'grape': 3,
+        'orange': 3,
+        'peach': 3,
+        'strawberry': 3,
+    },
+}
@@ -97,4 +97,332 @@ gui = {
             'height': 48,
         },
     }
-}
\ No newline at end of file
+}
+
+tileset = {
+    'file': 'tileset.png',
+    'shared_data': {
+        'width': 16,
+        'height': 16,
+    },
+    'sprites': {
+        'dirt_1': {
+            'x': 0,
+            'y': 0,
+        },
+        'dirt_2': {
+            'x': 16,
+            'y': 0,
+        },
+        'dirt_3': {
+            'x': 32,
+            'y': 0,
+        },
+        'dirt_4': {
+            'x': 48,
+            'y': 0,
+        },
+        'dirt_5': {
+            'x': 64,
+            'y': 0,
+        },
+        'dirt_6': {
+            'x': 80,
+            'y': 0,
+        },
+        'dirt_7': {
+            'x': 96,
+            'y': 0,
+        },
+        'dirt_8': {
+            'x': 112,
+            'y': 0,
+        },
+        'dirt_9': {
+            'x': 128,
+            'y': 0,
+        },
+        'grass_light_1': {
+            'x': 0,
+            'y': 16,
+        },
+        'grass_light_2': {
+            'x': 16,
+            'y': 16,
+        },
+        'grass_light_3': {
+            'x': 32,
+            'y': 16,
+        },
+        'grass_light_4': {
+            'x': 48,
+            'y': 16,
+        },
+        'grass_dark_1': {
+            'x': 0,
+            'y': 48,
+        },
+        'grass_dark_2': {
+            'x': 16,
+            'y': 48,
+        },
+        'grass_dark_3': {
+            'x': 32,
+            'y': 48,
+        },
+        'grass_dark_4': {
+            'x': 48,
+            'y': 48,
+        },
+        'rock_1': {
+            'x': 96,
+            'y': 32,
+        },
+        'rock_2': {
+            'x': 112,
+            'y': 32,
+        },
+        'rock_3': {
+            'x': 128,
+            'y': 32,
+        },
+    }
+}
+
+fruits_16 = {
+    'file': 'fruits_16x16.png',
+    'shared_data': {
+        'y': 0,
+        'width': 16,
+        'height': 16,
+    },
+    'sprites': {
+        'orange': {
+            'x': 0,
+        },
+        'blueberry': {
+            'x': 16,
+        },
+        'grape': {
+            'x': 32,
+        },
+        'strawberry': {
+            'x': 48,
+        },
+        'peach': {
+            'x': 64,
+        },
+        'coconut': {
+            'x': 80,
+        },
+        'golden_apple_1': {
+            'x': 96,
+        },
+        'golden_apple_2': {
+            'x': 112,
+        },
+        'golden_apple_3': {
+            'x': 128,
+        },
+    }
+}
+
+fruits_32 = {
+    'file': 'fruits_32x32.png',
+    'shared_data': {
+        'width': 32,
+        'height': 32,
+    },
+    'sprites': {
+        'golden_apple_1': {
+            'x': 96,
+            'y': 32,
+        },
+        'golden_apple_2': {
+            'x': 128,
+            'y': 32,
+        },
+        'golden_apple_3': {
+            'x': 160,
+            'y': 32,
+        },
+    }
+}
+
+cards_path = {
+    'file': 'cards_path.png',
+    'shared_data': {
+        'width': 96,
+        'height': 128,
+    },
+    'sprites': {
+        'path_sw': {
+            'x': 0,
+            'y': 0,
+        },
+        'path_es': {
+            'x': 96,
+            'y': 0,
+        },
+        'path_ew': {
+            'x': 192,
+            'y': 0,
+        },
+        'path_ns': {
+            'x': 288,
+            'y': 0,
+        },
+        'path_nw': {
+            'x': 384,
+            'y': 0,
+        },
+        'path_ne': {
+            'x': 0,
+            'y': 128,
+        },
+        'path_esw': {
+            'x': 96,
+            'y': 128,
+        },
+        'path_nsw': {
+            'x': 192,
+            'y': 128,
+        },
+        'path_nes': {
+            'x': 288,
+            'y': 128,
+        },
+        'path_new': {
+            'x': 384,
+            'y': 128,
+        },
+        'strike_sw': {
+            'x': 0,
+            'y': 256,
+        },
+        'strike_es': {
+            'x': 96,
+            'y': 256,
+        },
+        'strike_ew': {
+            'x': 192,
+            'y': 256,
+        },
+        'strike_ns': {
+            'x': 288,
+            'y': 256,
+        },
+        'strike_nw': {
+            'x': 384,
+            'y': 256,
+        },
+        'strike_ne': {
+            'x': 0,
+            'y': 384,
+        },
+        'strike_esw': {
+            'x': 96,
+            'y': 384,
+        },
+        'strike_nsw': {
+            'x': 192,
+            'y': 384,
+        },
+        'strike_nes': {
+            'x': 288,
+            'y': 384,
+        },
+        'strike_new': {
+            'x': 384,
+            'y': 384,
+        },
+        'back': {
+            'x': 0,
+            'y': 512,
+        },
+    }
+}
+
+cards_event = {
+    'file': 'cards_event.png',
+    'shared_data': {
+        'width': 96,
+        'height': 128,
+    },
+    'sprites': {
+        'free': {
+            'x': 0,
+            'y': 0,
+        },
+        'keep': {
+            'x': 96,
+            'y': 0,
+        },
+        'merge': {
+            'x': 192,
+            'y': 0,
+        },
+        'point': {
+            'x': 0,
+            'y': 128,
+        },
+        'redraw': {
+            'x': 96,
+            'y': 128,
+        },
+        'remove': {
+            'x': 192,
+            'y': 128,
+        },
+        'reveal': {
+            'x': 0,
+            'y': 256,
+        },
+        'swap': {
+            'x': 96,
+            'y': 256,
+        },
+        'back': {
+            'x': 192,
+            'y': 256,
+        },
+    }
+}
+
+cards_fruit = {
+    'file': 'cards_fruit.png',
+    'shared_data': {
+        'width': 96,
+        'height': 128,
+    },
+    'sprites': {
+        'blueberry': {
+            'x': 0,
+            'y': 0,
+        },
+        'coconut': {
+            'x': 96,
+            'y': 0,
+        },
+        'grape': {
+            'x': 192,
+            'y': 0,
+        },
+        'orange': {
+            'x': 0,
+            'y': 128,
+        },
+        'peach': {
+            'x': 96,
+            'y': 128,
+        },
+        'strawberry': {
+            'x': 192,
+            'y': 128,
+        },
+        'back': {
+            'x': 0,
+            'y': 256,
+        },
+    }
+}
@@ -0,0 +1,39 @@
+import src.library.resources.dir as dir
+import src.library.resources.spritesheets as spritesheets
+
+garden = {
+    'tileset': spritesheets.tileset,
+    'tile_size': 16,
+    'width': 80,
+    'height': 45,
+    'chunk_size': 16,
+    'image_layers': [
+        {
+            'dir': dir.play_bg,
+            'name': 'grass_pattern.png',
+        },
+        {
+            'dir': dir.play_bg,
+            'name': 'trees_bridges.png',
+        },
+        {
+            'dir': dir.play_bg,
+            'name': 'fence.png',
+        },
+    ],
+    'tile_layers': [
+        {
+            'id': 'ground',
+        },
+        {
+            'id': 'decor',
+        },
+    ],
+    'grid': {
+        'pos': (320, 48),
+        'cell_size': 80,
+        'columns': 8,
+        'rows': 8,
+        'entrance': (3, 0),
+    },
+}
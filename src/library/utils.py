@@ -1,5 +1,6 @@
 from src.library.core import *
 from src.library.resource_loader import *
+from src.classes.Tracer import Tracer
 
 
 # Color functions
@@ -40,6 +41,7 @@ def blit(dest: pygame.Surface,
          source: pygame.Surface,
          pos: tuple = (0, 0),
          pos_anchor: str = 'topleft',
+         alpha: int = None,
          debug_outline: bool = False,
          debug_outline_color: pygame.Color = (255, 0, 0)
         ) -> None:
@@ -51,20 +53,46 @@ def blit(dest: pygame.Surface,
     source = surface to blit
     pos = position on the dest surface to blit to
     pos_anchor = center, topleft, topright, bottomleft, bottomright, midtop, midbottom, midleft, midright
+    alpha = 0-255 to blit the source with, the source's own alpha is restored afterwards so shared surfaces stay untouched
     debug_outline = True to draw a debug outline around the source surface
     debug_outline_color = color of the debug outline
     """
+    if alpha is not None:
+        source_alpha = source.get_alpha()
+        source.set_alpha(alpha)
     if pos_anchor == 'topleft':
         dest.blit(source=source, dest=pos)
     else:
         source_rect = source.get_rect()
         setattr(source_rect, pos_anchor, pos)
         dest.blit(source=source, dest=source_rect)
+    if alpha is not None:
+        source.set_alpha(source_alpha)
     
     if debug_outline:
         pygame.draw.rect(dest, debug_outline_color, source_rect, 1)
 
 
+def scale_by(surface: pygame.Surface,
+             factor: float,
+             dest: pygame.Surface = None
+            ) -> pygame.Surface:
+    """
+    Use this instead of pygame's scale_by for surfaces scaled every frame
+    Returns Surface
+
+    surface = surface to scale
+    factor = scale factor. 1 returns the surface itself instead of a copy, so the result must not be modified, e.g. pass alpha to blit instead of set_alpha
+    dest = optional surface of the scaled size to write the result to instead of allocating one
+    """
+    if factor == 1:
+        return surface
+    if dest is None:
+        return pygame.transform.scale_by(surface=surface, factor=factor)
+    return pygame.transform.scale_by(surface=surface, factor=factor, dest_surface=dest)
+
+
+@Tracer.trace(category='utils')
 def get_text(text: str,
              font: dict,
              size: str,
@@ -114,6 +142,7 @@ def get_font_deco_distance(font: dict,
     return font_size//pixel_size_divisor
 
 
+@Tracer.trace(category='utils')
 def get_image(dir: str,
                name: str,
                mode: str = None,
@@ -139,6 +168,7 @@ def get_image(dir: str,
         return image.convert()
     
 
+@Tracer.trace(category='utils')
 def get_sprite(sprite_sheet: dict,
                 target_sprite: str,
                 mode: str = 'colorkey',
@@ -169,6 +199,7 @@ def get_sprite(sprite_sheet: dict,
     return sprite
 
 
+@Tracer.trace(category='utils')
 def get_sprite_sheet(sprite_sheet: str,
                       mode: str = 'colorkey',
                       colorkey: pygame.Color = (0, 0, 0)
@@ -188,8 +219,11 @@ def get_sprite_sheet(sprite_sheet: str,
     return sprites
 
 
+@Tracer.trace(category='utils')
 def effect_pixelate(surface: pygame.Surface,
-                    pixel_size: int = 2
+                    pixel_size: int = 2,
+                    dest: pygame.Surface = None,
+                    scratch: pygame.Surface = None
                    ) -> pygame.Surface:
     """
     Use this to pixelate a surface
@@ -197,28 +231,42 @@ def effect_pixelate(surface: pygame.Surface,
 
     surface = surface to pixelate
     pixel_size = size of the pixelation filter
+    dest = optional surface of the same size to write the result to instead of allocating one
+    scratch = optional surface of size (width // pixel_size, height // pixel_size) for the scaled down step
     """
     original_width = surface.get_width()
     original_height = surface.get_height()
+    scaled_down_size = (original_width // pixel_size, original_height // pixel_size)
     
-    scaled_down_surface = pygame.transform.scale(surface=surface, size=(original_width / pixel_size, original_height / pixel_size))
-    scaled_up_surface = pygame.transform.scale(surface=scaled_down_surface, size=(original_width, original_height))
-    return scaled_up_surface
+    if scratch is None:
+        scaled_down_surface = pygame.transform.scale(surface=surface, size=scaled_down_size)
+    else:
+        scaled_down_surface = pygame.transform.scale(surface=surface, size=scaled_down_size, dest_surface=scratch)
+    if dest is None:
+        return pygame.transform.scale(surface=scaled_down_surface, size=(original_width, original_height))
+    return pygame.transform.scale(surface=scaled_down_surface, size=(original_width, original_height), dest_surface=dest)
 
 
-def effect_grayscale(surface: pygame.Surface
+@Tracer.trace(category='utils')
+def effect_grayscale(surface: pygame.Surface,
+                     dest: pygame.Surface = None
                     ) -> pygame.Surface:
     """
     Use this to grayscale a surface
     Returns Surface
 
     surface = surface to grayscale
+    dest = optional surface of the same size to write the result to instead of allocating one
     """
-    return pygame.transform.grayscale(surface)
+    if dest is None:
+        return pygame.transform.grayscale(surface=surface)
+    return pygame.transform.grayscale(surface=surface, dest_surface=dest)
 
 
+@Tracer.trace(category='utils')
 def effect_silhouette(surface: pygame.Surface, 
-                      color: pygame.Color = (0, 0, 0)
+                      color: pygame.Color = (0, 0, 0),
+                      dest: pygame.Surface = None
                      ) -> pygame.Surface:
     """
     Use this to create a silhouette of a surface
@@ -226,16 +274,19 @@ def effect_silhouette(surface: pygame.Surface,
 
     surface = surface to create a silhouette of
     color = color of the silhouette
+    dest = optional SRCALPHA surface of the same size to write the result to instead of allocating one
     """
     mask = pygame.mask.from_surface(surface)
-    silhouette = mask.to_surface(setcolor=color, unsetcolor=(0,0,0,0))
+    silhouette = mask.to_surface(surface=dest, setcolor=color, unsetcolor=(0,0,0,0))
     return silhouette
 
 
+@Tracer.trace(category='utils')
 def effect_long_shadow(surface: pygame.Surface,
                        direction: str = 'top-left', 
                        distance: int = 1,
-                       color: pygame.Color = (255, 255, 255)
+                       color: pygame.Color = (255, 255, 255),
+                       dest: pygame.Surface = None
                       ) -> pygame.Surface:
     """
     Use this to apply 3D on a surface
@@ -245,6 +296,7 @@ def effect_long_shadow(surface: pygame.Surface,
     direction = 'top-left', 'top', 'top-right', 'left', 'right', 'bottom-left', 'bottom', 'bottom-right'
     distance = distance of the 3D effect
     color = color of the 3D effect
+    dest = optional SRCALPHA surface of the padded size to write the result to instead of allocating one
     """
     shadow_vector = {
         'top-left': (-1, -1),
@@ -262,7 +314,11 @@ def effect_long_shadow(surface: pygame.Surface,
     
     padding_x = abs(shadow_vector[0])*distance
     padding_y = abs(shadow_vector[1])*distance
-    final_surface = pygame.Surface(size=(surface.get_width() + padding_x, surface.get_height() + padding_y), flags=pygame.SRCALPHA)
+    if dest is None:
+        final_surface = pygame.Surface(size=(surface.get_width() + padding_x, surface.get_height() + padding_y), flags=pygame.SRCALPHA)
+    else:
+        final_surface = dest
+        final_surface.fill(color=(0, 0, 0, 0))
     
     surface_silhouette = effect_silhouette(surface=surface, color=color)
     
@@ -274,10 +330,12 @@ def effect_long_shadow(surface: pygame.Surface,
     return final_surface
 
 
+@Tracer.trace(category='utils')
 def effect_outline(surface: pygame.Surface,
                    distance: int = 1,
                    color: pygame.Color = (255, 255, 255),
-                   no_corner: bool = False
+                   no_corner: bool = False,
+                   dest: pygame.Surface = None
                   ) -> pygame.Surface:
     """
     Use this to outline a surface
@@ -287,10 +345,15 @@ def effect_outline(surface: pygame.Surface,
     distance = distance of the outline effect
     color = color of the outline
     no_corner = True for non-corner outline, False for corner outline
+    dest = optional SRCALPHA surface of the padded size to write the result to instead of allocating one
     """
     padding_x = 2*distance
     padding_y = 2*distance
-    final_surface = pygame.Surface(size=(surface.get_width() + padding_x, surface.get_height() + padding_y), flags=pygame.SRCALPHA)
+    if dest is None:
+        final_surface = pygame.Surface(size=(surface.get_width() + padding_x, surface.get_height() + padding_y), flags=pygame.SRCALPHA)
+    else:
+        final_surface = dest
+        final_surface.fill(color=(0, 0, 0, 0))
     
     surface_silhouette = effect_silhouette(surface=surface, color=color)
     
@@ -319,6 +382,7 @@ def effect_outline(surface: pygame.Surface,
 
 # Sound functions
 
+@Tracer.trace(category='utils')
 def music_load(music_channel: pygame.mixer.music,
                name: str):
     """
@@ -346,6 +410,7 @@ def music_queue(music_channel: pygame.mixer.music,
     music_channel.queue(filename=os.path.join(dir.music, name), loops=loops)
 
 
+@Tracer.trace(category='utils')
 def sound_play(sound_channel: pygame.mixer.Channel,
                sound_name: str,
                loops: int = 0,
@@ -368,6 +433,7 @@ def sound_play(sound_channel: pygame.mixer.Channel,
 
 # Cursor functions
 
+@Tracer.trace(category='utils')
 def set_cursor(cursor: dict,
               ) -> None:
     """
@@ -1,7 +1,10 @@
 from src.library.essentials import *
 from src.template.BaseState import BaseState
 from src.entities.Wind import Wind
+from src.classes.Animation import Animation
+from src.classes.AnimationSet import AnimationSet
 from src.states.Menu_TitleState import Menu_TitleState
+from src.classes.Tracer import Tracer
 import tween
 
 class MenuState(BaseState):
@@ -9,16 +12,17 @@ class MenuState(BaseState):
         BaseState.__init__(self, game, parent, stack)
 
         self.substate_stack = []
+        # Cosmetic randomness has its own stream so it never shifts gameplay randomness
+        self.visual_rng = self.game.random_streams.get_generator(name='visual')
 
         self.ready = False
         self.load_assets()
         self.ready = True
 
         self.finished_boot_up = False
+        self.idle_time = 0
         
-        utils.music_load(music_channel=self.game.music_channel, name='menu_intro.ogg')
-        utils.music_queue(music_channel=self.game.music_channel, name='menu_loop.ogg', loops=-1)
-        self.game.music_channel.play()
+        self.game.music_manager.play_music(intro='menu_intro.ogg', loop='menu_loop.ogg')
 
         self.tween_list = []
         if not self.finished_boot_up:
@@ -30,17 +34,21 @@ class MenuState(BaseState):
     #Main methods
 
     def load_assets(self):
+        assets = self.game.asset_manager
+
         # Load white overlay
-        self.overlay = pygame.Surface(size=(constants.canvas_width, constants.canvas_height), flags=pygame.SRCALPHA)
+        self.overlay = assets.register(owner=self, key='menu:overlay',
+                                       asset=pygame.Surface(size=(constants.canvas_width, constants.canvas_height), flags=pygame.SRCALPHA))
         self.overlay_props = {'alpha': 255}
         self.overlay.fill(color=(*colors.white, self.overlay_props['alpha']))
         
         # Load intro assets
-        self.logo = utils.get_image(dir=dir.graphics, name='namsom_logo.png', mode='colorkey')
-        self.logo = pygame.transform.scale_by(surface=self.logo, factor=7)
-        self.surface_logo = pygame.Surface(size=(self.logo.get_width(), self.logo.get_height()+50), flags=pygame.SRCALPHA)
+        logo = utils.get_image(dir=dir.graphics, name='namsom_logo.png', mode='colorkey')
+        logo = pygame.transform.scale_by(surface=logo, factor=7)
+        self.surface_logo = assets.register(owner=self, key='menu:surface_logo',
+                                            asset=pygame.Surface(size=(logo.get_width(), logo.get_height()+50), flags=pygame.SRCALPHA))
         self.surface_logo_props = {'y_offset': 0, 'alpha': 0, 'scale': 0.7}
-        utils.blit(dest=self.surface_logo, source=self.logo)
+        utils.blit(dest=self.surface_logo, source=logo)
         text = utils.get_text(text='PRESENTS', font=fonts.retro_arcade, size='small', color=colors.mono_100,
                               long_shadow_color=utils.color_lighten(color=colors.mono_100,factor=0.75),
                               outline_color=colors.white)
@@ -50,55 +58,58 @@ class MenuState(BaseState):
                    pos_anchor='midtop')
 
         # Load menu background assets
-        self.sky = utils.get_image(dir=dir.menu_bg, name='1_sky.png', mode='colorkey')
+        self.sky = assets.get_image(owner=self, dir=dir.menu_bg, name='1_sky.png', mode='colorkey')
         self.parallax_list = [
             {
-                'image': utils.get_image(dir=dir.menu_bg, name='2_cloud_1.png', mode='colorkey'),
+                'image': assets.get_image(owner=self, dir=dir.menu_bg, name='2_cloud_1.png', mode='colorkey'),
                 'x_offset': 0,
                 'x_step': 0.5,
             },
             {
-                'image': utils.get_image(dir=dir.menu_bg, name='3_cloud_2.png', mode='colorkey'),
+                'image': assets.get_image(owner=self, dir=dir.menu_bg, name='3_cloud_2.png', mode='colorkey'),
                 'x_offset': 0,
                 'x_step': 2.5,
             },
             {
-                'image': utils.get_image(dir=dir.menu_bg, name='4_cloud_3.png', mode='colorkey'),
+                'image': assets.get_image(owner=self, dir=dir.menu_bg, name='4_cloud_3.png', mode='colorkey'),
                 'x_offset': 0,
                 'x_step': 7,
             },
         ]
         self.landscape_list = [
             {
-                'image': utils.get_image(dir=dir.menu_bg, name='5_landscape_1.png', mode='colorkey'),
+                'image': assets.get_image(owner=self, dir=dir.menu_bg, name='5_landscape_1.png', mode='colorkey'),
                 'y_offset': 200,
             },
             {
-                'image': utils.get_image(dir=dir.menu_bg, name='6_landscape_2.png', mode='colorkey'),
+                'image': assets.get_image(owner=self, dir=dir.menu_bg, name='6_landscape_2.png', mode='colorkey'),
                 'y_offset': 400,
             },
             {
-                'image': utils.get_image(dir=dir.menu_bg, name='7_landscape_3.png', mode='colorkey'),
+                'image': assets.get_image(owner=self, dir=dir.menu_bg, name='7_landscape_3.png', mode='colorkey'),
                 'y_offset': 1000,
             },
         ]
-        self.noise_overlay = utils.get_image(dir=dir.menu_bg, name='8_noise.png', mode='alpha')
+        self.noise_overlay = assets.get_image(owner=self, dir=dir.menu_bg, name='8_noise.png', mode='alpha')
 
         # Load wind
         self.wind_entities_list = []
         self.winds_props = {'y_offset': 1000}
         self.wind_spawn_rate_per_second = 0.85
-        self.wind_sprites = utils.get_sprite_sheet(sprite_sheet=spritesheets.wind, mode='alpha')
-        for wind_sprite in self.wind_sprites:
-            self.wind_sprites[wind_sprite] = pygame.transform.scale_by(self.wind_sprites[wind_sprite], (4, 2))
+        self.wind_animations = AnimationSet(frame_duration=0.1)
+        self.wind_animations.add_clip(name='wind', clip=Animation.get_clip(sprite_sheet=spritesheets.wind, scale=(4, 2)))
+        self.wind_animations.add_clip(name='wind_flipped', clip=Animation.get_clip(sprite_sheet=spritesheets.wind, scale=(4, 2), flip_y=True))
+        assets.register(owner=self, key='menu:wind_animations', asset=[clip.frames for clip in self.wind_animations.clips.values()])
 
         # Initiate menu background surface
-        self.menu_bg = pygame.Surface(size=(constants.canvas_width, constants.canvas_height))
+        self.menu_bg = assets.register(owner=self, key='menu:menu_bg',
+                                       asset=pygame.Surface(size=(constants.canvas_width, constants.canvas_height)))
         self.menu_bg_pixel_size = 2
 
         # Load game logo
         self.game_logo = utils.get_image(dir=dir.graphics, name='game_logo.png', mode='colorkey')
-        self.game_logo = pygame.transform.scale_by(surface=self.game_logo, factor=4)
+        self.game_logo = assets.register(owner=self, key='menu:game_logo',
+                                         asset=pygame.transform.scale_by(surface=self.game_logo, factor=4))
         self.game_logo_props = {'scale': 0.5, 'alpha': 0}
 
         # Load menu options        
@@ -122,7 +133,7 @@ class MenuState(BaseState):
         ]
         self.title_button_option_surface_list = []
         for option in self.title_button_option_list:
-            text = utils.get_text(text=option['text'], font=fonts.lf2, size='medium', color=colors.white)
+            text = assets.get_text(owner=self, text=option['text'], font=fonts.lf2, size='medium', color=colors.white)
             self.title_button_option_surface_list.append({
                 'id': option['id'],
                 'surface': text,
@@ -138,8 +149,15 @@ class MenuState(BaseState):
             if self.substate_stack:
                 self.substate_stack[-1].update(dt=dt, events=events)
 
-            # Update tweens
-            tween.update(passed_time=dt)
+            # Update tweens, their on_complete callbacks run inside this span
+            with Tracer.span(name='tween.update', category='state'):
+                tween.update(passed_time=dt)
+
+            # Update idle timer
+            if events:
+                self.idle_time = 0
+            else:
+                self.idle_time += dt
 
             # Update parallax
             for layer in self.parallax_list:
@@ -148,6 +166,7 @@ class MenuState(BaseState):
                     layer['x_offset'] = 0
 
             # Update winds
+            self.wind_animations.update(dt=dt)
             for wind in self.wind_entities_list:
                 wind.update_y_offset(y_offset=self.winds_props['y_offset'])
                 if wind.active:
@@ -159,10 +178,10 @@ class MenuState(BaseState):
             spawns = int(spawn_rate)
             spawn_chance = spawn_rate - spawns
             for _ in range(spawns):
-                self.wind_entities_list.append(Wind(surface=self.menu_bg, sprites=self.wind_sprites))
+                self.wind_entities_list.append(Wind(surface=self.menu_bg, animation_set=self.wind_animations, rng=self.visual_rng))
 
-            if random.random() <= spawn_chance:
-                self.wind_entities_list.append(Wind(surface=self.menu_bg, sprites=self.wind_sprites))
+            if self.visual_rng.random() <= spawn_chance:
+                self.wind_entities_list.append(Wind(surface=self.menu_bg, animation_set=self.wind_animations, rng=self.visual_rng))
 
 
     def render(self, canvas):
@@ -189,44 +208,57 @@ class MenuState(BaseState):
             utils.blit(dest=self.menu_bg, source=self.noise_overlay)
 
             ## Render final menu_bg to canvas
-            utils.blit(dest=canvas, source=utils.effect_pixelate(surface=self.menu_bg, pixel_size=self.menu_bg_pixel_size))
+            pixelate_scratch = self.game.surface_pool.acquire(size=(self.menu_bg.get_width()//self.menu_bg_pixel_size,
+                                                                    self.menu_bg.get_height()//self.menu_bg_pixel_size))
+            utils.effect_pixelate(surface=self.menu_bg, pixel_size=self.menu_bg_pixel_size, dest=canvas, scratch=pixelate_scratch)
+            self.game.surface_pool.release(pixelate_scratch)
 
             # Build intro
 
             ## Render overlay
             if hasattr(self, 'overlay'):
-                processed_overlay = self.overlay.copy()
-                processed_overlay.set_alpha(self.overlay_props['alpha'])
-                utils.blit(dest=canvas, source=processed_overlay)
+                self.overlay.set_alpha(self.overlay_props['alpha'])
+                utils.blit(dest=canvas, source=self.overlay)
 
             ## Render logo
             if hasattr(self, 'surface_logo'):
-                processed_surface_logo = pygame.transform.scale_by(surface=self.surface_logo, factor=self.surface_logo_props['scale'])
-                processed_surface_logo.set_alpha(self.surface_logo_props['alpha'])
+                processed_surface_logo = utils.scale_by(surface=self.surface_logo, factor=self.surface_logo_props['scale'])
                 utils.blit(dest=canvas,
                         source=processed_surface_logo,
                         pos=(constants.canvas_width/2, constants.canvas_height/2 - 20 + self.surface_logo_props['y_offset']),
-                        pos_anchor='center')
+                        pos_anchor='center',
+                        alpha=self.surface_logo_props['alpha'])
                 
             # Render substates
 
             if not self.substate_stack:
                 ## Render game logo
-                processed_game_logo = pygame.transform.scale_by(surface=self.game_logo, factor=self.game_logo_props['scale'])
-                processed_game_logo.set_alpha(self.game_logo_props['alpha'])
-                utils.blit(dest=canvas, source=processed_game_logo, pos=(constants.canvas_width/2, 150), pos_anchor='center')
+                processed_game_logo = utils.scale_by(surface=self.game_logo, factor=self.game_logo_props['scale'])
+                utils.blit(dest=canvas, source=processed_game_logo, pos=(constants.canvas_width/2, 150), pos_anchor='center',
+                           alpha=self.game_logo_props['alpha'])
 
                 ## Render menu options
                 for i, option in enumerate(self.title_button_option_surface_list):
-                    processed_option = pygame.transform.scale_by(surface=option['surface'], factor=option['scale'])
-                    processed_option.set_alpha(option['alpha'])
-                    utils.blit(dest=canvas, source=processed_option, pos=(constants.canvas_width/2, 340 + i*80), pos_anchor='center')
+                    processed_option = utils.scale_by(surface=option['surface'], factor=option['scale'])
+                    utils.blit(dest=canvas, source=processed_option, pos=(constants.canvas_width/2, 340 + i*80), pos_anchor='center',
+                               alpha=option['alpha'])
 
             else:
                 self.substate_stack[-1].render(canvas=canvas)
                 
 
     #Class methods
+
+    def is_animating(self):
+        if not self.ready:
+            return True
+        if any(not tween_instance.delete for tween_instance in self.tween_list):
+            return True
+        if self.substate_stack and self.substate_stack[-1].is_animating():
+            return True
+        # Parallax and winds only count until the menu has been left untouched for a while
+        return self.idle_time < constants.idle_timeout
+
   
     def bootup_tween_chain(self, skip=False):
         if not skip:
@@ -270,7 +302,8 @@ class MenuState(BaseState):
                                             end_value=-500,
                                             time=3.25,
                                             ease_type=tweencurves.easeOutQuint,
-                                            delay=delay).on_complete(self.finish_bootup))
+                                            delay=delay))
+            self.tween_list[-1].on_complete(self.finish_bootup)
             
             delay = 4
             self.tween_list.append(tween.to(container=self.game_logo_props,
@@ -309,6 +342,8 @@ class MenuState(BaseState):
         self.finished_boot_up = True
 
         # Clear intro assets
+        self.game.asset_manager.release(owner=self, key='menu:surface_logo', keep_cached=False)
+        self.game.asset_manager.release(owner=self, key='menu:overlay', keep_cached=False)
         del self.surface_logo
         del self.surface_logo_props
         del self.overlay
@@ -325,7 +360,8 @@ class MenuState(BaseState):
                 option['alpha'] = 255
 
         # Convert surfaces to static
-        self.game_logo = pygame.transform.scale_by(surface=self.game_logo, factor=self.game_logo_props['scale'])
+        self.game_logo = self.game.asset_manager.register(owner=self, key='menu:game_logo',
+                                                          asset=pygame.transform.scale_by(surface=self.game_logo, factor=self.game_logo_props['scale']))
         for option in self.title_button_option_surface_list:
             option['surface'] = pygame.transform.scale_by(surface=option['surface'], factor=option['scale'])
         
@@ -1,18 +1,180 @@
 from src.library.essentials import *
 from src.template.BaseState import BaseState
 from src.classes.Button import Button
+from src.classes.GlyphAtlas import GlyphAtlas
+import time
 
 class Menu_RecordsState(BaseState):
     def __init__(self, game, parent, stack):
         BaseState.__init__(self, game, parent, stack)
+        self.records_manager = self.game.records_manager
+        self.page_size = 8
+        self.order = 'score'
+        # Last record of every page before the current one, None for the first page
+        self.page_starts = [None]
+        self.records = []
+        self.has_next_page = False
+
+        self.load_assets()
+        self.load_page()
 
 
     #Main methods
 
+    def load_assets(self):
+        assets = self.game.asset_manager
+
+        self.page_title = assets.get_text(owner=self, text='Records', font=fonts.lf2, size='huge', color=colors.yellow_light)
+        self.empty_text = assets.get_text(owner=self, text='No games recorded yet', font=fonts.lf2, size='small', color=colors.white)
+        self.arrow_left = assets.get_sprite(owner=self, sprite_sheet=spritesheets.gui, target_sprite='arrow_left')
+        self.arrow_right = assets.get_sprite(owner=self, sprite_sheet=spritesheets.gui, target_sprite='arrow_right')
+        # Rows change with every page, so they are drawn from glyphs instead of cached text surfaces
+        self.header_font = GlyphAtlas.get_atlas(font=fonts.lf2, size='small', color=colors.yellow_light)
+        self.row_font = GlyphAtlas.get_atlas(font=fonts.lf2, size='small', color=colors.white)
+        self.column_list = [
+            {'id': 'rank', 'label': '#', 'x': 250},
+            {'id': 'score', 'label': 'Score', 'x': 400},
+            {'id': 'seed', 'label': 'Seed', 'x': 560},
+            {'id': 'turns', 'label': 'Turns', 'x': 700},
+            {'id': 'duration', 'label': 'Time', 'x': 840},
+            {'id': 'date', 'label': 'Date', 'x': 1020},
+        ]
+
+        self.button_option_list = [
+            {
+                'id': 'score',
+                'text': 'Score',
+            },
+            {
+                'id': 'date',
+                'text': 'Date',
+            },
+            {
+                'id': 'seed',
+                'text': 'Seed',
+            },
+            {
+                'id': 'back',
+                'text': 'Back',
+            },
+        ]
+        self.button_option_surface_list = []
+        for i, option in enumerate(self.button_option_list):
+            text = assets.get_text(owner=self, text=option['text'], font=fonts.lf2, size='medium', color=colors.white)
+            selected_text = assets.get_text(owner=self, text=option['text'], font=fonts.lf2, size='medium', color=colors.yellow_light)
+            self.button_option_surface_list.append({
+                'id': option['id'],
+                'surface': text,
+                'selected_surface': selected_text,
+                'scale': 1.0,
+                'pos': (constants.canvas_width/2 + (i - 1)*200, 200) if option['id'] != 'back' else (constants.canvas_width/2, 620),
+            })
+
+        self.button_list = []
+        for option in self.button_option_surface_list:
+            self.button_list.append(Button(game=self.game,
+                                           id=option['id'],
+                                           surface=option['surface'],
+                                           width=180,
+                                           height=60,
+                                           pos=option['pos'],
+                                           pos_anchor='center'))
+        self.page_button_list = []
+        for id, surface, x in (('previous', self.arrow_left, constants.canvas_width/2 - 120),
+                               ('next', self.arrow_right, constants.canvas_width/2 + 120)):
+            self.page_button_list.append(Button(game=self.game,
+                                                id=id,
+                                                surface=surface,
+                                                width=60,
+                                                height=60,
+                                                pos=(x, 545),
+                                                pos_anchor='center'))
+
+
+    def load_page(self):
+        # One record more than a page tells whether there is a next page without counting every game
+        records = self.records_manager.get_page(order=self.order, limit=self.page_size + 1, after=self.page_starts[-1])
+        self.has_next_page = len(records) > self.page_size
+        self.records = records[:self.page_size]
+
+
+    def get_cell_text(self, column: str, rank: int, record: dict):
+        if column == 'rank':
+            return str(rank)
+        elif column == 'duration':
+            return f"{int(record['duration'])//60}:{int(record['duration'])%60:02d}"
+        elif column == 'date':
+            return time.strftime('%Y-%m-%d', time.localtime(record['date']))
+        return str(record[column])
+
+
     def update(self, dt, events):
+        for button in self.button_list:
+            button.update(dt=dt, events=events)
+
+            for option in self.button_option_surface_list:
+                if button.id == option['id']:
+                    if button.hovered:
+                        self.cursor = button.hover_cursor
+                        option['scale'] = min(option['scale'] + 2.4*dt, 1.2)
+                    else:
+                        option['scale'] = max(option['scale'] - 2.4*dt, 1.0)
+
+            if button.clicked:
+                if button.id == 'back':
+                    self.exit_state()
+                elif button.id != self.order:
+                    self.order = button.id
+                    self.page_starts = [None]
+                    self.load_page()
+
+        for button in self.page_button_list:
+            button.update(dt=dt, events=events)
+            if (button.id == 'previous' and len(self.page_starts) > 1) or (button.id == 'next' and self.has_next_page):
+                if button.hovered:
+                    self.cursor = button.hover_cursor
+                if button.clicked:
+                    if button.id == 'previous':
+                        self.page_starts.pop()
+                    else:
+                        self.page_starts.append(self.records[-1])
+                    self.load_page()
+
         utils.set_cursor(cursor=self.cursor)
         self.cursor = cursors.normal
 
 
+    def is_animating(self):
+        for button in self.button_list:
+            for option in self.button_option_surface_list:
+                if button.id == option['id']:
+                    if (button.hovered and option['scale'] < 1.2) or (not button.hovered and option['scale'] > 1.0):
+                        return True
+        return False
+
+
     def render(self, canvas):
-        pass
+        utils.blit(dest=canvas, source=self.page_title, pos=(constants.canvas_width/2, 120), pos_anchor='center')
+        for option in self.button_option_surface_list:
+            surface = option['selected_surface'] if option['id'] == self.order else option['surface']
+            processed_surface = utils.scale_by(surface=surface, factor=option['scale'])
+            utils.blit(dest=canvas, source=processed_surface, pos=option['pos'], pos_anchor='center')
+
+        if not self.records:
+            utils.blit(dest=canvas, source=self.empty_text, pos=(constants.canvas_width/2, 360), pos_anchor='center')
+            return
+
+        for column in self.column_list:
+            self.header_font.render(dest=canvas, text=column['label'], pos=(column['x'], 260), pos_anchor='center')
+        first_rank = (len(self.page_starts) - 1)*self.page_size + 1
+        for i, record in enumerate(self.records):
+            for column in self.column_list:
+                self.row_font.render(dest=canvas,
+                                     text=self.get_cell_text(column=column['id'], rank=first_rank + i, record=record),
+                                     pos=(column['x'], 300 + i*28),
+                                     pos_anchor='center')
+
+        if len(self.page_starts) > 1:
+            utils.blit(dest=canvas, source=self.arrow_left, pos=(constants.canvas_width/2 - 120, 545), pos_anchor='center')
+        if self.has_next_page:
+            utils.blit(dest=canvas, source=self.arrow_right, pos=(constants.canvas_width/2 + 120, 545), pos_anchor='center')
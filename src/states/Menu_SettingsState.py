@@ -17,21 +17,25 @@ class Menu_SettingsState(BaseState):
     #Main methods
 
     def load_assets(self):
+        assets = self.game.asset_manager
 
-        self.page_title = utils.get_text(text='Settings', font=fonts.lf2, size='huge', color=colors.yellow_light)
+        self.page_title = assets.get_text(owner=self, text='Settings', font=fonts.lf2, size='huge', color=colors.yellow_light)
         
-        self.arrow_left = utils.get_sprite(sprite_sheet=spritesheets.gui, target_sprite='arrow_left')
-        self.arrow_right = utils.get_sprite(sprite_sheet=spritesheets.gui, target_sprite='arrow_right')
+        self.arrow_left = assets.get_sprite(owner=self, sprite_sheet=spritesheets.gui, target_sprite='arrow_left')
+        self.arrow_right = assets.get_sprite(owner=self, sprite_sheet=spritesheets.gui, target_sprite='arrow_right')
         
+        # Settings are laid out in two columns so they stay above the buttons
+        settings_rows = math.ceil(len(self.settings_manager.settings_list)/2)
         self.settings_option_surface_list = []
         for i, setting in enumerate(self.settings_manager.settings_list):
             text_string = setting['label']+':  '+setting['value_label'][self.current_settings_index[i]]
-            text = utils.get_text(text=text_string, font=fonts.lf2, size='small', color=colors.white)
+            text = assets.get_text(owner=self, text=text_string, font=fonts.lf2, size='small', color=colors.white)
             self.settings_option_surface_list.append({
                 'id': setting['id'],
                 'surface': text,
                 'arrow_visibility': False,
                 'scale': 1.0,
+                'pos': (constants.canvas_width/2 + (i//settings_rows - 0.5)*520, 200 + (i%settings_rows)*50),
             })
             
         self.button_option_list = [
@@ -46,7 +50,7 @@ class Menu_SettingsState(BaseState):
         ]
         self.button_option_surface_list = []
         for option in self.button_option_list:
-            text = utils.get_text(text=option['text'], font=fonts.lf2, size='medium', color=colors.white)
+            text = assets.get_text(owner=self, text=option['text'], font=fonts.lf2, size='medium', color=colors.white)
             self.button_option_surface_list.append({
                 'id': option['id'],
                 'surface': text,
@@ -60,7 +64,7 @@ class Menu_SettingsState(BaseState):
                                            surface=option['surface'],
                                            width=300,
                                            height=50,
-                                           pos=(constants.canvas_width/2, 200 + i*50),
+                                           pos=option['pos'],
                                            pos_anchor='center',
                                            hover_cursor=cursors.normal))
         for i, option in enumerate(self.button_option_surface_list):
@@ -105,20 +109,29 @@ class Menu_SettingsState(BaseState):
         self.cursor = cursors.normal
 
 
+    def is_animating(self):
+        for button in self.button_list:
+            for option in self.button_option_surface_list:
+                if button.id == option['id']:
+                    if (button.hovered and option['scale'] < 1.2) or (not button.hovered and option['scale'] > 1.0):
+                        return True
+        return False
+
+
     def render(self, canvas):
         utils.blit(dest=canvas, source=self.page_title, pos=(constants.canvas_width/2, 120), pos_anchor='center')
         for i, option in enumerate(self.settings_option_surface_list):
-            processed_surface = pygame.transform.scale_by(surface=option['surface'], factor=option['scale'])
-            utils.blit(dest=canvas, source=processed_surface, pos=(constants.canvas_width/2, 200 + i*50), pos_anchor='center')
+            processed_surface = utils.scale_by(surface=option['surface'], factor=option['scale'])
+            utils.blit(dest=canvas, source=processed_surface, pos=option['pos'], pos_anchor='center')
             if option['arrow_visibility']:
                 utils.blit(dest=canvas,
                            source=self.arrow_left,
-                           pos=(constants.canvas_width/2 - option['surface'].width/2 - 36, 200 + i*50),
+                           pos=(option['pos'][0] - option['surface'].width/2 - 36, option['pos'][1]),
                            pos_anchor='center')
                 utils.blit(dest=canvas,
                            source=self.arrow_right,
-                           pos=(constants.canvas_width/2 + option['surface'].width/2 + 36, 200 + i*50),
+                           pos=(option['pos'][0] + option['surface'].width/2 + 36, option['pos'][1]),
                            pos_anchor='center')
         for i, option in enumerate(self.button_option_surface_list):
-            processed_surface = pygame.transform.scale_by(surface=option['surface'], factor=option['scale'])
+            processed_surface = utils.scale_by(surface=option['surface'], factor=option['scale'])
             utils.blit(dest=canvas, source=processed_surface, pos=(constants.canvas_width/2, 515 + i*65), pos_anchor='center')
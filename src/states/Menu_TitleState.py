@@ -53,12 +53,21 @@ class Menu_TitleState(BaseState):
         self.cursor = cursors.normal
 
 
+    def is_animating(self):
+        for button in self.button_list:
+            for option in self.parent.title_button_option_surface_list:
+                if button.id == option['id']:
+                    if (button.hovered and option['scale'] < 1.2) or (not button.hovered and option['scale'] > 1.0):
+                        return True
+        return False
+
+
     def render(self, canvas):
         # Render game logo
         utils.blit(dest=canvas, source=self.parent.game_logo, pos=(constants.canvas_width/2, 150), pos_anchor='center')
         # Render menu options
         for i, option in enumerate(self.parent.title_button_option_surface_list):
-            processed_surface = pygame.transform.scale_by(surface=option['surface'], factor=option['scale'])
-            processed_surface.set_alpha(option['alpha'])
-            utils.blit(dest=canvas, source=processed_surface, pos=(constants.canvas_width/2, 340 + i*80), pos_anchor='center')
+            processed_surface = utils.scale_by(surface=option['surface'], factor=option['scale'])
+            utils.blit(dest=canvas, source=processed_surface, pos=(constants.canvas_width/2, 340 + i*80), pos_anchor='center',
+                       alpha=option['alpha'])
             
\ No newline at end of file
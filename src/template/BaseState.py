@@ -1,5 +1,6 @@
 from abc import ABC, abstractmethod
 from src.library.essentials import *
+from src.classes.Tracer import Tracer
 
 class BaseState(ABC):
     def __init__(self, game, parent, stack):
@@ -10,6 +11,14 @@ class BaseState(ABC):
         self.cursor = cursors.normal
 
 
+    def __init_subclass__(cls, **kwargs):
+        # Every state's own update, render and load_assets show up as spans named after the state
+        super().__init_subclass__(**kwargs)
+        for method in ('update', 'render', 'load_assets'):
+            if method in cls.__dict__:
+                setattr(cls, method, Tracer.trace(name=f'{cls.__name__}.{method}', category='state')(cls.__dict__[method]))
+
+
     @abstractmethod
     def update(self, dt, events):
         pass
@@ -19,13 +28,23 @@ class BaseState(ABC):
     def render(self, surface):
         pass
 
+
+    def is_animating(self):
+        # Override in states with tweens, particles or hover ramps in progress
+        return False
+
     
     def enter_state(self):
+        Tracer.instant(name=f'enter {type(self).__name__}', category='transition')
         if len(self.stack) > 1:
             self.prev_state = self.stack[-1]
         self.stack.append(self)
+        self.game.memory_policy.on_transition()
 
 
     def exit_state(self):
+        Tracer.instant(name=f'exit {type(self).__name__}', category='transition')
         self.stack.pop()
+        self.game.asset_manager.release_owner(owner=self)
+        self.game.memory_policy.on_transition()
         
\ No newline at end of file